@@ -0,0 +1,66 @@
+"""
+Benchmarks the cold import time and per-call client overhead of the shared
+AWS clients against creating resources at import time:
+    python benchmarks/aws.py
+"""
+import os
+import subprocess
+import sys
+import time
+import harness
+from beyond import aws
+
+def import_time(code, repeats):
+    """
+    Times code in fresh interpreters, as a cold start runs it.
+    
+    Parameters:
+    - code (str): The Python code to run.
+    - repeats (int): The number of interpreters to take the fastest of.
+    
+    Returns:
+    - float: The fastest run, in milliseconds.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [harness.LAYER, os.environ.get("PYTHONPATH")])))
+    env.setdefault("AWS_DEFAULT_REGION", "ca-central-1")
+    timed = f"import time\nstarted = time.perf_counter()\n{code}\nprint(time.perf_counter() - started)"
+    times = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", timed], env=env, capture_output=True, text=True, check=True).stdout
+        times.append(float(output))
+    return min(times) * 1000
+
+def benchmark(repeats=5, calls=100):
+    """
+    Times a cold import with the lazy handles against creating the resource
+    at import time, and the cost of reusing the shared client against
+    creating one per call, and prints the results.
+    
+    Parameters:
+    - repeats (int): The number of cold imports to take the fastest of.
+    - calls (int): The number of clients to get for the per-call times.
+    """
+    try:
+        import boto3
+    except ImportError:
+        sys.exit("boto3 is not installed")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "ca-central-1")
+    print(f"cold import, best of {repeats}:")
+    for label, code in (
+        ("beyond.aws, lazy table", "from beyond import aws\naws.table('beyond-users')"),
+        ("boto3 resource and table", "import boto3\nboto3.resource('dynamodb').Table('beyond-users')")
+    ):
+        print(f"  {label:<26} {import_time(code, repeats):8.1f} ms")
+    print(f"getting a client, mean of {calls}:")
+    for label, get in (
+        ("shared aws.client", lambda: aws.client("dynamodb")),
+        ("new boto3.client", lambda: boto3.client("dynamodb", config=aws.config()))
+    ):
+        get()
+        started = time.perf_counter()
+        for _ in range(calls):
+            get()
+        print(f"  {label:<26} {(time.perf_counter() - started) / calls * 1000:8.3f} ms")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,38 @@
+"""
+Benchmarks create-object bulk imports into a temporary local table:
+    python benchmarks/create_object.py [ROWS]
+"""
+import sys
+import harness
+from beyond import aws
+from beyond import fastjson
+
+main = harness.load_function("create-object")
+
+def benchmark(rows, worker_counts=(1, 2, 4, 8)):
+    """
+    Imports generated CSV rows into the table with different numbers of
+    concurrent writers, and prints the rows per second of each.
+    
+    Parameters:
+    - rows (int): The number of rows to import.
+    - worker_counts (tuple): The numbers of writers to measure.
+    """
+    fields = ["ngc", "name", "type", "constellation", "ra", "dec", "magnitude", "collection"]
+    lines = [",".join(fields)] + [
+        ",".join(str(item[field]) for field in fields)
+        for item in fastjson.items(harness.sample_catalog(rows))
+    ]
+    print(f"{rows} rows:")
+    for workers in worker_counts:
+        report = main.import_objects(iter(lines), "csv", workers, notify=False)
+        print(f"  {workers} writers {report['seconds']:8.2f} s {report['rowsPerSecond']:10.1f} rows/s {report['unprocessed']} unprocessed")
+
+if __name__ == "__main__":
+    harness.require_local()
+    main.table = aws.table("beyond-objects-benchmark")
+    harness.create_table(main.table.name, "ngc", {"ngc": "N"})
+    try:
+        benchmark(int(sys.argv[1]) if sys.argv[1:] else 10000)
+    finally:
+        harness.drop_table(main.table.name)
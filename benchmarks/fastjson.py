@@ -0,0 +1,47 @@
+"""
+Benchmarks decoding and encoding a 10,000 object catalog with each JSON path:
+    python benchmarks/fastjson.py
+"""
+import json
+from decimal import Decimal
+import harness
+from beyond import fastjson
+
+def benchmark(size=10000, repeats=5):
+    """
+    Times decoding and encoding a catalog with each available path, and
+    prints the results.
+    
+    Parameters:
+    - size (int): The number of objects in the catalog.
+    - repeats (int): The number of runs to take the best time of.
+    """
+    raw = harness.sample_catalog(size)
+    decimal_items = [
+        {name: Decimal(data["N"]) if "N" in data else data["S"] for name, data in record.items()}
+        for record in raw
+    ]
+
+    def best(run):
+        return harness.best_of(run, repeats)
+
+    plain_items = fastjson.items(raw)
+    results = [
+        ("decode wire format to int/float", best(lambda: fastjson.items(raw))),
+        ("stdlib json, native values", best(lambda: json.dumps(plain_items, default=fastjson.default, separators=(",", ":"), ensure_ascii=False))),
+        ("stdlib json, Decimal values", best(lambda: json.dumps(decimal_items, default=fastjson.default, separators=(",", ":"), ensure_ascii=False)))
+    ]
+    if fastjson.orjson is not None:
+        results.append(("orjson, native values", best(lambda: fastjson.orjson.dumps(plain_items, default=fastjson.default))))
+        results.append(("orjson, Decimal values", best(lambda: fastjson.orjson.dumps(decimal_items, default=fastjson.default))))
+    try:
+        import simplejson
+        results.append(("simplejson, Decimal values", best(lambda: simplejson.dumps(decimal_items))))
+    except ImportError:
+        pass
+    print(f"{size} objects, best of {repeats}:")
+    for label, elapsed in results:
+        print(f"  {label:<32} {elapsed:8.1f} ms")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,69 @@
+"""
+Benchmarks the get-all-objects catalog reads against a seeded table in a
+local DynamoDB:
+    python benchmarks/get_all_objects.py
+"""
+import harness
+from beyond import aws
+from beyond import fastjson
+
+main = harness.load_function("get-all-objects")
+
+def benchmark_projection(size=10000, repeats=5):
+    """
+    Compares reading the default listing with and without a server-side
+    projection on a seeded local table, and prints the bytes read and the
+    time to read and encode the listing for each.
+    
+    Parameters:
+    - size (int): The number of objects seeded.
+    - repeats (int): The number of runs to take the best time of.
+    """
+    def strip_columns():
+        # Reads every attribute and drops the unused ones in Python.
+        client = aws.client("dynamodb")
+        kwargs = {}
+        items = []
+        while True:
+            response = client.scan(TableName=main.table.name, **kwargs)
+            items.extend(
+                {column: item[column] for column in main.DEFAULT_FIELDS if column in item}
+                for item in fastjson.items(response["Items"])
+            )
+            if "LastEvaluatedKey" not in response:
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        return fastjson.dumps(items)
+    def project_columns():
+        return fastjson.dumps(main.get_all_objects(main.DEFAULT_FIELDS, segments=1))
+    print(f"{size} objects, best of {repeats}:")
+    for label, run in (("all attributes, stripped", strip_columns), ("projected columns", project_columns)):
+        with harness.ResponseBytes() as counter:
+            run()
+        elapsed = harness.best_of(run, repeats)
+        print(f"  {label:<26} {counter.total / 1024:10.1f} KiB read {elapsed:8.1f} ms")
+
+def benchmark_segments(size=10000, repeats=5):
+    """
+    Times full catalog reads of a seeded local table with different numbers
+    of parallel scan segments, and prints the throughput of each.
+    
+    Parameters:
+    - size (int): The number of objects seeded.
+    - repeats (int): The number of runs to take the best time of.
+    """
+    print(f"{size} objects, best of {repeats}:")
+    for segments in (1, 2, 4, 8, 16):
+        elapsed = harness.best_of(lambda: main.get_all_objects(main.DEFAULT_FIELDS, segments), repeats)
+        print(f"  {segments:>2} segments {elapsed:8.1f} ms {size / elapsed * 1000:10.0f} objects/s")
+
+if __name__ == "__main__":
+    harness.require_local()
+    main.table = aws.table("beyond-objects-benchmark")
+    harness.create_table(main.table.name, "ngc", {"ngc": "N"})
+    try:
+        harness.seed(main.table.name, harness.sample_catalog(10000))
+        benchmark_projection()
+        benchmark_segments()
+    finally:
+        harness.drop_table(main.table.name)
@@ -0,0 +1,191 @@
+"""
+Helpers shared by the benchmarks in this directory. They are not part of
+the deployed functions or the beyond layer.
+
+Importing this module puts the beyond layer on the import path, so every
+benchmark runs from the repository root, e.g.:
+    python benchmarks/get_all_objects.py
+
+The benchmarks that need a seeded table create, seed and delete their own
+tables, so they refuse to run unless AWS_ENDPOINT_URL_DYNAMODB points
+DynamoDB at a local endpoint, e.g. one started with:
+    docker run -p 8000:8000 amazon/dynamodb-local
+    export AWS_ENDPOINT_URL_DYNAMODB=http://localhost:8000
+"""
+import importlib.util
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAYER = os.path.join(ROOT, "layers", "beyond", "python")
+
+# The benchmarks import the shared layer as the functions do on Lambda.
+sys.path.insert(0, LAYER)
+
+from beyond import aws  # noqa: E402
+from beyond.batch import batch_write  # noqa: E402
+
+# Endpoint of the local DynamoDB the benchmarks run against.
+ENDPOINT_URL = os.environ.get("AWS_ENDPOINT_URL_DYNAMODB", "")
+# Number of BatchWriteItem chunks written concurrently while seeding.
+SEED_WORKERS = int(os.environ.get("SEED_WORKERS", "8"))
+
+def load_function(name):
+    """
+    Imports the main module of a lambda function.
+    
+    Parameters:
+    - name (str): The directory of the function, e.g. "get-all-objects".
+    
+    Returns:
+    - module: The function's main module.
+    """
+    path = os.path.join(ROOT, "functions", name, "main.py")
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def require_local():
+    """
+    Exits unless DynamoDB points at a local endpoint, so a benchmark never
+    creates or deletes tables in AWS.
+    """
+    if not ENDPOINT_URL:
+        sys.exit("Set AWS_ENDPOINT_URL_DYNAMODB to a local DynamoDB, e.g. http://localhost:8000")
+
+def drop_table(name):
+    """
+    Deletes a table if it exists and waits until it is gone.
+    
+    Parameters:
+    - name (str): The name of the table.
+    """
+    client = aws.client("dynamodb")
+    try:
+        client.delete_table(TableName=name)
+    except client.exceptions.ResourceNotFoundException:
+        return
+    client.get_waiter("table_not_exists").wait(TableName=name)
+
+def create_table(name, key, attributes, indexes=()):
+    """
+    Creates an on-demand table, replacing any table with the same name.
+    
+    Parameters:
+    - name (str): The name of the table.
+    - key (str): The hash key of the table.
+    - attributes (dict): The type, "S" or "N", of every key and index attribute.
+    - indexes (list): (name, hash key, range key or None) tuples for the
+      GSIs, all projecting every attribute.
+    """
+    require_local()
+    drop_table(name)
+    kwargs = {}
+    if indexes:
+        kwargs["GlobalSecondaryIndexes"] = [
+            {
+                "IndexName": index,
+                "KeySchema": [{"AttributeName": hash_key, "KeyType": "HASH"}]
+                + ([{"AttributeName": range_key, "KeyType": "RANGE"}] if range_key else []),
+                "Projection": {"ProjectionType": "ALL"}
+            }
+            for index, hash_key, range_key in indexes
+        ]
+    client = aws.client("dynamodb")
+    client.create_table(
+        TableName=name,
+        KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": attribute, "AttributeType": kind} for attribute, kind in attributes.items()],
+        BillingMode="PAY_PER_REQUEST",
+        **kwargs
+    )
+    client.get_waiter("table_exists").wait(TableName=name)
+
+def seed(name, raws, workers=SEED_WORKERS):
+    """
+    Writes items into a table with batched writes.
+    
+    Parameters:
+    - name (str): The name of the table.
+    - raws (iterable): The items in the DynamoDB wire format.
+    - workers (int): The number of chunks to write concurrently.
+    
+    Returns:
+    - float: The seconds the writes took.
+    
+    Raises:
+    - RuntimeError: If some items could not be written.
+    """
+    started = time.perf_counter()
+    requests = ({"PutRequest": {"Item": raw}} for raw in raws)
+    _, unprocessed = batch_write(aws.client("dynamodb"), name, requests, workers)
+    if unprocessed:
+        raise RuntimeError(f"{len(unprocessed)} items could not be seeded")
+    return time.perf_counter() - started
+
+def sample_catalog(size):
+    """
+    Builds a catalog of objects in the DynamoDB wire format, shaped like
+    beyond-objects.
+    
+    Parameters:
+    - size (int): The number of objects.
+    
+    Returns:
+    - list: The raw items.
+    """
+    return [
+        {
+            "ngc": {"N": str(ngc)},
+            "name": {"S": f"Object {ngc}"},
+            "type": {"S": "Galaxy"},
+            "constellation": {"S": "Andromeda"},
+            "ra": {"N": f"{(ngc * 0.036) % 360:.4f}"},
+            "dec": {"N": f"{(ngc * 0.017) % 180 - 90:.4f}"},
+            "magnitude": {"N": f"{(ngc % 150) / 10:.1f}"},
+            "collection": {"S": "NGC"}
+        }
+        for ngc in range(1, size + 1)
+    ]
+
+class ResponseBytes:
+    """
+    Counts the bytes of the DynamoDB responses received while it is active,
+    e.g. to compare how much a scan reads with and without a projection:
+        with ResponseBytes() as counter:
+            ...
+        print(counter.total)
+    """
+
+    def __init__(self):
+        self.total = 0
+
+    def count(self, http_response, **kwargs):
+        self.total += len(http_response.content)
+
+    def __enter__(self):
+        aws.client("dynamodb").meta.events.register("after-call.dynamodb", self.count)
+        return self
+
+    def __exit__(self, *exc_info):
+        aws.client("dynamodb").meta.events.unregister("after-call.dynamodb", self.count)
+
+def best_of(run, repeats):
+    """
+    Times a function and returns its fastest run.
+    
+    Parameters:
+    - run (function): The function to time.
+    - repeats (int): The number of runs.
+    
+    Returns:
+    - float: The fastest run, in milliseconds.
+    """
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
@@ -0,0 +1,25 @@
+"""
+Prints a table of password verify times per cost on the current machine,
+and the cost each algorithm calibrates to:
+    python benchmarks/passwords.py
+"""
+import harness  # noqa: F401
+from beyond import passwords
+
+def benchmark():
+    """
+    Times a verify at every cost of each available algorithm, up to the
+    first cost that takes over a second, and prints the calibrated cost.
+    """
+    names = ["bcrypt"] + (["scrypt"] if passwords.scrypt_available() else [])
+    for name in names:
+        low, high = passwords.COST_LIMITS[name]
+        for level in range(low, high + 1):
+            elapsed = passwords.time_verify(name, level, repeats=3)
+            print(f"{name} cost {level}: {elapsed:.1f} ms per verify")
+            if elapsed > 1000:
+                break
+        print(f"{name} calibrated cost for {passwords.PASSWORD_TARGET_MS:g} ms: {passwords.calibrate(name)}")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,69 @@
+"""
+Benchmarks the memory and CPU of decoding the catalog into records against
+the other read paths:
+    python benchmarks/records.py
+"""
+import gc
+import time
+import tracemalloc
+import harness
+from beyond import fastjson
+from beyond import records
+
+def measure(run, repeats):
+    """
+    Measures the fastest run of a function and the memory its result holds.
+    
+    Parameters:
+    - run (function): The function to measure.
+    - repeats (int): The number of runs to take the best time of.
+    
+    Returns:
+    - tuple: (milliseconds, bytes) for the fastest run and the retained result.
+    """
+    elapsed = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        elapsed.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    result = run()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return min(elapsed) * 1000, retained
+
+def benchmark(size=10000, repeats=5):
+    """
+    Times decoding a catalog with each read path, measures the memory the
+    decoded catalog holds, and prints the results.
+    
+    Parameters:
+    - size (int): The number of objects in the catalog.
+    - repeats (int): The number of runs to take the best time of.
+    """
+    raw = harness.sample_catalog(size)
+    columns = list(records.OBJECT_SCHEMA)
+    paths = []
+    try:
+        from boto3.dynamodb.types import TypeDeserializer
+        deserializer = TypeDeserializer()
+        paths.append((
+            "Table (TypeDeserializer)",
+            lambda: [{name: deserializer.deserialize(value) for name, value in item.items()} for item in raw]
+        ))
+    except ImportError:
+        print("boto3 is not installed, skipping the Table path")
+    paths.append(("fastjson.items (dicts)", lambda: fastjson.items(raw)))
+    paths.append(("decode_items (records)", lambda: records.decode_items(raw, columns)))
+    print(f"{size} objects, best of {repeats}:")
+    for label, run in paths:
+        elapsed, retained = measure(run, repeats)
+        print(f"  {label:<26} {elapsed:8.1f} ms {retained / 1024 / 1024:8.1f} MiB")
+        encoded = run()
+        elapsed, _ = measure(lambda: fastjson.dumps(encoded), repeats)
+        print(f"  {'  then fastjson.dumps':<26} {elapsed:8.1f} ms")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,36 @@
+"""
+Benchmarks the compressed size and latency of catalog responses:
+    python benchmarks/response.py
+"""
+import base64
+import harness
+from beyond import fastjson
+from beyond import response
+
+def benchmark(sizes=(1000, 5000, 10000), repeats=5):
+    """
+    Compresses catalog bodies of several sizes with every available
+    encoding, and prints the bytes sent and the time compress_response
+    takes, with and without a cached variant.
+    
+    Parameters:
+    - sizes (tuple): The numbers of objects in the catalogs.
+    - repeats (int): The number of runs to take the best time of.
+    """
+    encodings = ["identity", "gzip"] + (["br"] if response.brotli is not None else [])
+    print(f"best of {repeats}:")
+    for size in sizes:
+        body = fastjson.dumps(fastjson.items(harness.sample_catalog(size)))
+        for encoding in encodings:
+            event = {"headers": {"accept-encoding": encoding}}
+            respond = lambda etag: response.compress_response(event, {"headers": {"ETag": etag} if etag else {}, "body": body})
+            result = respond(None)
+            # Base64 bodies are decoded before they are sent to the client.
+            sent = len(base64.b64decode(result["body"]) if result.get("isBase64Encoded") else result["body"].encode("utf-8"))
+            response.compression_cache.clear()
+            uncached = harness.best_of(lambda: respond(None), repeats)
+            cached = harness.best_of(lambda: respond('"benchmark"'), repeats)
+            print(f"  {size:>6} objects {encoding:<9} {sent / 1024:9.1f} KiB sent {uncached:8.2f} ms {cached:8.2f} ms cached")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,80 @@
+"""
+Benchmarks cone searches through the sky index against a full scan, on a
+local table as the catalog grows:
+    python benchmarks/sky.py
+"""
+import math
+import random
+import time
+import harness
+from beyond import aws
+from beyond.sky import SKY_INDEX, cone_ranges, query_range, sky_index
+
+def sample_objects(start, stop, rng):
+    """
+    Generator of objects spread uniformly over the sky, in the DynamoDB wire
+    format.
+    
+    Parameters:
+    - start (int): The first NGC.
+    - stop (int): The NGC after the last one.
+    - rng (Random): The random number generator.
+    
+    Yields:
+    - dict: An object with its sky-index attributes.
+    """
+    for ngc in range(start, stop):
+        ra = rng.uniform(0, 360)
+        dec = math.degrees(math.asin(rng.uniform(-1, 1)))
+        yield {
+            "ngc": {"N": str(ngc)},
+            "ra": {"N": f"{ra:.4f}"},
+            "dec": {"N": f"{dec:.4f}"},
+            "skyBand": {"N": str(sky_index(dec)["skyBand"])}
+        }
+
+def benchmark(sizes=(1000, 10000, 100000), queries=20, radius=1.0):
+    """
+    Times cone searches through the sky index and full scans on a local
+    table as it grows, and prints the mean time and objects read of each.
+    
+    Parameters:
+    - sizes (tuple): The numbers of objects to measure at, in increasing order.
+    - queries (int): The number of random cone searches at each size.
+    - radius (float): The radius of the cone searches, in degrees.
+    """
+    name = "beyond-objects-benchmark"
+    harness.create_table(name, "ngc", {"ngc": "N", "skyBand": "N", "ra": "N"}, [(SKY_INDEX, "skyBand", "ra")])
+    rng = random.Random(0)
+    client = aws.client("dynamodb")
+    def full_scan():
+        kwargs = {}
+        count = 0
+        while True:
+            response = client.scan(TableName=name, **kwargs)
+            count += response["Count"]
+            if "LastEvaluatedKey" not in response:
+                return count
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    try:
+        seeded = 1
+        print(f"mean of {queries} cone searches of {radius:g} degrees:")
+        for size in sizes:
+            harness.seed(name, sample_objects(seeded, size + 1, rng))
+            seeded = size + 1
+            candidates = 0
+            started = time.perf_counter()
+            for _ in range(queries):
+                ra, dec = rng.uniform(0, 360), math.degrees(math.asin(rng.uniform(-1, 1)))
+                for key_range in cone_ranges(ra, dec, radius):
+                    candidates += len(query_range(name, *key_range))
+            search = (time.perf_counter() - started) / queries * 1000
+            started = time.perf_counter()
+            scanned = full_scan()
+            scan = (time.perf_counter() - started) * 1000
+            print(f"  {size:>7} objects  cone {search:8.2f} ms {candidates / queries:8.1f} read  scan {scan:10.2f} ms {scanned:8d} read")
+    finally:
+        harness.drop_table(name)
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,66 @@
+"""
+Benchmarks user lookups with GetItem against the filtered scan they
+replaced, on a local table as it grows:
+    python benchmarks/users.py
+"""
+import random
+import time
+import harness
+from beyond import aws
+from beyond import users
+
+def scan_user(table, email):
+    """
+    Finds a user with a filtered scan of the whole table, as user lookups
+    did before they used GetItem.
+    
+    Parameters:
+    - table (Table): The beyond-users table.
+    - email (str): The email to look for.
+    
+    Returns:
+    - dict: The user, or None if no user has this email.
+    """
+    kwargs = {"FilterExpression": "email = :email", "ExpressionAttributeValues": {":email": email}}
+    while True:
+        response = table.scan(**kwargs)
+        if response["Items"]:
+            return response["Items"][0]
+        if "LastEvaluatedKey" not in response:
+            return None
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+def benchmark(sizes=(1000, 10000, 100000), lookups=100, scans=3):
+    """
+    Times user lookups with GetItem and with the old filtered scan on a
+    local table as it grows, and prints the mean time of each.
+    
+    Parameters:
+    - sizes (tuple): The numbers of users to measure at, in increasing order.
+    - lookups (int): The number of GetItem lookups at each size.
+    - scans (int): The number of scan lookups at each size.
+    """
+    table = aws.table("beyond-users-benchmark")
+    harness.create_table(table.name, "email", {"email": "S"})
+    try:
+        seeded = 0
+        print(f"mean of {lookups} GetItem and {scans} scan lookups:")
+        for size in sizes:
+            harness.seed(table.name, (
+                {"email": {"S": f"user{i}@example.com"}, "username": {"S": f"user{i}"}, "password": {"S": "x" * 60}}
+                for i in range(seeded, size)
+            ))
+            seeded = size
+            results = []
+            for lookup, count in ((users.get_user, lookups), (scan_user, scans)):
+                started = time.perf_counter()
+                for _ in range(count):
+                    users.request_cache.clear()
+                    lookup(table, f"user{random.randrange(size)}@example.com")
+                results.append((time.perf_counter() - started) / count * 1000)
+            print(f"  {size:>7} users  GetItem {results[0]:8.2f} ms  scan {results[1]:10.2f} ms")
+    finally:
+        harness.drop_table(table.name)
+
+if __name__ == "__main__":
+    benchmark()
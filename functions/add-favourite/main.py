@@ -1,31 +1,11 @@
 import json
-import boto3
-import decimal
-from botocore.exceptions import ClientError
+from beyond import aws
+from beyond import favourites
+from beyond.response import compressed
 
-# Initialize a DynamoDB resource using the boto3 library.
-dynamodb_resource = boto3.resource("dynamodb")
 # Connect to the specific DynamoDB table we're working with.
-table = dynamodb_resource.Table("beyond-users")
-def email_exists(email):
-    """
-    Checks if an email already exists in the DynamoDB table.
-    
-    Parameters:
-    - email (str): The email to check in the database.
-    
-    Returns:
-    - bool: True if the email exists, False otherwise.
-    """
-    try:
-        response = table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('email').eq(str(email))
-        )
-        return len(response['Items']) > 0
-    except ClientError as e:
-        print(f"Error querying DynamoDB for email: {e}")
-        return False
-
+table = aws.table("beyond-users")
+@compressed
 def lambda_handler(event, context):
     """
     Handles incoming HTTP requests to the lambda function.
@@ -57,50 +37,29 @@ def lambda_handler(event, context):
                 "body": json.dumps({"error": "Missing required fields"})
             }
         
-        # Check if the email already exists in the database.
-        if not email_exists(email):
-            return {
-                "statusCode": 404,
-                "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Email does not exist"})
-            }
-        
-        # Get the user's current favourites.
+        # Add the new favourite to the user's list.
         try:
-            response = table.get_item(
-                Key={"email": email}
-            )
-            user = response.get("Item", {})
-            favourites = user.get("favourites", [])
+            # Add it with a single conditional write to the favourites set.
+            result = favourites.add_favourite(table, email, ngc)
         except Exception as e:
             return {
                 "statusCode": 400,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": f"Failed to get user: {str(e)}"})
+                "body": json.dumps({"error": f"Failed to update user: {str(e)}"})
             }
-
-        # Add the new favourite to the user's list.
-        try:
-            if ngc in favourites:
-                return {
-                    "statusCode": 400,
-                    "headers": {"Content-Type": "application/json"},
-                    "body": json.dumps({"error": "Favourite already exists"})
-                }
-            favourites.append(ngc)
-            table.update_item(
-                Key={"email": email},
-                UpdateExpression="SET favourites = :f",
-                ExpressionAttributeValues={":f": favourites}
-            )
-        except Exception as e:
+        if result == "not_found":
+            return {
+                "statusCode": 404,
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps({"error": "Email does not exist"})
+            }
+        if result == "exists":
             return {
                 "statusCode": 400,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": f"Failed to update user: {str(e)}"})
+                "body": json.dumps({"error": "Favourite already exists"})
             }
 
-        
         return {
             "statusCode": 200,
             "headers": {"Content-Type": "application/json"},
@@ -0,0 +1,135 @@
+import gzip
+import os
+from beyond import aws
+from beyond import catalog
+from beyond import fastjson
+
+# Connect to the specific DynamoDB table we're working with.
+table = aws.table("beyond-objects")
+
+# Columns written to the snapshot, matching the default get-all-objects listing.
+SNAPSHOT_FIELDS = ["ngc", "constellation", "ra", "dec", "magnitude"]
+# Columns written to the names snapshot that search-names builds its index from.
+NAMES_FIELDS = ["ngc", "name", "type", "magnitude"]
+# Where the snapshot is stored, e.g. "s3://bucket/catalog.json.gz" or "file:///tmp/catalog.json".
+SNAPSHOT_STORE = os.environ.get("SNAPSHOT_STORE", "")
+# Where the names snapshot is stored, in the same format. Optional.
+NAMES_SNAPSHOT_STORE = os.environ.get("NAMES_SNAPSHOT_STORE", "")
+# Endpoint of an S3 compatible service to use instead of AWS S3. Optional.
+SNAPSHOT_ENDPOINT_URL = os.environ.get("SNAPSHOT_ENDPOINT_URL") or None
+# Whether the snapshot is gzip compressed before it is stored.
+SNAPSHOT_GZIP = os.environ.get("SNAPSHOT_GZIP", "true").lower() == "true"
+
+def scan_catalog(columns=SNAPSHOT_FIELDS):
+    """
+    Reads every object in the table with the given columns, with numbers
+    decoded to int and float as get-all-objects does.
+    
+    Parameters:
+    - columns (list): The columns to read. Defaults to SNAPSHOT_FIELDS.
+    
+    Returns:
+    - list: All objects in the table, sorted by NGC.
+    """
+    names = {f"#{column}": column for column in columns}
+    kwargs = {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names
+    }
+    client = aws.client("dynamodb")
+    items = []
+    while True:
+        response = client.scan(TableName=table.name, **kwargs)
+        items.extend(fastjson.items(response["Items"]))
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    items.sort(key=lambda item: item["ngc"])
+    return items
+
+def write_snapshot(store, objects, columns, version, compress):
+    """
+    Serializes the given columns of every object and stores the result.
+    
+    The body is encoded like the get-all-objects listing, with the keys in
+    column order and compact fastjson output, so both have the same ETag.
+    
+    Parameters:
+    - store (LocalSnapshotStore or S3SnapshotStore): Where to write the snapshot.
+    - objects (list): The objects read by scan_catalog.
+    - columns (list): The columns to keep.
+    - version (int): The catalog version the objects were read at.
+    - compress (bool): Whether to gzip the snapshot.
+    
+    Returns:
+    - int: The stored size of the snapshot.
+    """
+    rows = [{column: item[column] for column in columns if column in item} for item in objects]
+    data = fastjson.dumps(rows).encode("utf-8")
+    if compress:
+        data = gzip.compress(data, mtime=0)
+    store.write(data, version, compress)
+    return len(data)
+
+def build_snapshot(store, compress=SNAPSHOT_GZIP, names_store=None):
+    """
+    Materializes the catalog into a pre-serialized snapshot and stores it.
+    
+    The version is read before the scan, so a write that lands during the
+    scan leaves the snapshot marked as stale until the next rebuild.
+    
+    Parameters:
+    - store (LocalSnapshotStore or S3SnapshotStore): Where to write the snapshot.
+    - compress (bool): Whether to gzip the snapshot.
+    - names_store (LocalSnapshotStore or S3SnapshotStore): Where to write the
+      names snapshot, from the same scan. Optional.
+    
+    Returns:
+    - dict: The catalog version, object count and stored size of the snapshot.
+    """
+    version = catalog.get_catalog_version()
+    if version is None:
+        raise RuntimeError("Could not read the catalog version")
+    columns = SNAPSHOT_FIELDS
+    if names_store:
+        columns = list(dict.fromkeys(SNAPSHOT_FIELDS + NAMES_FIELDS))
+    objects = scan_catalog(columns)
+    result = {"version": version, "objects": len(objects)}
+    result["bytes"] = write_snapshot(store, objects, SNAPSHOT_FIELDS, version, compress)
+    if names_store:
+        result["namesBytes"] = write_snapshot(names_store, objects, NAMES_FIELDS, version, compress)
+    return result
+
+def lambda_handler(event, context):
+    """
+    Rebuilds the catalog snapshot. Invoked asynchronously by create-object
+    and delete-object after they change the catalog.
+    
+    Parameters:
+    - event (dict): The invocation event (unused in this function).
+    - context: The runtime information of the Lambda function (unused in this function).
+    
+    Returns:
+    - dict: A response object with statusCode and body.
+    """
+    print(event)  # Log the incoming event for debugging.
+    try:
+        store = catalog.snapshot_store(SNAPSHOT_STORE, SNAPSHOT_ENDPOINT_URL)
+        if store is None:
+            return {
+                "statusCode": 400,
+                "body": fastjson.dumps({"error": "SNAPSHOT_STORE is not configured"})
+            }
+        names_store = catalog.snapshot_store(NAMES_SNAPSHOT_STORE, SNAPSHOT_ENDPOINT_URL)
+        result = build_snapshot(store, names_store=names_store)
+        print(f"Snapshot built: {result}")
+        return {
+            "statusCode": 200,
+            "body": fastjson.dumps(result)
+        }
+    except Exception as e:
+        print(f"Error building snapshot: {e}")
+        return {
+            "statusCode": 500,
+            "body": fastjson.dumps({"error": f"Failed to build snapshot: {e}"})
+        }
@@ -1,32 +1,220 @@
 import json
-import boto3
+import base64
+import csv
+import io
+import os
+import time
 import decimal
+from botocore.exceptions import ClientError
+from beyond import aws
+from beyond import catalog
+from beyond.batch import BATCH_GET_SIZE, batch_get, batch_write, chunked
+from beyond.response import compressed
+from beyond.sky import sky_index
 
-# Initialize a DynamoDB resource using the boto3 library.
-dynamodb_resource = boto3.resource("dynamodb")
 # Connect to the specific DynamoDB table we're working with.
-table = dynamodb_resource.Table("beyond-objects")
+table = aws.table("beyond-objects")
 
-def exists(ngc):
+# Number of BatchWriteItem chunks written concurrently during a bulk import.
+IMPORT_WORKERS = int(os.environ.get("IMPORT_WORKERS", "4"))
+# Content types accepted for bulk imports, and the format they hold.
+IMPORT_FORMATS = {"text/csv": "csv", "application/x-ndjson": "jsonl", "application/jsonl": "jsonl"}
+# Largest number of invalid rows listed in an import report.
+MAX_REPORTED_ERRORS = 100
+
+def build_item(ngc, name, type, constellation, ra, dec, magnitude, collection):
+    """
+    Builds the item stored in the DynamoDB table for an object.
+    
+    Parameters:
+    - ngc (int): The NGC number of the object.
+    - name (str): The name of the object.
+    - type (str): The type of the object.
+    - constellation (str): The constellation the object is in.
+    - ra (Decimal): The right ascension of the object.
+    - dec (Decimal): The declination of the object.
+    - magnitude (Decimal): The magnitude of the object.
+    - collection (str): The collection the object belongs to.
+    
+    Returns:
+    - dict: The item to put in the table, with its sky-index attributes.
+    """
+    return {
+        "ngc": ngc,
+        "name": name,
+        "type": type,
+        "constellation": constellation,
+        "ra": ra,
+        "dec": dec,
+        "magnitude": magnitude,
+        "collection": collection,
+        **sky_index(dec)
+    }
+
+def validate_object(row):
+    """
+    Validates an imported row and converts it into a table item.
+    
+    Parameters:
+    - row (dict): The row, with every field as read from CSV or JSONL.
+    
+    Returns:
+    - dict: The item to put in the table.
+    
+    Raises:
+    - ValueError: If a field is missing or invalid.
+    """
+    for field in ("ngc", "name", "type", "constellation", "ra", "dec", "magnitude", "collection"):
+        if row.get(field) in (None, ""):
+            raise ValueError(f"Missing field: {field}")
+    try:
+        ngc = int(row["ngc"])
+    except (TypeError, ValueError):
+        raise ValueError("Invalid field: ngc")
+    if ngc < 1:
+        raise ValueError("Invalid field: ngc")
+    numbers = {}
+    for field in ("ra", "dec", "magnitude"):
+        try:
+            numbers[field] = decimal.Decimal(str(row[field]).strip())
+        except decimal.InvalidOperation:
+            raise ValueError(f"Invalid field: {field}")
+        if not numbers[field].is_finite():
+            raise ValueError(f"Invalid field: {field}")
+    return build_item(
+        ngc,
+        str(row["name"]).strip(),
+        str(row["type"]).strip(),
+        str(row["constellation"]).strip(),
+        numbers["ra"],
+        numbers["dec"],
+        numbers["magnitude"],
+        str(row["collection"]).strip()
+    )
+
+def read_rows(lines, format):
+    """
+    Generator that reads rows from CSV (with a header line) or JSONL input.
+    
+    Parameters:
+    - lines (iterable): The lines of the input.
+    - format (str): "csv" or "jsonl".
+    
+    Yields:
+    - tuple: (line_number, row), where row is a dict, or None if the line
+      could not be parsed.
+    """
+    if format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+def import_objects(lines, format, workers=IMPORT_WORKERS, notify=True, upsert=False):
+    """
+    Streams CSV or JSONL input through validation into the table with
+    batched writes.
+    
+    Rows are validated lazily and written in chunks of 25, so the input is
+    never held in memory, apart from the NGCs seen so far. An NGC repeated
+    anywhere in the input keeps its first row and the later rows are counted
+    as duplicates, so chunks written concurrently never race for the same
+    key. Like a single create, an import never replaces an existing object
+    unless upsert is set: NGCs already in the table are looked up before
+    each chunk is written, and counted as duplicates.
+    
+    Parameters:
+    - lines (iterable): The lines of the input.
+    - format (str): "csv" or "jsonl".
+    - workers (int): The number of chunks to write concurrently.
+    - notify (bool): Whether to invalidate cached catalogs and rebuild the
+      snapshot after writing.
+    - upsert (bool): Whether to replace existing objects with the same NGC.
+    
+    Returns:
+    - dict: A summary report of the import.
+    """
+    report = {"read": 0, "written": 0, "invalid": 0, "duplicates": 0, "unprocessed": 0, "errors": []}
+    started = time.monotonic()
+    client = aws.resource_client("dynamodb")
+    def valid_items():
+        seen = set()
+        for line_number, row in read_rows(lines, format):
+            report["read"] += 1
+            try:
+                if row is None:
+                    raise ValueError("Could not parse line")
+                item = validate_object(row)
+            except ValueError as e:
+                report["invalid"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append({"line": line_number, "error": str(e)})
+                continue
+            if item["ngc"] in seen:
+                report["duplicates"] += 1
+                continue
+            seen.add(item["ngc"])
+            yield item
+    def new_items(items):
+        for chunk in chunked(items, BATCH_GET_SIZE):
+            keys = [{"ngc": item["ngc"]} for item in chunk]
+            existing = {int(found["ngc"]) for found in batch_get(client, table.name, keys, projection=["ngc"])}
+            for item in chunk:
+                if item["ngc"] in existing:
+                    report["duplicates"] += 1
+                else:
+                    yield item
+    items = valid_items() if upsert else new_items(valid_items())
+    requests = ({"PutRequest": {"Item": item}} for item in items)
+    written, unprocessed = batch_write(client, table.name, requests, workers)
+    report["written"] = written
+    report["unprocessed"] = len(unprocessed)
+    report["seconds"] = round(time.monotonic() - started, 3)
+    report["rowsPerSecond"] = round(written / report["seconds"], 1) if report["seconds"] else written
+    if written and notify:
+        catalog.bump_catalog_version()
+        catalog.request_snapshot_rebuild()
+    return report
+
+def import_response(event, format):
     """
-    Checks if an object exists in the DynamoDB table.
+    Builds the response for a bulk import request. Existing objects are
+    only replaced when the request has upsert=true.
     
     Parameters:
-    - ngc (int): The NGC number to check in the database.
+    - event (dict): The event dict containing the CSV or JSONL body.
+    - format (str): "csv" or "jsonl".
     
     Returns:
-    - bool: True if the object exists, False otherwise.
+    - dict: A response object with statusCode and body.
     """
+    body = event.get("body") or ""
+    if event.get("isBase64Encoded"):
+        body = base64.b64decode(body).decode("utf-8")
+    upsert = str((event.get("queryStringParameters") or {}).get("upsert", "")).lower() == "true"
     try:
-        response = table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('ngc').eq(ngc)
-        )
-        print(response)
-        return len(response['Items']) > 0
+        report = import_objects(io.StringIO(body), format, upsert=upsert)
     except Exception as e:
-        print(f"Error querying DynamoDB: {e}")
-        return False
+        return {
+            "statusCode": 500,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": f"Failed to import objects: {e}"})
+        }
+    return {
+        "statusCode": 200 if report["written"] or not report["read"] else 400,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps(report)
+    }
 
+@compressed
 def lambda_handler(event, context):
     """
     Handles incoming HTTP requests to the lambda function.
@@ -43,6 +231,11 @@ def lambda_handler(event, context):
     print(http_method)
 
     if http_method == "post":
+        # CSV and JSONL bodies are bulk imports of many objects.
+        content_type = (event.get("headers") or {}).get("content-type", "").split(";")[0].strip().lower()
+        if content_type in IMPORT_FORMATS:
+            return import_response(event, IMPORT_FORMATS[content_type])
+
         # Query all objects from the database.
         query = json.loads(event["body"])
         
@@ -64,32 +257,25 @@ def lambda_handler(event, context):
                 "body": json.dumps({"error": "Missing required fields"})
             }
         
-        # Check if the object already exists.
-        if exists(ngc):
-            return {
-                "statusCode": 400,
-                "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Object with this NGC already exists"})
-            }
-        
-        # Attempt to create the object and respond accordingly.
+        # Attempt to create the object and respond accordingly. The put is
+        # conditional, so an existing object is never replaced.
         try:
             print(f"Creating object with NGC: {ngc}")
             table.put_item(
-                Item={
-                    "ngc": ngc,
-                    "name": name,
-                    "type": type,
-                    "constellation": constellation,
-                    "ra": ra,
-                    "dec": dec,
-                    "magnitude": magnitude,
-                    "collection": collection
-                }
+                Item=build_item(ngc, name, type, constellation, ra, dec, magnitude, collection),
+                ConditionExpression="attribute_not_exists(ngc)"
             )
             print("Object created successfully")
+            catalog.bump_catalog_version()
+            catalog.request_snapshot_rebuild()
             response = {"message": "Object created successfully"}
         except Exception as e:
+            if isinstance(e, ClientError) and e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": json.dumps({"error": "Object with this NGC already exists"})
+                }
             response = {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
@@ -107,4 +293,4 @@ def lambda_handler(event, context):
             "statusCode": 405,
             "headers": {"Content-Type": "application/json"},
             "body": json.dumps({"error": "Method not allowed"})
-        }
\ No newline at end of file
+        }
@@ -1,66 +1,14 @@
 import json
-import boto3
 from botocore.exceptions import ClientError
-import bcrypt
+from beyond import aws
+from beyond import usernames
+from beyond.passwords import hash_password
+from beyond.response import compressed
+from beyond.sessions import new_session_version
+from beyond.users import redacted
 
-# Initialize a DynamoDB resource using the boto3 library.
-dynamodb_resource = boto3.resource("dynamodb")
 # Connect to the specific DynamoDB table we're working with.
-table = dynamodb_resource.Table("beyond-users")
-
-def email_exists(email):
-    """
-    Checks if an email already exists in the DynamoDB table.
-    
-    Parameters:
-    - email (str): The email to check in the database.
-    
-    Returns:
-    - bool: True if the email exists, False otherwise.
-    """
-    try:
-        response = table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('email').eq(str(email))
-        )
-        return len(response['Items']) > 0
-    except ClientError as e:
-        print(f"Error querying DynamoDB for email: {e}")
-        return False
-
-def username_exists(username):
-    """
-    Checks if a username already exists in the DynamoDB table.
-    
-    Parameters:
-    - username (str): The username to check in the database.
-    
-    Returns:
-    - bool: True if the username exists, False otherwise.
-    """
-    try:
-        response = table.scan(
-            FilterExpression=boto3.dynamodb.conditions.Attr('username').eq(str(username))
-        )
-        return len(response['Items']) > 0
-    except ClientError as e:
-        print(f"Error querying DynamoDB for username: {e}")
-        return False
-
-def hash_password(password, rounds=5):
-    """
-    Hashes a password using bcrypt with a specified number of rounds.
-    
-    Parameters:
-    - password (str): The password to hash.
-    - rounds (int): The number of rounds for the hashing algorithm. Default is 5.
-    
-    Returns:
-    - str: The hashed password.
-    """
-    if password:
-        salt = bcrypt.gensalt(rounds=rounds)
-        return bcrypt.hashpw(password.encode(), salt).decode()
-    return None
+table = aws.table("beyond-users")
 
 def create_user(email, username, password, firstName, lastName, isGoogle):
     """
@@ -77,26 +25,24 @@ def create_user(email, username, password, firstName, lastName, isGoogle):
     Returns:
     - bool: True if the user was created successfully, False otherwise.
     """
-    if not email_exists(email) and not username_exists(username):
-        try:
-            table.put_item(
-                Item={
-                    'email': str(email),
-                    'username': str(username),
-                    'password': str(password),
-                    'firstName': str(firstName),
-                    'lastName': str(lastName),
-                    'isGoogle': bool(isGoogle),
-                    'profilePic': ''
-                },
-                ConditionExpression='attribute_not_exists(username)'  # Ensures username does not already exist.
-            )
-            return True
-        except ClientError as e:
-            print(f"Error creating user in DynamoDB: {e}")
-            return False
-    return False
+    try:
+        # Create the user and reserve the username in one transaction, which
+        # fails if either the email or the username is already taken.
+        return usernames.create_user(table, {
+            'email': str(email),
+            'username': str(username),
+            'password': str(password),
+            'firstName': str(firstName),
+            'lastName': str(lastName),
+            'isGoogle': bool(isGoogle),
+            'profilePic': '',
+            'sessionVersion': new_session_version()
+        })
+    except ClientError as e:
+        print(f"Error creating user in DynamoDB: {e}")
+        return False
 
+@compressed
 def lambda_handler(event, context):
     """
     Handles incoming HTTP requests to the lambda function.
@@ -108,7 +54,7 @@ def lambda_handler(event, context):
     Returns:
     - dict: A response object with statusCode and body.
     """
-    print(event)
+    print(redacted(event))
     http_method = event["requestContext"]["http"]["method"].lower()
 
     if http_method == "post":  # Handle user creation requests.
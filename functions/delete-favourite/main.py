@@ -1,33 +1,13 @@
 import json
-from urllib.parse import parse_qs
-import boto3
 import decimal
-from botocore.exceptions import ClientError
+from beyond import aws
+from beyond import favourites
+from beyond.response import compressed
 
-# Initialize a DynamoDB resource using the boto3 library.
-dynamodb_resource = boto3.resource("dynamodb")
 # Connect to the specific DynamoDB table we're working with.
-table = dynamodb_resource.Table("beyond-users")
-
-def exists(email):
-    """
-    Checks if an email exists in the DynamoDB table.
-    
-    Parameters:
-    - email (str): The email to check in the database.
-    
-    Returns:
-    - bool: True if the email exists, False otherwise.
-    """
-    try:
-        response = table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('email').eq(str(email))
-        )
-        return len(response['Items']) > 0
-    except ClientError as e:
-        print(f"Error querying DynamoDB: {e}")
-        return False
+table = aws.table("beyond-users")
 
+@compressed
 def lambda_handler(event, context):
     """
     Handles incoming HTTP requests to the lambda function.
@@ -54,37 +34,23 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Email parameter is missing'})
             }
 
-        # Verify that the email exists before attempting to delete.
-        if not exists(email):  # Corrected to access the first item of the list.
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'error': 'User not found'})  # Email not found
-            }
-
-        # Attempt to delete the favourite from the user's list.
+        # Attempt to delete the favourite with a single conditional write to the favourites set.
         try:
-            response = table.get_item(
-                Key={"email": email}
-            )
-            user = response.get("Item", {})
-            favourites = user.get("favourites", [])
-            print(favourites)
-            if ngc in favourites:
-                favourites.remove(ngc)
-                table.update_item(
-                    Key={"email": email},
-                    UpdateExpression="SET favourites = :f",
-                    ExpressionAttributeValues={":f": favourites}
-                )
+            result = favourites.remove_favourite(table, email, ngc)
+            if result == "not_found":
                 return {
-                    'statusCode': 200,
-                    'body': json.dumps({'message': 'Favourite deleted successfully'})
+                    'statusCode': 404,
+                    'body': json.dumps({'error': 'User not found'})  # Email not found
                 }
-            else:
+            if result == "missing":
                 return {
                     'statusCode': 404,
                     'body': json.dumps({'error': 'Favourite not found'})
                 }
+            return {
+                'statusCode': 200,
+                'body': json.dumps({'message': 'Favourite deleted successfully'})
+            }
         except Exception as e:
             return {
                 'statusCode': 500,
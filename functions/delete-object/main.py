@@ -1,33 +1,173 @@
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import parse_qs
-import boto3
 from botocore.exceptions import ClientError
 from decimal import Decimal
+from beyond import aws
+from beyond import catalog
+from beyond.batch import batch_write
+from beyond.response import compressed
 
-# Initialize a DynamoDB resource using the boto3 library.
-dynamodb_resource = boto3.resource("dynamodb")
 # Connect to the specific DynamoDB table we're working with.
-table = dynamodb_resource.Table("beyond-objects")
+table = aws.table("beyond-objects")
 
-def exists(ngc):
+# Largest number of NGCs a client can delete by list in one request.
+MAX_BATCH_OBJECTS = int(os.environ.get("MAX_BATCH_OBJECTS", "500"))
+# Number of deletes or BatchWriteItem chunks run concurrently.
+DELETE_WORKERS = int(os.environ.get("DELETE_WORKERS", "8"))
+# Attributes a catalog prune can select objects by, and the keys-only GSI
+# keyed on each.
+PRUNE_FIELDS = {"collection": "collection-index", "type": "type-index"}
+
+def delete_object(ngc):
     """
-    Checks if an email exists in the DynamoDB table.
+    Deletes an object with a conditional delete, so no existence check is
+    needed first.
     
     Parameters:
-    - email (str): The email to check in the database.
+    - ngc (Decimal): The NGC of the object to delete.
     
     Returns:
-    - bool: True if the email exists, False otherwise.
+    - str: "deleted", or "not_found" if there was no such object.
+    
+    Raises:
+    - ClientError: If DynamoDB fails for any other reason.
     """
     try:
-        response = table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('ngc').eq(ngc)
+        aws.resource_client("dynamodb").delete_item(
+            TableName=table.name,
+            Key={'ngc': ngc},
+            ConditionExpression='attribute_exists(ngc)'
         )
-        return len(response['Items']) > 0
+        return "deleted"
     except ClientError as e:
-        print(f"Error querying DynamoDB: {e}")
-        return False
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return "not_found"
+
+def delete_objects(ngcs):
+    """
+    Deletes a list of objects with concurrent conditional deletes, reporting
+    the outcome for every NGC.
+    
+    Parameters:
+    - ngcs (list): The NGCs of the objects to delete, without duplicates.
+    
+    Returns:
+    - dict: "deleted", "not_found" or "failed" for every NGC.
+    """
+    def outcome(ngc):
+        try:
+            return delete_object(ngc)
+        except ClientError as e:
+            print(f"Error deleting item from DynamoDB: {e}")
+            return "failed"
+    with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+        return dict(zip(ngcs, executor.map(outcome, ngcs)))
 
+def find_prune_targets(field, value):
+    """
+    Finds every object whose field has the given value, e.g. a whole
+    collection or type, by querying the GSI keyed on that field.
+    
+    Parameters:
+    - field (str): The attribute to select by, one of PRUNE_FIELDS.
+    - value (str): The value to select.
+    
+    Returns:
+    - list: The NGCs of the matching objects.
+    """
+    kwargs = {
+        "IndexName": PRUNE_FIELDS[field],
+        "KeyConditionExpression": "#field = :value",
+        "ProjectionExpression": "ngc",
+        "ExpressionAttributeNames": {"#field": field},
+        "ExpressionAttributeValues": {":value": value}
+    }
+    ngcs = []
+    while True:
+        response = table.query(**kwargs)
+        ngcs.extend(item["ngc"] for item in response["Items"])
+        if "LastEvaluatedKey" not in response:
+            return ngcs
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+def prune_objects(ngcs):
+    """
+    Deletes the objects found by find_prune_targets with batched writes.
+    
+    Parameters:
+    - ngcs (list): The NGCs of the objects to delete.
+    
+    Returns:
+    - dict: "deleted" or "failed" for every NGC.
+    """
+    requests = ({"DeleteRequest": {"Key": {"ngc": ngc}}} for ngc in ngcs)
+    _, unprocessed = batch_write(aws.resource_client("dynamodb"), table.name, requests, DELETE_WORKERS)
+    failed = {request["DeleteRequest"]["Key"]["ngc"] for request in unprocessed}
+    return {ngc: "failed" if ngc in failed else "deleted" for ngc in ngcs}
+
+def parse_ngcs(values):
+    """
+    Parses the NGCs to delete from the query string or request body.
+    
+    Parameters:
+    - values (list): NGC numbers or comma separated strings of them.
+    
+    Returns:
+    - list: The NGCs, in the requested order and without duplicates.
+    
+    Raises:
+    - ValueError: If an NGC is invalid or too many were given.
+    """
+    ngcs = []
+    for value in values:
+        ngcs.extend(str(value).split(","))
+    if len(ngcs) > MAX_BATCH_OBJECTS:
+        raise ValueError(f"At most {MAX_BATCH_OBJECTS} objects can be deleted at once")
+    try:
+        return list(dict.fromkeys(Decimal(int(ngc.strip())) for ngc in ngcs))
+    except ValueError:
+        raise ValueError("Invalid NGC parameter")
+
+def is_signed(event):
+    """
+    Checks whether a request came through the prune URL, which only accepts
+    requests signed with IAM credentials.
+    
+    Parameters:
+    - event (dict): The event dict containing the request context.
+    
+    Returns:
+    - bool: True if the request was authorized with IAM, False otherwise.
+    """
+    return bool((event["requestContext"].get("authorizer") or {}).get("iam"))
+
+def batch_delete_response(results):
+    """
+    Builds the response for a batch delete, and invalidates the catalog if
+    anything was deleted.
+    
+    Parameters:
+    - results (dict): The outcome for every NGC.
+    
+    Returns:
+    - dict: A response object with statusCode and body.
+    """
+    if "deleted" in results.values():
+        catalog.bump_catalog_version()
+        catalog.request_snapshot_rebuild()
+    return {
+        'statusCode': 200,
+        'headers': {"Content-Type": "application/json"},
+        'body': json.dumps({
+            'deleted': sum(1 for result in results.values() if result == "deleted"),
+            'results': [{'ngc': int(ngc), 'result': result} for ngc, result in results.items()]
+        })
+    }
+
+@compressed
 def lambda_handler(event, context):
     """
     Handles incoming HTTP requests to the lambda function.
@@ -44,31 +184,92 @@ def lambda_handler(event, context):
     if http_method == "delete":  # Handle delete requests.
         print(event)
         query = parse_qs(event["rawQueryString"])
-        ngc = Decimal(query.get('ngc')[0])
 
         print(query)
 
-        # Check if the email parameter was provided.
-        if not ngc:
+        # Delete every object in a collection or of a type. Prunes are only
+        # accepted through the signed prune URL. A dry run only counts the
+        # matches, and a prune must confirm how many it deletes.
+        prune = [field for field in PRUNE_FIELDS if query.get(field)]
+        if prune:
+            if not is_signed(event):
+                return {
+                    'statusCode': 403,
+                    'body': json.dumps({'error': 'Prunes must be sent to the signed prune URL'})
+                }
+            if len(prune) > 1 or query.get('ngc'):
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'Select objects by one of ngc, collection or type'})
+                }
+            dry_run = query.get('dryRun', ['false'])[0].lower() == 'true'
+            confirm = query.get('confirm', [''])[0]
+            if not dry_run and not confirm.isdigit():
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'Pass confirm with the number of objects to delete, or dryRun=true to count them'})
+                }
+            try:
+                ngcs = find_prune_targets(prune[0], query.get(prune[0])[0])
+                if dry_run:
+                    return {
+                        'statusCode': 200,
+                        'headers': {"Content-Type": "application/json"},
+                        'body': json.dumps({'matched': len(ngcs), 'ngcs': sorted(int(ngc) for ngc in ngcs)})
+                    }
+                if int(confirm) != len(ngcs):
+                    return {
+                        'statusCode': 409,
+                        'body': json.dumps({'error': 'confirm does not match the number of objects', 'matched': len(ngcs)})
+                    }
+                results = prune_objects(ngcs)
+            except ClientError as e:
+                print(f"Error pruning items from DynamoDB: {e}")
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'Failed to delete objects'})
+                }
+            return batch_delete_response(results)
+
+        # NGCs can also be sent as a list in the request body.
+        values = query.get('ngc', [])
+        if event.get("body"):
+            try:
+                body = json.loads(event["body"]).get('ngc', [])
+                values += body if isinstance(body, list) else [body]
+            except (ValueError, AttributeError):
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'Invalid request body'})
+                }
+        try:
+            ngcs = parse_ngcs(values)
+        except ValueError as e:
             return {
                 'statusCode': 400,
-                'body': json.dumps({'error': 'NGC parameter is missing'})
+                'body': json.dumps({'error': str(e)})
             }
 
-        # Verify that the email exists before attempting to delete.
-        if not exists(ngc): 
+        # Check if the NGC parameter was provided.
+        if not ngcs:
             return {
-                'statusCode': 404,
-                'body': json.dumps({'error': 'Object not found'}) 
+                'statusCode': 400,
+                'body': json.dumps({'error': 'NGC parameter is missing'})
             }
 
+        if len(ngcs) > 1:
+            # Delete a list of objects, reporting the outcome for each one.
+            return batch_delete_response(delete_objects(ngcs))
+
         try:
             # Attempt to delete the object with the given ngc.
-            response = table.delete_item(
-                Key={
-                    'ngc': ngc,
+            if delete_object(ngcs[0]) == "not_found":
+                return {
+                    'statusCode': 404,
+                    'body': json.dumps({'error': 'Object not found'})
                 }
-            )
+            catalog.bump_catalog_version()
+            catalog.request_snapshot_rebuild()
             return {
                 'statusCode': 200,
                 'body': json.dumps({'message': 'Object deleted successfully'})
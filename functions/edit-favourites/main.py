@@ -0,0 +1,140 @@
+import json
+import os
+from beyond import aws
+from beyond import favourites
+from beyond.batch import batch_get
+from beyond.response import compressed
+
+# Connect to the specific DynamoDB table we're working with.
+table = aws.table("beyond-users")
+# Table the added favourites are validated against.
+objects_table = aws.table("beyond-objects")
+
+# Largest number of favourites a client can change in one request.
+MAX_BATCH_FAVOURITES = int(os.environ.get("MAX_BATCH_FAVOURITES", "500"))
+# Number of BatchGetItem chunks read concurrently.
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "4"))
+
+def parse_ngcs(values):
+    """
+    Parses the list of NGCs from the request body.
+    
+    Parameters:
+    - values (list): The NGC numbers.
+    
+    Returns:
+    - list: The NGCs as integers, in the requested order and without duplicates.
+    
+    Raises:
+    - ValueError: If an NGC is invalid or too many were given.
+    """
+    if not isinstance(values, list) or not values:
+        raise ValueError("NGC list is missing")
+    if len(values) > MAX_BATCH_FAVOURITES:
+        raise ValueError(f"At most {MAX_BATCH_FAVOURITES} favourites can be changed at once")
+    try:
+        return list(dict.fromkeys(int(value) for value in values))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid NGC in list")
+
+def catalog_ngcs(ngcs):
+    """
+    Finds which NGCs exist in beyond-objects with a single batched read of
+    the key attribute.
+    
+    Parameters:
+    - ngcs (list): The NGCs to check.
+    
+    Returns:
+    - set: The NGCs that exist in the catalog.
+    """
+    keys = [{"ngc": ngc} for ngc in ngcs]
+    items = batch_get(aws.resource_client("dynamodb"), objects_table.name, keys, BATCH_WORKERS, ["ngc"])
+    return {int(item["ngc"]) for item in items}
+
+@compressed
+def lambda_handler(event, context):
+    """
+    Handles incoming HTTP requests to the lambda function.
+    
+    Adds or removes many favourites at once. The body holds the user's email,
+    an action of "add" or "remove" and a list of NGCs, and the response
+    reports the outcome for every NGC.
+    
+    Parameters:
+    - event (dict): The event dict containing request parameters and data.
+    - context: The runtime information of the Lambda function (unused in this function).
+    
+    Returns:
+    - dict: A response object with statusCode and body.
+    """
+    print(event)  # Log the incoming event for debugging.
+    http_method = event["requestContext"]["http"]["method"].lower()
+
+    if http_method == "post":
+        query = json.loads(event["body"])
+
+        # Extracting the request details from the request body.
+        email = query.get('email')
+        action = query.get('action')
+
+        # Check if all required fields are present.
+        if not email or action not in ("add", "remove"):
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps({"error": "Missing email or invalid action"})
+            }
+        try:
+            ngcs = parse_ngcs(query.get('ngc'))
+        except ValueError as e:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps({"error": str(e)})
+            }
+
+        try:
+            results = {}
+            changes = ngcs
+            if action == "add":
+                # Only objects that exist in the catalog can be added.
+                valid = catalog_ngcs(ngcs)
+                changes = [ngc for ngc in ngcs if ngc in valid]
+                results = {ngc: "invalid" for ngc in ngcs if ngc not in valid}
+                if not changes:
+                    return {
+                        "statusCode": 400,
+                        "headers": {"Content-Type": "application/json"},
+                        "body": json.dumps({
+                            "error": "None of the NGCs exist in the catalog",
+                            "results": [{"ngc": ngc, "result": "invalid"} for ngc in ngcs]
+                        })
+                    }
+            # Apply every change with a single update expression.
+            outcome = favourites.update_favourites(table, email, changes, action)
+            if outcome is None:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": json.dumps({"error": "Email does not exist"})
+                }
+            results.update(outcome or {})
+        except Exception as e:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps({"error": f"Failed to update favourites: {str(e)}"})
+            }
+
+        return {
+            "statusCode": 200,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"results": [{"ngc": ngc, "result": results[ngc]} for ngc in ngcs]})
+        }
+    else:
+        return {
+            "statusCode": 405,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": "Method not allowed"})
+        }
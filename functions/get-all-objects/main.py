@@ -1,26 +1,405 @@
-import simplejson as json
-import boto3
+import base64
+import gzip
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from beyond import aws
+from beyond import catalog
+from beyond import fastjson
+from beyond import records
+from beyond.response import choose_encoding, compressed
 
-# Initialize a DynamoDB resource using the boto3 library.
-dynamodb_resource = boto3.resource("dynamodb")
 # Connect to the specific DynamoDB table we're working with.
-table = dynamodb_resource.Table("beyond-objects")
+table = aws.table("beyond-objects")
 
-def get_all_objects():
+# Columns a client can select with the fields parameter.
+ALLOWED_FIELDS = ["ngc", "name", "type", "constellation", "ra", "dec", "magnitude", "collection"]
+# Columns returned in the catalog listing when no fields are requested.
+DEFAULT_FIELDS = ["ngc", "constellation", "ra", "dec", "magnitude"]
+# Largest page size a client can request with the limit parameter.
+MAX_PAGE_SIZE = 1000
+# Number of parallel scan segments used for full catalog reads.
+SCAN_SEGMENTS = int(os.environ.get("SCAN_SEGMENTS", "4"))
+# Whether scanned objects are decoded into compact records instead of dicts.
+COMPACT_RECORDS = os.environ.get("COMPACT_RECORDS", "true").lower() == "true"
+
+# Seconds a cached catalog is served before it is read again.
+CACHE_TTL = int(os.environ.get("CACHE_TTL", "300"))
+# Largest number of column selections whose catalog is kept in the cache.
+CATALOG_CACHE_SIZE = int(os.environ.get("CATALOG_CACHE_SIZE", "4"))
+# Where the build-snapshot function stores the catalog snapshot. Optional.
+SNAPSHOT_STORE = os.environ.get("SNAPSHOT_STORE", "")
+# Endpoint of an S3 compatible service to use instead of AWS S3. Optional.
+SNAPSHOT_ENDPOINT_URL = os.environ.get("SNAPSHOT_ENDPOINT_URL") or None
+
+# Catalog listings kept across warm invocations, keyed by the columns read,
+# in least recently used order.
+catalog_cache = OrderedDict()
+# Catalog snapshot loaded into this container, and the version last tried.
+snapshot_state = {"snapshot": None, "tried_version": None, "tried_at": 0}
+
+def encode_token(last_evaluated_key):
+    """
+    Encodes a DynamoDB LastEvaluatedKey into an opaque pagination token.
+    
+    Parameters:
+    - last_evaluated_key (dict): The LastEvaluatedKey returned by a scan, or None.
+    
+    Returns:
+    - str: A URL-safe token, or None if there are no more pages.
+    """
+    if not last_evaluated_key:
+        return None
+    raw = fastjson.dumps(last_evaluated_key).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_token(token):
+    """
+    Decodes a pagination token back into a DynamoDB ExclusiveStartKey.
+    
+    Parameters:
+    - token (str): The token previously returned as nextToken.
+    
+    Returns:
+    - dict: The ExclusiveStartKey to resume the scan from.
+    
+    Raises:
+    - ValueError: If the token is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token.encode("ascii"))
+        key = fastjson.loads(raw)
+    except Exception:
+        raise ValueError("Invalid nextToken")
+    # The table is keyed on the numeric ngc alone, so anything else would
+    # fail inside DynamoDB or the scan.
+    if not isinstance(key, dict) or set(key) != {"ngc"}:
+        raise ValueError("Invalid nextToken")
+    if not isinstance(key["ngc"], int) or isinstance(key["ngc"], bool):
+        raise ValueError("Invalid nextToken")
+    return key
+
+def parse_fields(fields):
+    """
+    Parses the comma separated fields parameter into a list of columns.
+    
+    Parameters:
+    - fields (str): The requested columns, e.g. "ngc,name,magnitude". Optional.
+    
+    Returns:
+    - list: The columns to read in ALLOWED_FIELDS order, so every ordering of
+      the same fields shares one cached catalog, or DEFAULT_FIELDS if none
+      were requested.
+    
+    Raises:
+    - ValueError: If an unknown column is requested.
+    """
+    if not fields:
+        return DEFAULT_FIELDS
+    # The key is always returned so objects can be identified.
+    requested = {"ngc"}
+    for field in fields.split(","):
+        field = field.strip()
+        if field not in ALLOWED_FIELDS:
+            raise ValueError(f"Invalid field: {field}")
+        requested.add(field)
+    return [field for field in ALLOWED_FIELDS if field in requested]
+
+def projection(columns):
+    """
+    Builds the scan arguments that make DynamoDB return only the given columns.
+    
+    Placeholders are used for every column because names such as "name" and
+    "type" are DynamoDB reserved words.
+    
+    Parameters:
+    - columns (list): The columns to read.
+    
+    Returns:
+    - dict: The ProjectionExpression and ExpressionAttributeNames arguments.
+    """
+    names = {f"#{column}": column for column in columns}
+    return {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names
+    }
+
+def scan_pages(columns=None, limit=None, start_key=None, segment=None, total_segments=None):
+    """
+    Generator that scans the table one DynamoDB page at a time.
+    
+    Follows LastEvaluatedKey until the table is exhausted, so the whole
+    table is returned even when it is larger than the 1 MB scan limit.
+    The scan uses the low-level client, which is thread safe, and numbers
+    are decoded straight to int and float instead of Decimal. With
+    COMPACT_RECORDS, objects are decoded into slotted records rather than
+    dicts, which use about half the memory for the cached catalog.
+    
+    Parameters:
+    - columns (list): The columns to read. Defaults to DEFAULT_FIELDS.
+    - limit (int): The maximum number of items to read per page. Optional.
+    - start_key (dict): The ExclusiveStartKey to begin scanning from. Optional.
+    - segment (int): The segment to scan in a parallel scan. Optional.
+    - total_segments (int): The number of segments in a parallel scan. Optional.
+    
+    Yields:
+    - tuple: (items, last_evaluated_key) for every page that was read.
+    """
+    columns = columns or DEFAULT_FIELDS
+    kwargs = projection(columns)
+    if limit:
+        kwargs["Limit"] = limit
+    if start_key:
+        kwargs["ExclusiveStartKey"] = fastjson.serialize_item(start_key)
+    if total_segments:
+        kwargs["Segment"] = segment
+        kwargs["TotalSegments"] = total_segments
+    client = aws.client("dynamodb")
+    while True:
+        response = client.scan(TableName=table.name, **kwargs)
+        last_key = response.get("LastEvaluatedKey")
+        if COMPACT_RECORDS:
+            items = records.decode_items(response["Items"], columns)
+        else:
+            # Keys in column order, so both paths encode to the same body.
+            items = [
+                {column: item[column] for column in columns if column in item}
+                for item in fastjson.items(response["Items"])
+            ]
+        yield items, last_key and fastjson.item(last_key)
+        if not last_key:
+            break
+        kwargs["ExclusiveStartKey"] = last_key
+
+def scan_segment(segment, total_segments, columns=None):
+    """
+    Reads every object in one segment of a parallel scan.
+    
+    Parameters:
+    - segment (int): The segment to scan.
+    - total_segments (int): The number of segments in the scan.
+    - columns (list): The columns to read. Defaults to DEFAULT_FIELDS.
+    
+    Returns:
+    - list: All objects in the segment.
+    """
+    items = []
+    for page, _ in scan_pages(columns, segment=segment, total_segments=total_segments):
+        items.extend(page)
+    return items
+
+def parallel_scan(columns=None, segments=None):
+    """
+    Reads the whole table with a parallel segmented scan.
+    
+    Every segment is scanned on its own thread and the results are merged
+    in NGC order, so the output does not depend on which segment finished
+    first.
+    
+    Parameters:
+    - columns (list): The columns to read. Defaults to DEFAULT_FIELDS.
+    - segments (int): The number of segments to scan. Defaults to SCAN_SEGMENTS.
+    
+    Returns:
+    - list: All objects in the table, sorted by NGC.
+    """
+    segments = segments or SCAN_SEGMENTS
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        results = executor.map(lambda segment: scan_segment(segment, segments, columns), range(segments))
+        items = [item for result in results for item in result]
+    items.sort(key=lambda item: item["ngc"])
+    return items
+
+def iter_all_objects(columns=None):
+    """
+    Generator that streams every object in the table, page by page.
+    
+    Parameters:
+    - columns (list): The columns to read. Defaults to DEFAULT_FIELDS.
+    
+    Yields:
+    - dict: Each object with only the requested columns.
+    """
+    for items, _ in scan_pages(columns):
+        yield from items
+
+def get_objects_page(limit, next_token=None, columns=None):
+    """
+    Queries the DynamoDB table for a single page of objects.
+    
+    Parameters:
+    - limit (int): The maximum number of objects to return.
+    - next_token (str): The token returned by the previous page. Optional.
+    - columns (list): The columns to read. Defaults to DEFAULT_FIELDS.
+    
+    Returns:
+    - dict: The objects on this page and the token for the next one.
+    """
+    try:
+        start_key = decode_token(next_token) if next_token else None
+        items, last_key = next(scan_pages(columns, limit, start_key))
+        return {
+            "objects": items,
+            "nextToken": encode_token(last_key)
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+def get_all_objects(columns=None, segments=None):
     """
     Queries the DynamoDB table for all objects.
     
+    Parameters:
+    - columns (list): The columns to read. Defaults to DEFAULT_FIELDS.
+    - segments (int): The number of parallel scan segments. Defaults to SCAN_SEGMENTS.
+    
     Returns:
     - list: A list of all objects in the table.
+    
+    Raises:
+    - ClientError: If the table could not be read.
+    """
+    segments = segments or SCAN_SEGMENTS
+    if segments > 1:
+        # Scan the table in parallel segments.
+        return parallel_scan(columns, segments)
+    # Scan every page of the table, reading only the requested columns.
+    return list(iter_all_objects(columns))
+
+def cached_all_objects(columns=None):
+    """
+    Returns all objects, served from the warm container cache when possible.
+    
+    A cached listing is reused until it is older than CACHE_TTL or the
+    catalog version marker changes, and the least recently used listing is
+    evicted once CATALOG_CACHE_SIZE column selections are cached.
+    
+    Parameters:
+    - columns (list): The columns to read. Defaults to DEFAULT_FIELDS.
+    
+    Returns:
+    - list: A list of all objects in the table.
+    
+    Raises:
+    - ClientError: If the table could not be read.
+    """
+    key = tuple(columns or DEFAULT_FIELDS)
+    version = catalog.current_version()
+    entry = catalog_cache.get(key)
+    if entry and entry["version"] == version and time.monotonic() - entry["loaded_at"] < CACHE_TTL:
+        catalog_cache.move_to_end(key)
+        return entry["objects"]
+    objects = get_all_objects(columns)
+    catalog_cache[key] = {"objects": objects, "version": version, "loaded_at": time.monotonic()}
+    catalog_cache.move_to_end(key)
+    while len(catalog_cache) > CATALOG_CACHE_SIZE:
+        catalog_cache.popitem(last=False)
+    return objects
+
+def cached_catalog_body(columns=None):
+    """
+    Returns the serialized catalog and its ETag, computed once per cached
+    catalog version.
+    
+    Parameters:
+    - columns (list): The columns to read. Defaults to DEFAULT_FIELDS.
+    
+    Returns:
+    - tuple: (body, etag) of the catalog.
+    
+    Raises:
+    - ClientError: If the table could not be read.
+    """
+    objects = cached_all_objects(columns)
+    entry = catalog_cache.get(tuple(columns or DEFAULT_FIELDS))
+    if entry is None or entry["objects"] is not objects:
+        body = fastjson.dumps(objects)
+        return body, catalog.make_etag(body)
+    if "body" not in entry:
+        entry["body"] = fastjson.dumps(objects)
+        entry["etag"] = catalog.make_etag(entry["body"])
+    return entry["body"], entry["etag"]
+
+# The configured snapshot store, created once per container.
+store = catalog.snapshot_store(SNAPSHOT_STORE, SNAPSHOT_ENDPOINT_URL)
+
+def load_snapshot():
+    """
+    Reads the catalog snapshot and prepares it to be served as is.
+    
+    Returns:
+    - dict: The snapshot body, ETag, version and gzip encoded body if stored
+      compressed, or None if it could not be read.
     """
     try:
-        # Scan the table for all items.
-        response = table.scan()
-        # Return the list of items with only the desired columns.
-        return [{k: v for k, v in item.items() if k not in ["name", "type", "collection"]} for item in response["Items"]]
+        data, version, compressed = store.read()
     except Exception as e:
-        return {"error": str(e)}
+        print(f"Error reading catalog snapshot: {e}")
+        return None
+    snapshot = {"version": version, "gzip": None}
+    if compressed:
+        snapshot["gzip"] = base64.b64encode(data).decode("ascii")
+        data = gzip.decompress(data)
+    snapshot["body"] = data.decode("utf-8")
+    snapshot["etag"] = catalog.make_etag(snapshot["body"])
+    return snapshot
+
+def current_snapshot():
+    """
+    Returns the catalog snapshot if it matches the current catalog version.
+    
+    The snapshot is loaded once per container and only read again when the
+    catalog version changes, at most once per VERSION_CHECK_INTERVAL
+    seconds while a rebuild is pending.
+    
+    Returns:
+    - dict: The loaded snapshot, or None if no current snapshot is available.
+    """
+    if store is None:
+        return None
+    version = catalog.current_version()
+    snapshot = snapshot_state["snapshot"]
+    if snapshot and snapshot["version"] == version:
+        return snapshot
+    now = time.monotonic()
+    if snapshot_state["tried_version"] != version or now - snapshot_state["tried_at"] >= catalog.VERSION_CHECK_INTERVAL:
+        snapshot_state["tried_version"] = version
+        snapshot_state["tried_at"] = now
+        loaded = load_snapshot()
+        if loaded:
+            snapshot_state["snapshot"] = loaded
+            snapshot = loaded
+    if snapshot and snapshot["version"] == version:
+        return snapshot
+    return None
 
+def snapshot_response(event, snapshot):
+    """
+    Builds a response that serves the pre-encoded snapshot directly.
+    
+    Parameters:
+    - event (dict): The event dict containing the request headers.
+    - snapshot (dict): The loaded snapshot.
+    
+    Returns:
+    - dict: A response object with statusCode, headers and body.
+    """
+    # Serve the stored gzip bytes when gzip is the best encoding the client
+    # accepts. Otherwise the compressed decorator encodes the plain body.
+    if snapshot["gzip"] and choose_encoding(event) == "gzip":
+        # The compressed bytes differ from the original, so the ETag is weak.
+        response = catalog.conditional_response(event, snapshot["gzip"], "W/" + snapshot["etag"])
+        if response["statusCode"] == 200:
+            response["headers"]["Content-Encoding"] = "gzip"
+            response["isBase64Encoded"] = True
+    else:
+        response = catalog.conditional_response(event, snapshot["body"], snapshot["etag"])
+    if snapshot["gzip"]:
+        response["headers"]["Vary"] = "Accept-Encoding"
+    return response
+
+@compressed
 def lambda_handler(event, context):
     """
     Handles incoming HTTP requests to the lambda function.
@@ -36,23 +415,58 @@ def lambda_handler(event, context):
     http_method = event["requestContext"]["http"]["method"].lower()
 
     if http_method == "get":
-        # Query all objects from the database.
-        response = get_all_objects()
-        # Check if the response is an error.
-        if "error" in response:
+        query = event.get("queryStringParameters") or {}
+        limit = query.get("limit")
+        next_token = query.get("nextToken")
+        try:
+            columns = parse_fields(query.get("fields"))
+        except ValueError as e:
             return {
                 "statusCode": 400,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(response)
+                "body": fastjson.dumps({"error": str(e)})
             }
-        return {
-            "statusCode": 200,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps(response)
-        }
+        if limit or next_token:
+            # Return a single page of objects when pagination is requested.
+            try:
+                limit = min(int(limit or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+                if limit < 1:
+                    raise ValueError
+            except ValueError:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": fastjson.dumps({"error": "Invalid limit parameter"})
+                }
+            response = get_objects_page(limit, next_token, columns)
+            # Check if the response is an error.
+            if "error" in response:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": fastjson.dumps(response)
+                }
+            body = fastjson.dumps(response)
+            return catalog.conditional_response(event, body, catalog.make_etag(body))
+        # Serve the pre-encoded snapshot for the default listing when it is current.
+        if columns == DEFAULT_FIELDS:
+            snapshot = current_snapshot()
+            if snapshot:
+                return snapshot_response(event, snapshot)
+        # Query all objects, using the cached catalog when it is current.
+        try:
+            body, etag = cached_catalog_body(columns)
+        except Exception as e:
+            print(f"Error reading the catalog: {e}")
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": fastjson.dumps({"error": str(e)})
+            }
+        return catalog.conditional_response(event, body, etag)
     else:
         return {
             "statusCode": 405,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Method not allowed"})
-        }
\ No newline at end of file
+            "body": fastjson.dumps({"error": "Method not allowed"})
+        }
@@ -1,11 +1,44 @@
-import simplejson as json
-import boto3
+import os
+from beyond import aws
+from beyond import catalog
+from beyond import fastjson
+from beyond import favourites
+from beyond.response import compressed
 
-# Initialize a DynamoDB resource using the boto3 library.
-dynamodb_resource = boto3.resource("dynamodb")
 # Connect to the specific DynamoDB table we're working with.
-table = dynamodb_resource.Table("beyond-users")
+table = aws.table("beyond-users")
+# Table the favourites are resolved against when they are expanded.
+objects_table = aws.table("beyond-objects")
 
+# Seconds a cached object is served before it is read again.
+CACHE_TTL = int(os.environ.get("CACHE_TTL", "300"))
+# Largest number of objects kept in the cache.
+OBJECT_CACHE_SIZE = int(os.environ.get("OBJECT_CACHE_SIZE", "1024"))
+# Number of BatchGetItem chunks read concurrently.
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "4"))
+
+# Objects kept across warm invocations.
+object_cache = catalog.ObjectCache(objects_table.name, CACHE_TTL, OBJECT_CACHE_SIZE, BATCH_WORKERS)
+
+def expand_favourites(ngcs):
+    """
+    Resolves a list of favourite NGCs into their full object records.
+    
+    Cached objects are served from memory and the rest are read from
+    beyond-objects with concurrent BatchGetItem chunks.
+    
+    Parameters:
+    - ngcs (list): The favourite NGCs.
+    
+    Returns:
+    - list: The objects in the order of the favourites. Favourites that no
+      longer exist in the catalog are left out.
+    """
+    ngcs = [int(ngc) for ngc in ngcs]
+    objects = object_cache.get_many(ngcs)
+    return [objects[key] for key in ngcs if key in objects]
+
+@compressed
 def lambda_handler(event, context):
     """
     Handles incoming HTTP requests to the lambda function.
@@ -30,11 +63,16 @@ def lambda_handler(event, context):
             response = table.get_item(
                 Key={"email": email}
             )
-            response = response.get("Item", {}).get("favourites", [])
+            # Favourites are a number set, or a list for users not migrated yet.
+            response = sorted(int(ngc) for ngc in favourites.as_set(response.get("Item", {}).get("favourites")))
+            body = {"favourites": response}
+            # Join the full object records when the client asks for them.
+            if str(query.get('expand', '')).lower() == "true":
+                body["objects"] = expand_favourites(response)
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"favourites": response})
+                "body": fastjson.dumps(body)
             }
         except Exception as e:
             return {
@@ -46,5 +84,5 @@ def lambda_handler(event, context):
         return {
             "statusCode": 405,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Method not allowed"})
+            "body": fastjson.dumps({"error": "Method not allowed"})
         }
\ No newline at end of file
@@ -1,10 +1,23 @@
-import simplejson as json
-import boto3
+import os
+from beyond import aws
+from beyond import catalog
+from beyond import fastjson
+from beyond.response import compressed
 
-# Initialize a DynamoDB resource using the boto3 library.
-dynamodb_resource = boto3.resource("dynamodb")
 # Connect to the specific DynamoDB table we're working with.
-table = dynamodb_resource.Table("beyond-objects")
+table = aws.table("beyond-objects")
+
+# Seconds a cached object is served before it is read again.
+CACHE_TTL = int(os.environ.get("CACHE_TTL", "300"))
+# Largest number of objects kept in the cache.
+OBJECT_CACHE_SIZE = int(os.environ.get("OBJECT_CACHE_SIZE", "1024"))
+# Largest number of objects a client can request in one batch.
+MAX_BATCH_OBJECTS = int(os.environ.get("MAX_BATCH_OBJECTS", "500"))
+# Number of BatchGetItem chunks read concurrently.
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "4"))
+
+# Objects kept across warm invocations.
+object_cache = catalog.ObjectCache(table.name, CACHE_TTL, OBJECT_CACHE_SIZE, BATCH_WORKERS)
 
 def get_object(ngc):
     """
@@ -14,22 +27,129 @@ def get_object(ngc):
     - NGC (str): The NGC to query for.
     
     Returns:
-    - list: A list of items (objects) matching the query. Empty if no object found.
+    - dict: The object, or an error if no object was found.
     """
     try:
-        # Query the table for items with the specified NGC.
-        response = table.query(
-            KeyConditionExpression='ngc = :ngc',
-            ExpressionAttributeValues={':ngc': int(ngc)}
+        # Read the object with the low-level client, decoding numbers to int and float.
+        response = aws.client("dynamodb").get_item(
+            TableName=table.name,
+            Key=fastjson.serialize_item({"ngc": int(ngc)})
         )
-        if len(response['Items']) == 0:
+        if "Item" not in response:
             return {"error": "No object found with the specified NGC"}
-        return response['Items'][0]
+        return fastjson.item(response["Item"])
     except Exception as e:
         return {"error": str(e)}
 
 
 
+def cached_object(ngc):
+    """
+    Returns an object, served from the warm container cache when possible.
+    
+    Cached objects expire after CACHE_TTL seconds or when the catalog version
+    marker changes, and the least recently used object is evicted once the
+    cache holds OBJECT_CACHE_SIZE objects. The serialized body and its ETag
+    are computed once when the object is cached.
+    
+    Parameters:
+    - ngc (str): The NGC to query for.
+    
+    Returns:
+    - dict: The cache entry with the object, body and etag, or an error if
+      the object could not be found.
+    """
+    try:
+        key = int(ngc)
+    except (TypeError, ValueError):
+        return {"error": "Invalid NGC parameter"}
+    entry = object_cache.get(key)
+    if entry is None:
+        response = get_object(key)
+        if "error" in response:
+            return response
+        entry = object_cache.put(key, response)
+    if "body" not in entry:
+        # Objects cached by a batch read are encoded on their first single read.
+        entry["body"] = fastjson.dumps(entry["object"])
+        entry["etag"] = catalog.make_etag(entry["body"])
+    return entry
+
+def parse_ngcs(values):
+    """
+    Parses a list of NGCs from a request.
+    
+    Parameters:
+    - values (list or str): NGC numbers, or a comma separated string of them.
+    
+    Returns:
+    - list: The NGCs as integers, in the requested order.
+    
+    Raises:
+    - ValueError: If an NGC is invalid or too many were requested.
+    """
+    if isinstance(values, str):
+        values = values.split(",")
+    if not isinstance(values, list) or not values:
+        raise ValueError("NGC parameter is missing")
+    if len(values) > MAX_BATCH_OBJECTS:
+        raise ValueError(f"At most {MAX_BATCH_OBJECTS} objects can be requested at once")
+    try:
+        return [int(str(value).strip()) for value in values]
+    except ValueError:
+        raise ValueError("Invalid NGC parameter")
+
+def cached_objects(ngcs):
+    """
+    Returns many objects, reading only those that are not cached.
+    
+    Parameters:
+    - ngcs (list): The NGCs to return.
+    
+    Returns:
+    - dict: The objects in the requested order and the NGCs that were not
+      found, or an error if the objects could not be read.
+    """
+    try:
+        objects = object_cache.get_many(ngcs)
+    except Exception as e:
+        return {"error": str(e)}
+    return {
+        "objects": [objects[key] for key in ngcs if key in objects],
+        "missing": [key for key in ngcs if key not in objects]
+    }
+
+def batch_response(event, ngcs):
+    """
+    Builds the response for a batch request.
+    
+    Parameters:
+    - event (dict): The event dict containing the request headers.
+    - ngcs (list or str): The requested NGCs.
+    
+    Returns:
+    - dict: A response object with statusCode and body.
+    """
+    try:
+        ngcs = parse_ngcs(ngcs)
+    except ValueError as e:
+        return {
+            "statusCode": 400,
+            "headers": {"Content-Type": "application/json"},
+            "body": fastjson.dumps({"error": str(e)})
+        }
+    response = cached_objects(ngcs)
+    # Check if the response is an error.
+    if "error" in response:
+        return {
+            "statusCode": 400,
+            "headers": {"Content-Type": "application/json"},
+            "body": fastjson.dumps(response)
+        }
+    body = fastjson.dumps(response)
+    return catalog.conditional_response(event, body, catalog.make_etag(body))
+
+@compressed
 def lambda_handler(event, context):
     """
     Handles incoming HTTP requests to the lambda function.
@@ -48,23 +168,29 @@ def lambda_handler(event, context):
         query = event["queryStringParameters"]
         print(query)
         ngc = query.get('ngc')
-        # Query all objects from the database.
-        response = get_object(ngc)
+        if ngc and "," in ngc:
+            # Several NGCs were requested, so read them in one batch.
+            return batch_response(event, ngc)
+        # Query the object, using the cached copy when it is current.
+        response = cached_object(ngc)
         # Check if the response is an error.
         if "error" in response:
             return {
                 "statusCode": 400,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(response)
+                "body": fastjson.dumps(response)
             }
-        return {
-            "statusCode": 200,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps(response)
-        }
+        return catalog.conditional_response(event, response["body"], response["etag"])
+    elif http_method == "post":
+        # Read the list of NGCs from the request body.
+        try:
+            ngcs = fastjson.loads(event["body"]).get("ngc")
+        except Exception:
+            ngcs = None
+        return batch_response(event, ngcs)
     else:
         return {
             "statusCode": 405,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Method not allowed"})
+            "body": fastjson.dumps({"error": "Method not allowed"})
         }
\ No newline at end of file
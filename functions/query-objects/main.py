@@ -0,0 +1,259 @@
+import base64
+import decimal
+from beyond import aws
+from beyond import fastjson
+from beyond.response import compressed
+
+# Connect to the specific DynamoDB table we're working with.
+table = aws.table("beyond-objects")
+
+# The GSI for each filterable attribute, all sorted by magnitude.
+FILTER_INDEXES = {
+    "constellation": "constellation-magnitude-index",
+    "type": "type-magnitude-index",
+    "collection": "collection-magnitude-index"
+}
+# Columns clients may request with the fields parameter.
+ALLOWED_FIELDS = ["ngc", "name", "type", "constellation", "ra", "dec", "magnitude", "collection"]
+# Columns returned when no fields are requested.
+DEFAULT_FIELDS = ["ngc", "name", "type", "constellation", "ra", "dec", "magnitude"]
+# Default and largest number of objects returned per page.
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def encode_token(last_evaluated_key):
+    """
+    Encodes a DynamoDB LastEvaluatedKey into an opaque pagination token.
+    
+    Parameters:
+    - last_evaluated_key (dict): The LastEvaluatedKey returned by a query, or None.
+    
+    Returns:
+    - str: A URL-safe token, or None if there are no more pages.
+    """
+    if not last_evaluated_key:
+        return None
+    raw = fastjson.dumps(last_evaluated_key).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_token(token, filter_field):
+    """
+    Decodes a pagination token back into a DynamoDB ExclusiveStartKey.
+    
+    Parameters:
+    - token (str): The token previously returned as nextToken.
+    - filter_field (str): The attribute of the index being queried.
+    
+    Returns:
+    - dict: The ExclusiveStartKey to resume the query from.
+    
+    Raises:
+    - ValueError: If the token is malformed or belongs to another index.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token.encode("ascii"))
+        key = fastjson.loads(raw)
+    except Exception:
+        raise ValueError("Invalid nextToken")
+    if not isinstance(key, dict) or not {"ngc", "magnitude", filter_field} <= set(key):
+        raise ValueError("Invalid nextToken")
+    return key
+
+def parse_fields(fields):
+    """
+    Parses the comma separated fields parameter into a list of columns.
+    
+    Parameters:
+    - fields (str): The requested columns, e.g. "ngc,name,magnitude". Optional.
+    
+    Returns:
+    - list: The columns to read, or DEFAULT_FIELDS if none were requested.
+    
+    Raises:
+    - ValueError: If an unknown column is requested.
+    """
+    if not fields:
+        return DEFAULT_FIELDS
+    columns = []
+    for field in fields.split(","):
+        field = field.strip()
+        if field not in ALLOWED_FIELDS:
+            raise ValueError(f"Invalid field: {field}")
+        if field not in columns:
+            columns.append(field)
+    # The key is always returned so objects can be identified.
+    if "ngc" not in columns:
+        columns.insert(0, "ngc")
+    return columns
+
+def parse_magnitude(value, name):
+    """
+    Parses a magnitude bound from the query string.
+    
+    Parameters:
+    - value (str): The value of the parameter, or None.
+    - name (str): The name of the parameter.
+    
+    Returns:
+    - Decimal: The bound, or None if it was not given.
+    
+    Raises:
+    - ValueError: If the value is not a finite number.
+    """
+    if value in (None, ""):
+        return None
+    try:
+        magnitude = decimal.Decimal(value.strip())
+    except decimal.InvalidOperation:
+        raise ValueError(f"Invalid {name} parameter")
+    if not magnitude.is_finite():
+        raise ValueError(f"Invalid {name} parameter")
+    return magnitude
+
+def build_query(query):
+    """
+    Turns the query string parameters into the arguments of a DynamoDB query.
+    
+    The first filter given picks the index, so its reads are limited to the
+    matching objects. Any other filters are applied to those objects, and
+    magnitude bounds are part of the key condition.
+    
+    Parameters:
+    - query (dict): The query string parameters.
+    
+    Returns:
+    - tuple: (filter_field, kwargs) for the index queried and the query arguments.
+    
+    Raises:
+    - ValueError: If a parameter is missing or invalid.
+    """
+    filters = {field: query[field] for field in FILTER_INDEXES if query.get(field)}
+    if not filters:
+        raise ValueError("One of constellation, type or collection is required")
+    filter_field = next(iter(filters))
+    columns = parse_fields(query.get("fields"))
+    low = parse_magnitude(query.get("min_magnitude"), "min_magnitude")
+    high = parse_magnitude(query.get("max_magnitude"), "max_magnitude")
+    order = (query.get("order") or "asc").lower()
+    if order not in ("asc", "desc"):
+        raise ValueError("Invalid order parameter")
+
+    names = {f"#{column}": column for column in columns}
+    names.update({f"#{field}": field for field in filters})
+    if low is not None or high is not None:
+        names["#magnitude"] = "magnitude"
+    values = {f":{field}": value for field, value in filters.items()}
+    key_condition = f"#{filter_field} = :{filter_field}"
+    if low is not None and high is not None:
+        key_condition += " AND #magnitude BETWEEN :low AND :high"
+        values.update({":low": low, ":high": high})
+    elif low is not None:
+        key_condition += " AND #magnitude >= :low"
+        values[":low"] = low
+    elif high is not None:
+        key_condition += " AND #magnitude <= :high"
+        values[":high"] = high
+
+    kwargs = {
+        "IndexName": FILTER_INDEXES[filter_field],
+        "KeyConditionExpression": key_condition,
+        "ProjectionExpression": ", ".join(f"#{column}" for column in columns),
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": fastjson.serialize_item(values),
+        # Brightest objects, with the lowest magnitude, come first by default.
+        "ScanIndexForward": order == "asc"
+    }
+    other_filters = [f"#{field} = :{field}" for field in filters if field != filter_field]
+    if other_filters:
+        kwargs["FilterExpression"] = " AND ".join(other_filters)
+    return filter_field, kwargs
+
+def query_page(kwargs, limit, start_key=None):
+    """
+    Reads one page of objects from an index, with the low-level client so
+    numbers are decoded straight to int and float.
+    
+    With a filter expression DynamoDB can return fewer objects than the
+    limit, so further reads are made until the page is full or the index
+    has no more matches.
+    
+    Parameters:
+    - kwargs (dict): The query arguments from build_query.
+    - limit (int): The maximum number of objects to return.
+    - start_key (dict): The ExclusiveStartKey to resume from. Optional.
+    
+    Returns:
+    - tuple: (objects, last_evaluated_key).
+    """
+    items = []
+    while True:
+        page = dict(kwargs, Limit=limit - len(items))
+        if start_key:
+            page["ExclusiveStartKey"] = fastjson.serialize_item(start_key)
+        response = aws.client("dynamodb").query(TableName=table.name, **page)
+        items.extend(fastjson.items(response["Items"]))
+        start_key = response.get("LastEvaluatedKey")
+        start_key = start_key and fastjson.item(start_key)
+        if not start_key or len(items) >= limit:
+            return items, start_key
+
+@compressed
+def lambda_handler(event, context):
+    """
+    Handles incoming HTTP requests to the lambda function.
+    
+    Parameters:
+    - event (dict): The event dict containing request parameters and data.
+    - context: The runtime information of the Lambda function (unused in this function).
+    
+    Returns:
+    - dict: A response object with statusCode and body.
+    """
+    print(event)  # Log the incoming event for debugging.
+    http_method = event["requestContext"]["http"]["method"].lower()
+
+    if http_method == "get":
+        query = event.get("queryStringParameters") or {}
+        try:
+            filter_field, kwargs = build_query(query)
+            next_token = query.get("nextToken")
+            start_key = decode_token(next_token, filter_field) if next_token else None
+        except ValueError as e:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": fastjson.dumps({"error": str(e)})
+            }
+        try:
+            limit = min(int(query.get("limit") or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": fastjson.dumps({"error": "Invalid limit parameter"})
+            }
+        try:
+            objects, last_key = query_page(kwargs, limit, start_key)
+        except Exception as e:
+            print(f"Error querying DynamoDB: {e}")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": fastjson.dumps({"error": "Failed to query objects"})
+            }
+        return {
+            "statusCode": 200,
+            "headers": {"Content-Type": "application/json"},
+            "body": fastjson.dumps({
+                "objects": objects,
+                "nextToken": encode_token(last_key)
+            })
+        }
+    else:
+        return {
+            "statusCode": 405,
+            "headers": {"Content-Type": "application/json"},
+            "body": fastjson.dumps({"error": "Method not allowed"})
+        }
@@ -0,0 +1,348 @@
+import bisect
+import gzip
+import os
+import re
+import time
+import unicodedata
+from beyond import aws
+from beyond import catalog
+from beyond import fastjson
+from beyond.response import compressed
+
+# Connect to the specific DynamoDB table we're working with.
+table = aws.table("beyond-objects")
+
+# Columns the index is built from.
+NAMES_FIELDS = ["ngc", "name", "type", "magnitude"]
+# Default and largest number of results returned by one search.
+DEFAULT_RESULTS = 10
+MAX_RESULTS = 50
+# Lowest trigram similarity, from 0 to 1, for a fuzzy match to be returned.
+FUZZY_THRESHOLD = float(os.environ.get("FUZZY_THRESHOLD", "0.3"))
+# Where build-snapshot stores the names snapshot. Optional.
+NAMES_SNAPSHOT_STORE = os.environ.get("NAMES_SNAPSHOT_STORE", "")
+# Endpoint of an S3 compatible service to use instead of AWS S3. Optional.
+SNAPSHOT_ENDPOINT_URL = os.environ.get("SNAPSHOT_ENDPOINT_URL") or None
+
+# Queries naming an object by its catalog number, e.g. "NGC 224" or "224".
+DESIGNATION = re.compile(r"^(?:ngc\s*)?(\d+)$")
+
+# Catalog version the index was last synced to, and when that was tried.
+index_state = {"version": None, "tried_at": 0}
+
+def normalize(text):
+    """
+    Folds a name or query for matching: accents and apostrophes removed,
+    lower case, and other punctuation turned into single spaces.
+    
+    Parameters:
+    - text (str): The text to normalize.
+    
+    Returns:
+    - str: The normalized text.
+    """
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    # Apostrophes are dropped so "Cat's Eye" matches "cats eye".
+    text = text.replace("'", "").replace("\u2019", "")
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text).split())
+
+def trigrams(text):
+    """
+    Splits normalized text into the trigrams of its words, padded so short
+    words and word starts count.
+    
+    Parameters:
+    - text (str): Normalized text.
+    
+    Returns:
+    - set: The trigrams.
+    """
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class NameIndex:
+    """
+    In-memory search index over object names, with a sorted word list for
+    prefix matches and trigram postings for fuzzy matches. Objects can be
+    added and removed one at a time, so catalog changes only touch the
+    objects that changed.
+    """
+
+    def __init__(self):
+        self.docs = {}
+        self.words = []
+        self.postings = {}
+
+    def __len__(self):
+        return len(self.docs)
+
+    def document(self, item):
+        text = normalize(item.get("name") or "")
+        magnitude = item.get("magnitude")
+        return {
+            "item": item,
+            "text": text,
+            "grams": trigrams(text),
+            # Brightest first, objects without a magnitude last.
+            "rank": (magnitude is None, magnitude or 0, int(item["ngc"]))
+        }
+
+    def add(self, item):
+        ngc = int(item["ngc"])
+        if ngc in self.docs:
+            self.remove(ngc)
+        doc = self.docs[ngc] = self.document(item)
+        for word in set(doc["text"].split()):
+            bisect.insort(self.words, (word, ngc))
+        for gram in doc["grams"]:
+            self.postings.setdefault(gram, set()).add(ngc)
+
+    def remove(self, ngc):
+        doc = self.docs.pop(ngc, None)
+        if doc is None:
+            return
+        for word in set(doc["text"].split()):
+            i = bisect.bisect_left(self.words, (word, ngc))
+            if i < len(self.words) and self.words[i] == (word, ngc):
+                del self.words[i]
+        for gram in doc["grams"]:
+            postings = self.postings.get(gram)
+            if postings is not None:
+                postings.discard(ngc)
+                if not postings:
+                    del self.postings[gram]
+
+    def rebuild(self, items):
+        self.docs = {int(item["ngc"]): self.document(item) for item in items}
+        self.postings = {}
+        words = []
+        for ngc, doc in self.docs.items():
+            words.extend((word, ngc) for word in set(doc["text"].split()))
+            for gram in doc["grams"]:
+                self.postings.setdefault(gram, set()).add(ngc)
+        words.sort()
+        self.words = words
+
+    def sync(self, items):
+        """
+        Brings the index in line with the catalog, adding, replacing and
+        removing only the objects that changed. Large changes rebuild the
+        index from scratch instead.
+        
+        Parameters:
+        - items (list): Every object in the catalog, with NAMES_FIELDS.
+        
+        Returns:
+        - int: The number of objects that changed.
+        """
+        items = {int(item["ngc"]): item for item in items}
+        removed = [ngc for ngc in self.docs if ngc not in items]
+        changed = [item for ngc, item in items.items() if ngc not in self.docs or self.docs[ngc]["item"] != item]
+        if len(removed) + len(changed) > len(items) // 2:
+            self.rebuild(items.values())
+        else:
+            for ngc in removed:
+                self.remove(ngc)
+            for item in changed:
+                self.add(item)
+        return len(removed) + len(changed)
+
+    def prefix_matches(self, word):
+        """
+        Finds the objects with a word starting with the given prefix.
+        
+        Parameters:
+        - word (str): A normalized word.
+        
+        Returns:
+        - set: The NGCs of the matching objects.
+        """
+        matches = set()
+        i = bisect.bisect_left(self.words, (word,))
+        while i < len(self.words) and self.words[i][0].startswith(word):
+            matches.add(self.words[i][1])
+            i += 1
+        return matches
+
+    def search(self, query, limit=DEFAULT_RESULTS):
+        """
+        Finds the objects best matching a query, for autocomplete.
+        
+        Catalog numbers match first, then exact names, names starting with
+        the query, and names with a word starting with every query word.
+        Fuzzy trigram matches fill the rest of the results. Ties go to the
+        brightest object.
+        
+        Parameters:
+        - query (str): The text typed by the user.
+        - limit (int): The maximum number of results.
+        
+        Returns:
+        - list: The matching objects, best first, each with a score.
+        """
+        text = normalize(query)
+        if not text:
+            return []
+        scores = {}
+        designation = DESIGNATION.match(text)
+        if designation and int(designation.group(1)) in self.docs:
+            scores[int(designation.group(1))] = 5.0
+
+        words = text.split()
+        candidates = self.prefix_matches(words[-1])
+        for word in words[:-1]:
+            candidates &= self.prefix_matches(word)
+        for ngc in candidates:
+            doc_text = self.docs[ngc]["text"]
+            score = 4.0 if doc_text == text else 3.0 if doc_text.startswith(text) else 2.0
+            scores[ngc] = max(scores.get(ngc, 0), score)
+
+        if len(scores) < limit:
+            grams = trigrams(text)
+            shared = {}
+            for gram in grams:
+                for ngc in self.postings.get(gram, ()):
+                    shared[ngc] = shared.get(ngc, 0) + 1
+            for ngc, count in shared.items():
+                if ngc in scores:
+                    continue
+                similarity = 2 * count / (len(grams) + len(self.docs[ngc]["grams"]))
+                if similarity >= FUZZY_THRESHOLD:
+                    scores[ngc] = similarity
+
+        ranked = sorted(scores, key=lambda ngc: (-scores[ngc], self.docs[ngc]["rank"]))[:limit]
+        return [dict(self.docs[ngc]["item"], score=round(scores[ngc], 3)) for ngc in ranked]
+
+# The name index, kept across warm invocations.
+index = NameIndex()
+
+# The configured names snapshot store, created once per container.
+store = catalog.snapshot_store(NAMES_SNAPSHOT_STORE, SNAPSHOT_ENDPOINT_URL)
+
+def read_snapshot(version):
+    """
+    Reads the names snapshot if it was built at the given catalog version.
+    
+    Parameters:
+    - version (int): The current catalog version.
+    
+    Returns:
+    - list: The objects in the snapshot, or None if it is missing or stale.
+    """
+    if store is None:
+        return None
+    try:
+        data, snapshot_version, compressed = store.read()
+    except Exception as e:
+        print(f"Error reading names snapshot: {e}")
+        return None
+    if snapshot_version != version:
+        return None
+    if compressed:
+        data = gzip.decompress(data)
+    return fastjson.loads(data)
+
+def scan_names():
+    """
+    Reads every object in the table with the indexed columns.
+    
+    Returns:
+    - list: All objects in the table.
+    """
+    names = {f"#{column}": column for column in NAMES_FIELDS}
+    kwargs = {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names
+    }
+    items = []
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response["Items"])
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+def current_index():
+    """
+    Returns the name index, synced to the current catalog version.
+    
+    The index is built once per container and synced again only when the
+    catalog version changes. It is built from the names snapshot when that
+    is current, and from a scan of the table otherwise.
+    
+    Returns:
+    - NameIndex: The index.
+    """
+    version = catalog.current_version()
+    if index_state["version"] == version and len(index):
+        return index
+    now = time.monotonic()
+    if index_state["version"] is not None and now - index_state["tried_at"] < catalog.VERSION_CHECK_INTERVAL:
+        return index
+    index_state["tried_at"] = now
+    items = read_snapshot(version)
+    if items is None:
+        items = scan_names()
+    changed = index.sync(items)
+    index_state["version"] = version
+    print(f"Name index synced to version {version}: {changed} objects changed")
+    return index
+
+@compressed
+def lambda_handler(event, context):
+    """
+    Handles incoming HTTP requests to the lambda function.
+    
+    Parameters:
+    - event (dict): The event dict containing request parameters and data.
+    - context: The runtime information of the Lambda function (unused in this function).
+    
+    Returns:
+    - dict: A response object with statusCode and body.
+    """
+    print(event)  # Log the incoming event for debugging.
+    http_method = event["requestContext"]["http"]["method"].lower()
+
+    if http_method == "get":
+        query = event.get("queryStringParameters") or {}
+        text = query.get("q", "")
+        if not text.strip():
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": fastjson.dumps({"error": "q parameter is missing"})
+            }
+        try:
+            limit = min(int(query.get("limit") or DEFAULT_RESULTS), MAX_RESULTS)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": fastjson.dumps({"error": "Invalid limit parameter"})
+            }
+        try:
+            results = current_index().search(text, limit)
+        except Exception as e:
+            print(f"Error searching names: {e}")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": fastjson.dumps({"error": "Failed to search objects"})
+            }
+        return {
+            "statusCode": 200,
+            "headers": {"Content-Type": "application/json"},
+            "body": fastjson.dumps({"query": text, "results": results})
+        }
+    else:
+        return {
+            "statusCode": 405,
+            "headers": {"Content-Type": "application/json"},
+            "body": fastjson.dumps({"error": "Method not allowed"})
+        }
@@ -0,0 +1,208 @@
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from beyond import aws
+from beyond import fastjson
+from beyond.response import compressed
+from beyond.sky import box_ranges, cone_ranges, query_range
+
+# Connect to the specific DynamoDB table we're working with.
+table = aws.table("beyond-objects")
+
+# Columns returned for every object found.
+SEARCH_FIELDS = ["ngc", "name", "type", "constellation", "ra", "dec", "magnitude"]
+# Largest cone radius in degrees, and half the largest box height.
+MAX_RADIUS = float(os.environ.get("MAX_RADIUS", "10"))
+# Largest number of objects returned by one search.
+MAX_RESULTS = int(os.environ.get("MAX_RESULTS", "1000"))
+# Number of index range queries run concurrently.
+SEARCH_WORKERS = int(os.environ.get("SEARCH_WORKERS", "8"))
+
+# Threads that run the index range queries, shared by every invocation.
+executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS)
+
+def read_candidates(ranges):
+    """
+    Reads every object in a set of index ranges, querying them concurrently.
+    
+    Parameters:
+    - ranges (list): (band, low, high) tuples from cone_ranges or box_ranges.
+    
+    Returns:
+    - list: The objects in the ranges.
+    """
+    names = {f"#{column}": column for column in SEARCH_FIELDS}
+    kwargs = {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names
+    }
+    def read(key_range):
+        return query_range(table.name, *key_range, **kwargs)
+    return [item for items in executor.map(read, ranges) for item in items]
+
+def angular_distance(ra, dec, other_ra, other_dec):
+    """
+    Computes the angular distance between two points with the haversine formula.
+    
+    Parameters:
+    - ra (float): The right ascension of the first point, in degrees.
+    - dec (float): The declination of the first point, in degrees.
+    - other_ra (float): The right ascension of the second point, in degrees.
+    - other_dec (float): The declination of the second point, in degrees.
+    
+    Returns:
+    - float: The distance in degrees.
+    """
+    ra, dec, other_ra, other_dec = map(math.radians, (ra, dec, other_ra, other_dec))
+    a = math.sin((other_dec - dec) / 2) ** 2 + math.cos(dec) * math.cos(other_dec) * math.sin((other_ra - ra) / 2) ** 2
+    return math.degrees(2 * math.asin(math.sqrt(min(max(a, 0), 1))))
+
+def cone_search(ra, dec, radius):
+    """
+    Finds the objects within a radius of a point on the sky.
+    
+    Parameters:
+    - ra (float): The right ascension of the centre, in degrees.
+    - dec (float): The declination of the centre, in degrees.
+    - radius (float): The radius, in degrees.
+    
+    Returns:
+    - tuple: (objects, candidates), the objects sorted by distance with a
+      "distance" field, and the number of objects read from the index.
+    """
+    candidates = read_candidates(cone_ranges(ra, dec, radius))
+    found = []
+    for item in candidates:
+        distance = angular_distance(ra, dec, float(item["ra"]), float(item["dec"]))
+        if distance <= radius:
+            found.append((distance, item))
+    found.sort(key=lambda pair: pair[0])
+    objects = [dict(item, distance=round(distance, 6)) for distance, item in found]
+    return objects, len(candidates)
+
+def box_search(ra_min, ra_max, dec_min, dec_max):
+    """
+    Finds the objects in a box on the sky.
+    
+    Parameters:
+    - ra_min (float): The start of the right ascension range, in degrees.
+    - ra_max (float): The end of the right ascension range, below ra_min to wrap through 0.
+    - dec_min (float): The lowest declination, in degrees.
+    - dec_max (float): The highest declination, in degrees.
+    
+    Returns:
+    - tuple: (objects, candidates), the objects sorted by NGC and the number
+      of objects read from the index.
+    """
+    candidates = read_candidates(box_ranges(ra_min, ra_max, dec_min, dec_max))
+    objects = [item for item in candidates if dec_min <= float(item["dec"]) <= dec_max]
+    objects.sort(key=lambda item: item["ngc"])
+    return objects, len(candidates)
+
+def number(query, name):
+    """
+    Reads a number of degrees from the query string parameters.
+    
+    Parameters:
+    - query (dict): The query string parameters.
+    - name (str): The name of the parameter.
+    
+    Returns:
+    - float: The value of the parameter.
+    
+    Raises:
+    - ValueError: If the parameter is missing or not a finite number.
+    """
+    if query.get(name) in (None, ""):
+        raise ValueError(f"Missing parameter: {name}")
+    try:
+        value = float(query[name])
+    except ValueError:
+        value = None
+    if value is None or not math.isfinite(value):
+        raise ValueError(f"Invalid parameter: {name}")
+    return value
+
+def parse_search(query):
+    """
+    Reads the search region from the query string parameters.
+    
+    Parameters:
+    - query (dict): The query string parameters.
+    
+    Returns:
+    - tuple: ("cone", (ra, dec, radius)) or ("box", (ra_min, ra_max, dec_min, dec_max)).
+    
+    Raises:
+    - ValueError: If the region is missing, invalid or too large.
+    """
+    if "radius" in query:
+        ra, dec, radius = (number(query, name) for name in ("ra", "dec", "radius"))
+        if not 0 < radius <= MAX_RADIUS:
+            raise ValueError(f"radius must be between 0 and {MAX_RADIUS:g} degrees")
+        if not -90 <= dec <= 90:
+            raise ValueError("dec must be between -90 and 90 degrees")
+        return "cone", (ra % 360, dec, radius)
+    if "ra_min" in query:
+        ra_min, ra_max, dec_min, dec_max = (number(query, name) for name in ("ra_min", "ra_max", "dec_min", "dec_max"))
+        if not -90 <= dec_min <= dec_max <= 90:
+            raise ValueError("dec_min and dec_max must be ordered and between -90 and 90 degrees")
+        if dec_max - dec_min > 2 * MAX_RADIUS:
+            raise ValueError(f"The box can be at most {2 * MAX_RADIUS:g} degrees high")
+        return "box", (ra_min, ra_max, dec_min, dec_max)
+    raise ValueError("Search with ra, dec and radius, or ra_min, ra_max, dec_min and dec_max")
+
+@compressed
+def lambda_handler(event, context):
+    """
+    Handles incoming HTTP requests to the lambda function.
+    
+    Cone searches return the objects within a radius of a point, sorted by
+    angular distance. Box searches return the objects in a range of right
+    ascension and declination, sorted by NGC.
+    
+    Parameters:
+    - event (dict): The event dict containing request parameters and data.
+    - context: The runtime information of the Lambda function (unused in this function).
+    
+    Returns:
+    - dict: A response object with statusCode and body.
+    """
+    print(event)  # Log the incoming event for debugging.
+    http_method = event["requestContext"]["http"]["method"].lower()
+
+    if http_method == "get":
+        query = event.get("queryStringParameters") or {}
+        try:
+            shape, region = parse_search(query)
+        except ValueError as e:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": fastjson.dumps({"error": str(e)})
+            }
+        try:
+            objects, candidates = cone_search(*region) if shape == "cone" else box_search(*region)
+        except Exception as e:
+            print(f"Error searching DynamoDB: {e}")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": fastjson.dumps({"error": "Failed to search objects"})
+            }
+        return {
+            "statusCode": 200,
+            "headers": {"Content-Type": "application/json"},
+            "body": fastjson.dumps({
+                "objects": objects[:MAX_RESULTS],
+                "count": len(objects),
+                "truncated": len(objects) > MAX_RESULTS,
+                "candidates": candidates
+            })
+        }
+    else:
+        return {
+            "statusCode": 405,
+            "headers": {"Content-Type": "application/json"},
+            "body": fastjson.dumps({"error": "Method not allowed"})
+        }
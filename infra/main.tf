@@ -4,6 +4,10 @@ terraform {
       version = ">= 4.0.0"
       source  = "hashicorp/aws"
     }
+    random = {
+      version = ">= 3.0.0"
+      source  = "hashicorp/random"
+    }
   }
 }
 
@@ -16,6 +20,19 @@ locals {
   lambda_handler = "main.lambda_handler"
 }
 
+# OAuth client IDs of the BEYOND apps, comma separated. Google tokens must be
+# issued to one of them to sign in.
+variable "google_client_ids" {
+  description = "Google OAuth client IDs accepted for Google sign-in, comma separated."
+  type        = string
+}
+
+# Secret used to sign the session tokens issued by get-user.
+resource "random_password" "session_secret" {
+  length  = 64
+  special = false
+}
+
 resource "aws_iam_policy" "dynamo" {
   name = "beyond_dynamo"
   description = "Interaction with lambda and dynamo"
@@ -34,11 +51,15 @@ resource "aws_iam_policy" "dynamo" {
 				"dynamodb:BatchWriteItem",
 				"dynamodb:PutItem",
 				"dynamodb:UpdateItem",
-        "dynamodb:DeleteItem"
+        "dynamodb:DeleteItem",
+        "dynamodb:ConditionCheckItem"
       ],
       "Resource": [
         "arn:aws:dynamodb:ca-central-1:455720929055:table/beyond-users",
-        "arn:aws:dynamodb:ca-central-1:455720929055:table/beyond-objects"
+        "arn:aws:dynamodb:ca-central-1:455720929055:table/beyond-objects",
+        "arn:aws:dynamodb:ca-central-1:455720929055:table/beyond-objects/index/*",
+        "arn:aws:dynamodb:ca-central-1:455720929055:table/beyond-meta",
+        "arn:aws:dynamodb:ca-central-1:455720929055:table/beyond-usernames"
       ]
     }
   ]
@@ -97,9 +118,178 @@ resource "aws_dynamodb_table" "db-objects" {
     name = "ngc"
     type = "N"    # type number
   }
+
+  attribute {
+    name = "skyBand"
+    type = "N"    # declination band, written by create-object
+  }
+
+  attribute {
+    name = "ra"
+    type = "N"    # type number
+  }
+
+  attribute {
+    name = "magnitude"
+    type = "N"    # type number
+  }
+
+  attribute {
+    name = "constellation"
+    type = "S"    # type string
+  }
+
+  attribute {
+    name = "type"
+    type = "S"    # type string
+  }
+
+  attribute {
+    name = "collection"
+    type = "S"    # type string
+  }
+
+  # Range queries over ra within a declination band, used by search-objects.
+  global_secondary_index {
+    name            = "sky-index"
+    hash_key        = "skyBand"
+    range_key       = "ra"
+    read_capacity   = 1
+    write_capacity  = 1
+    projection_type = "ALL"
+  }
+
+  # Listings filtered by constellation and sorted by magnitude, used by query-objects.
+  global_secondary_index {
+    name            = "constellation-magnitude-index"
+    hash_key        = "constellation"
+    range_key       = "magnitude"
+    read_capacity   = 1
+    write_capacity  = 1
+    projection_type = "ALL"
+  }
+
+  # Listings filtered by type and sorted by magnitude, used by query-objects.
+  global_secondary_index {
+    name            = "type-magnitude-index"
+    hash_key        = "type"
+    range_key       = "magnitude"
+    read_capacity   = 1
+    write_capacity  = 1
+    projection_type = "ALL"
+  }
+
+  # Listings filtered by collection and sorted by magnitude, used by query-objects.
+  global_secondary_index {
+    name            = "collection-magnitude-index"
+    hash_key        = "collection"
+    range_key       = "magnitude"
+    read_capacity   = 1
+    write_capacity  = 1
+    projection_type = "ALL"
+  }
+
+  # Keys of every object in a collection, used by delete-object prunes.
+  global_secondary_index {
+    name            = "collection-index"
+    hash_key        = "collection"
+    read_capacity   = 1
+    write_capacity  = 1
+    projection_type = "KEYS_ONLY"
+  }
+
+  # Keys of every object of a type, used by delete-object prunes.
+  global_secondary_index {
+    name            = "type-index"
+    hash_key        = "type"
+    read_capacity   = 1
+    write_capacity  = 1
+    projection_type = "KEYS_ONLY"
+  }
   # (More attributes can be added as data is added to the database) 
 }
 
+resource "aws_dynamodb_table" "db-usernames" {
+  name           = "beyond-usernames"
+  billing_mode   = "PROVISIONED"
+  read_capacity  = 1
+  write_capacity = 1
+
+  hash_key = "username"
+
+  attribute {
+    name = "username"
+    type = "S"    # type string
+  }
+  # One reservation item per username, written in the same transaction as the user
+}
+
+resource "aws_dynamodb_table" "db-meta" {
+  name           = "beyond-meta"
+  billing_mode   = "PROVISIONED"
+  read_capacity  = 1
+  write_capacity = 1
+
+  hash_key = "id"
+
+  attribute {
+    name = "id"
+    type = "S"    # type string
+  }
+  # Holds the catalog version marker used to invalidate warm catalog caches
+}
+
+resource "aws_s3_bucket" "snapshots" {
+  bucket = "beyond-catalog-snapshots"
+}
+
+resource "aws_iam_policy" "snapshots" {
+  name        = "beyond-snapshots"
+  description = "Reading and writing the catalog snapshot"
+
+  policy = <<EOF
+{
+  "Version": "2012-10-17",
+  "Statement": [
+    {
+      "Effect": "Allow",
+      "Action": [
+        "s3:GetObject",
+        "s3:PutObject"
+      ],
+      "Resource": "${aws_s3_bucket.snapshots.arn}/*"
+    }
+  ]
+}
+EOF
+}
+
+resource "aws_iam_policy" "invoke-build-snapshot" {
+  name        = "beyond-invoke-build-snapshot"
+  description = "Triggering catalog snapshot rebuilds"
+
+  policy = <<EOF
+{
+  "Version": "2012-10-17",
+  "Statement": [
+    {
+      "Effect": "Allow",
+      "Action": "lambda:InvokeFunction",
+      "Resource": "${aws_lambda_function.build-snapshot.arn}"
+    }
+  ]
+}
+EOF
+}
+
+# shared layer used by all lambda functions
+resource "aws_lambda_layer_version" "beyond" {
+  layer_name          = "beyond-shared"
+  filename            = "../layers/beyond/dist/beyond-layer.zip"
+  source_code_hash    = filebase64sha256("../layers/beyond/dist/beyond-layer.zip")
+  compatible_runtimes = ["python3.12"]
+}
+
 # get-user resources
 
 resource "aws_iam_role" "get-user" {
@@ -128,6 +318,14 @@ resource "aws_lambda_function" "get-user" {
   filename      = "../functions/get-user/dist/get-user.zip"
 
   runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
+
+  environment {
+    variables = {
+      SESSION_SECRET    = random_password.session_secret.result
+      GOOGLE_CLIENT_IDS = var.google_client_ids
+    }
+  }
 }
 
 
@@ -148,7 +346,7 @@ resource "aws_lambda_function_url" "get-user-url" {
   cors {
     allow_credentials = true
     allow_origins     = ["*"]
-    allow_methods     = ["GET"]
+    allow_methods     = ["GET", "POST"]
     allow_headers     = ["*"]
     expose_headers    = ["keep-alive", "date"]
   }
@@ -187,6 +385,14 @@ resource "aws_lambda_function" "delete-user" {
   filename      = "../functions/delete-user/dist/delete-user.zip"
 
   runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
+
+  environment {
+    variables = {
+      SESSION_SECRET    = random_password.session_secret.result
+      GOOGLE_CLIENT_IDS = var.google_client_ids
+    }
+  }
 }
 
 resource "aws_iam_role_policy_attachment" "delete-user_logs" {
@@ -244,6 +450,7 @@ resource "aws_lambda_function" "create-user" {
   filename      = "../functions/create-user/dist/create-user.zip"
 
   runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
 }
 
 resource "aws_iam_role_policy_attachment" "create-user_logs" {
@@ -302,6 +509,8 @@ resource "aws_lambda_function" "create-object" {
   filename      = "../functions/create-object/dist/create-object.zip"
 
   runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
+  timeout = 60
 }
 
 resource "aws_iam_role_policy_attachment" "create-object_logs" {
@@ -314,6 +523,11 @@ resource "aws_iam_role_policy_attachment" "create-object_dynamo" {
   policy_arn = aws_iam_policy.dynamo.arn
 }
 
+resource "aws_iam_role_policy_attachment" "create-object_invoke-build-snapshot" {
+  role       = aws_iam_role.create-object.name
+  policy_arn = aws_iam_policy.invoke-build-snapshot.arn
+}
+
 resource "aws_lambda_function_url" "create-object-url" {
   function_name      = aws_lambda_function.create-object.function_name
   authorization_type = "NONE"
@@ -359,6 +573,7 @@ resource "aws_lambda_function" "get-object" {
   filename      = "../functions/get-object/dist/get-object.zip"
 
   runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
 }
 
 
@@ -379,9 +594,9 @@ resource "aws_lambda_function_url" "get-object-url" {
   cors {
     allow_credentials = true
     allow_origins     = ["*"]
-    allow_methods     = ["GET"]
+    allow_methods     = ["GET", "POST"]
     allow_headers     = ["*"]
-    expose_headers    = ["keep-alive", "date"]
+    expose_headers    = ["keep-alive", "date", "etag", "cache-control"]
   }
 }
 
@@ -417,6 +632,14 @@ resource "aws_lambda_function" "get-all-objects" {
   filename      = "../functions/get-all-objects/dist/get-all-objects.zip"
 
   runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
+
+  environment {
+    variables = {
+      SCAN_SEGMENTS  = "4"
+      SNAPSHOT_STORE = "s3://${aws_s3_bucket.snapshots.bucket}/catalog.json.gz"
+    }
+  }
 }
 
 
@@ -430,6 +653,11 @@ resource "aws_iam_role_policy_attachment" "get-all-objects_dynamo" {
   policy_arn = aws_iam_policy.dynamo.arn
 }
 
+resource "aws_iam_role_policy_attachment" "get-all-objects_snapshots" {
+  role       = aws_iam_role.get-all-objects.name
+  policy_arn = aws_iam_policy.snapshots.arn
+}
+
 resource "aws_lambda_function_url" "get-all-objects-url" {
   function_name      = aws_lambda_function.get-all-objects.function_name
   authorization_type = "NONE"
@@ -439,7 +667,7 @@ resource "aws_lambda_function_url" "get-all-objects-url" {
     allow_origins     = ["*"]
     allow_methods     = ["GET"]
     allow_headers     = ["*"]
-    expose_headers    = ["keep-alive", "date"]
+    expose_headers    = ["keep-alive", "date", "etag", "cache-control"]
   }
 }
 
@@ -474,6 +702,7 @@ resource "aws_lambda_function" "add-favourite" {
   filename      = "../functions/add-favourite/dist/add-favourite.zip"
 
   runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
 }
 
 resource "aws_iam_role_policy_attachment" "add-favourite_logs" {
@@ -531,6 +760,7 @@ resource "aws_lambda_function" "get-favourites" {
   filename      = "../functions/get-favourites/dist/get-favourites.zip"
 
   runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
 }
 
 
@@ -588,6 +818,7 @@ resource "aws_lambda_function" "delete-favourite" {
   filename      = "../functions/delete-favourite/dist/delete-favourite.zip"
 
   runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
 }
 
 resource "aws_iam_role_policy_attachment" "delete-favourite_logs" {
@@ -644,6 +875,14 @@ resource "aws_lambda_function" "edit-user" {
   filename      = "../functions/edit-user/dist/edit-user.zip"
 
   runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
+
+  environment {
+    variables = {
+      SESSION_SECRET    = random_password.session_secret.result
+      GOOGLE_CLIENT_IDS = var.google_client_ids
+    }
+  }
 }
 
 resource "aws_iam_role_policy_attachment" "edit-user_logs" {
@@ -701,6 +940,9 @@ resource "aws_lambda_function" "delete-object" {
   filename      = "../functions/delete-object/dist/delete-object.zip"
 
   runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
+  timeout = 60
+  publish = true
 }
 
 resource "aws_iam_role_policy_attachment" "delete-object_logs" {
@@ -713,6 +955,11 @@ resource "aws_iam_role_policy_attachment" "delete-object_dynamo" {
   policy_arn = aws_iam_policy.dynamo.arn
 }
 
+resource "aws_iam_role_policy_attachment" "delete-object_invoke-build-snapshot" {
+  role       = aws_iam_role.delete-object.name
+  policy_arn = aws_iam_policy.invoke-build-snapshot.arn
+}
+
 resource "aws_lambda_function_url" "delete-object-url" {
   function_name      = aws_lambda_function.delete-object.function_name
   authorization_type = "NONE"
@@ -728,4 +975,325 @@ resource "aws_lambda_function_url" "delete-object-url" {
 
 output "delete-object-lambda_url" {
   value = aws_lambda_function_url.delete-object-url.function_url
+}
+
+# Catalog prunes are only served through this alias, whose URL requires
+# requests signed with IAM credentials.
+resource "aws_lambda_alias" "delete-object-prune" {
+  name             = "prune"
+  function_name    = aws_lambda_function.delete-object.function_name
+  function_version = aws_lambda_function.delete-object.version
+}
+
+resource "aws_lambda_function_url" "delete-object-prune-url" {
+  function_name      = aws_lambda_function.delete-object.function_name
+  qualifier          = aws_lambda_alias.delete-object-prune.name
+  authorization_type = "AWS_IAM"
+
+  cors {
+    allow_credentials = true
+    allow_origins     = ["*"]
+    allow_methods     = ["DELETE"]
+    allow_headers     = ["*"]
+    expose_headers    = ["keep-alive", "date"]
+  }
+}
+
+output "delete-object-prune-lambda_url" {
+  value = aws_lambda_function_url.delete-object-prune-url.function_url
+}
+
+# build-snapshot resources
+
+resource "aws_iam_role" "build-snapshot" {
+  name                = "iam-for-lambda-build-snapshot"
+  assume_role_policy  = <<EOF
+{
+"Version": "2012-10-17",
+"Statement": [
+  {
+    "Action": "sts:AssumeRole",
+    "Principal": {
+      "Service": "lambda.amazonaws.com"
+    },
+    "Effect": "Allow",
+    "Sid": ""
+  }
+]
+}
+EOF
+}
+
+resource "aws_lambda_function" "build-snapshot" {
+  role          = aws_iam_role.build-snapshot.arn
+  function_name = "build-snapshot"
+  handler       = local.lambda_handler
+  filename      = "../functions/build-snapshot/dist/build-snapshot.zip"
+
+  runtime = "python3.12"
+  timeout = 60
+  layers  = [aws_lambda_layer_version.beyond.arn]
+
+  environment {
+    variables = {
+      SNAPSHOT_STORE       = "s3://${aws_s3_bucket.snapshots.bucket}/catalog.json.gz"
+      NAMES_SNAPSHOT_STORE = "s3://${aws_s3_bucket.snapshots.bucket}/names.json.gz"
+      SNAPSHOT_GZIP        = "true"
+    }
+  }
+}
+
+resource "aws_iam_role_policy_attachment" "build-snapshot_logs" {
+  role       = aws_iam_role.build-snapshot.name
+  policy_arn = aws_iam_policy.logs.arn
+}
+
+resource "aws_iam_role_policy_attachment" "build-snapshot_dynamo" {
+  role       = aws_iam_role.build-snapshot.name
+  policy_arn = aws_iam_policy.dynamo.arn
+}
+
+resource "aws_iam_role_policy_attachment" "build-snapshot_snapshots" {
+  role       = aws_iam_role.build-snapshot.name
+  policy_arn = aws_iam_policy.snapshots.arn
+}
+
+# edit-favourites resources
+resource "aws_iam_role" "edit-favourites" {
+  name                = "iam-for-lambda-edit-favourites"
+  assume_role_policy  = <<EOF
+{
+"Version": "2012-10-17",
+"Statement": [
+  {
+    "Action": "sts:AssumeRole",
+    "Principal": {
+      "Service": "lambda.amazonaws.com"
+    },
+    "Effect": "Allow",
+    "Sid": ""
+  }
+]
+}
+EOF
+}
+
+resource "aws_lambda_function" "edit-favourites" {
+  role          = aws_iam_role.edit-favourites.arn
+  function_name = "edit-favourites"
+  handler       = local.lambda_handler
+  filename      = "../functions/edit-favourites/dist/edit-favourites.zip"
+
+  runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
+}
+
+resource "aws_iam_role_policy_attachment" "edit-favourites_logs" {
+  role       = aws_iam_role.edit-favourites.name
+  policy_arn = aws_iam_policy.logs.arn
+}
+
+resource "aws_iam_role_policy_attachment" "edit-favourites_dynamo" {
+  role       = aws_iam_role.edit-favourites.name
+  policy_arn = aws_iam_policy.dynamo.arn
+}
+
+resource "aws_lambda_function_url" "edit-favourites-url" {
+  function_name      = aws_lambda_function.edit-favourites.function_name
+  authorization_type = "NONE"
+
+  cors {
+    allow_credentials = true
+    allow_origins     = ["*"]
+    allow_methods     = ["POST"]
+    allow_headers     = ["*"]
+    expose_headers    = ["keep-alive", "date"]
+  }
+}
+
+output "edit-favourites-lambda_url" {
+  value = aws_lambda_function_url.edit-favourites-url.function_url
+}
+
+# search-objects resources
+resource "aws_iam_role" "search-objects" {
+  name                = "iam-for-lambda-search-objects"
+  assume_role_policy  = <<EOF
+{
+"Version": "2012-10-17",
+"Statement": [
+  {
+    "Action": "sts:AssumeRole",
+    "Principal": {
+      "Service": "lambda.amazonaws.com"
+    },
+    "Effect": "Allow",
+    "Sid": ""
+  }
+]
+}
+EOF
+}
+
+resource "aws_lambda_function" "search-objects" {
+  role          = aws_iam_role.search-objects.arn
+  function_name = "search-objects"
+  handler       = local.lambda_handler
+  filename      = "../functions/search-objects/dist/search-objects.zip"
+
+  runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
+}
+
+resource "aws_iam_role_policy_attachment" "search-objects_logs" {
+  role       = aws_iam_role.search-objects.name
+  policy_arn = aws_iam_policy.logs.arn
+}
+
+resource "aws_iam_role_policy_attachment" "search-objects_dynamo" {
+  role       = aws_iam_role.search-objects.name
+  policy_arn = aws_iam_policy.dynamo.arn
+}
+
+resource "aws_lambda_function_url" "search-objects-url" {
+  function_name      = aws_lambda_function.search-objects.function_name
+  authorization_type = "NONE"
+
+  cors {
+    allow_credentials = true
+    allow_origins     = ["*"]
+    allow_methods     = ["GET"]
+    allow_headers     = ["*"]
+    expose_headers    = ["keep-alive", "date"]
+  }
+}
+
+output "search-objects-lambda_url" {
+  value = aws_lambda_function_url.search-objects-url.function_url
+}
+
+# query-objects resources
+resource "aws_iam_role" "query-objects" {
+  name                = "iam-for-lambda-query-objects"
+  assume_role_policy  = <<EOF
+{
+"Version": "2012-10-17",
+"Statement": [
+  {
+    "Action": "sts:AssumeRole",
+    "Principal": {
+      "Service": "lambda.amazonaws.com"
+    },
+    "Effect": "Allow",
+    "Sid": ""
+  }
+]
+}
+EOF
+}
+
+resource "aws_lambda_function" "query-objects" {
+  role          = aws_iam_role.query-objects.arn
+  function_name = "query-objects"
+  handler       = local.lambda_handler
+  filename      = "../functions/query-objects/dist/query-objects.zip"
+
+  runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
+}
+
+resource "aws_iam_role_policy_attachment" "query-objects_logs" {
+  role       = aws_iam_role.query-objects.name
+  policy_arn = aws_iam_policy.logs.arn
+}
+
+resource "aws_iam_role_policy_attachment" "query-objects_dynamo" {
+  role       = aws_iam_role.query-objects.name
+  policy_arn = aws_iam_policy.dynamo.arn
+}
+
+resource "aws_lambda_function_url" "query-objects-url" {
+  function_name      = aws_lambda_function.query-objects.function_name
+  authorization_type = "NONE"
+
+  cors {
+    allow_credentials = true
+    allow_origins     = ["*"]
+    allow_methods     = ["GET"]
+    allow_headers     = ["*"]
+    expose_headers    = ["keep-alive", "date"]
+  }
+}
+
+output "query-objects-lambda_url" {
+  value = aws_lambda_function_url.query-objects-url.function_url
+}
+
+# search-names resources
+resource "aws_iam_role" "search-names" {
+  name                = "iam-for-lambda-search-names"
+  assume_role_policy  = <<EOF
+{
+"Version": "2012-10-17",
+"Statement": [
+  {
+    "Action": "sts:AssumeRole",
+    "Principal": {
+      "Service": "lambda.amazonaws.com"
+    },
+    "Effect": "Allow",
+    "Sid": ""
+  }
+]
+}
+EOF
+}
+
+resource "aws_lambda_function" "search-names" {
+  role          = aws_iam_role.search-names.arn
+  function_name = "search-names"
+  handler       = local.lambda_handler
+  filename      = "../functions/search-names/dist/search-names.zip"
+
+  runtime = "python3.12"
+  layers  = [aws_lambda_layer_version.beyond.arn]
+  timeout = 30
+
+  environment {
+    variables = {
+      NAMES_SNAPSHOT_STORE = "s3://${aws_s3_bucket.snapshots.bucket}/names.json.gz"
+    }
+  }
+}
+
+resource "aws_iam_role_policy_attachment" "search-names_logs" {
+  role       = aws_iam_role.search-names.name
+  policy_arn = aws_iam_policy.logs.arn
+}
+
+resource "aws_iam_role_policy_attachment" "search-names_dynamo" {
+  role       = aws_iam_role.search-names.name
+  policy_arn = aws_iam_policy.dynamo.arn
+}
+
+resource "aws_iam_role_policy_attachment" "search-names_snapshots" {
+  role       = aws_iam_role.search-names.name
+  policy_arn = aws_iam_policy.snapshots.arn
+}
+
+resource "aws_lambda_function_url" "search-names-url" {
+  function_name      = aws_lambda_function.search-names.function_name
+  authorization_type = "NONE"
+
+  cors {
+    allow_credentials = true
+    allow_origins     = ["*"]
+    allow_methods     = ["GET"]
+    allow_headers     = ["*"]
+    expose_headers    = ["keep-alive", "date"]
+  }
+}
+
+output "search-names-lambda_url" {
+  value = aws_lambda_function_url.search-names-url.function_url
 }
\ No newline at end of file
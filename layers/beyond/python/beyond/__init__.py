@@ -0,0 +1,3 @@
+"""
+Shared helpers for the BEYOND lambda functions, deployed as a Lambda layer.
+"""
@@ -0,0 +1,351 @@
+"""
+Password and Google sign-in checks shared by the user functions.
+
+bcrypt and requests are imported on first use, so functions that never
+authenticate do not pay for them at import time. Password hashes are
+checked with beyond.passwords.
+
+Google tokens are verified once for an email and then remembered by this
+container until they expire. A token is only accepted if it was issued to
+one of GOOGLE_CLIENT_IDS, for the given email, and Google has verified
+that email. Google ID tokens (JWTs) are verified locally against Google's
+signing keys, which are fetched once and cached, so most checks never call
+Google. Other access tokens, and every token when no client IDs are
+configured, are checked with Google's tokeninfo endpoint.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from beyond.passwords import verify_password
+
+# Google's tokeninfo endpoint and the JWKS holding its ID token signing keys.
+GOOGLE_TOKENINFO_URL = os.environ.get("GOOGLE_TOKENINFO_URL", "https://oauth2.googleapis.com/tokeninfo")
+GOOGLE_CERTS_URL = os.environ.get("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+# Issuers Google puts in its ID tokens.
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+# OAuth client IDs a token must be issued to, comma separated. ID tokens are
+# only verified locally when this is set.
+GOOGLE_CLIENT_IDS = [client_id for client_id in os.environ.get("GOOGLE_CLIENT_IDS", "").split(",") if client_id]
+# Seconds to wait for Google to accept a connection and to respond.
+GOOGLE_TIMEOUT = (
+    float(os.environ.get("GOOGLE_CONNECT_TIMEOUT", "1")),
+    float(os.environ.get("GOOGLE_READ_TIMEOUT", "2"))
+)
+# Longest a verified token is trusted without checking it again, in seconds.
+TOKEN_CACHE_TTL = int(os.environ.get("TOKEN_CACHE_TTL", "300"))
+# Largest number of verified tokens remembered.
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "1024"))
+# Seconds the signing keys are kept when Google does not say, and the
+# shortest time between fetches when a token names an unknown key.
+JWKS_TTL = int(os.environ.get("JWKS_TTL", "3600"))
+JWKS_MIN_REFRESH = 60
+# Seconds of clock difference allowed when checking token times.
+CLOCK_SKEW = 60
+
+# HTTP session reused across invocations, so calls to Google keep their connection.
+session_state = {"session": None}
+# Verified tokens, keyed by the SHA-256 hash of the token and email, with the
+# time they stop being trusted.
+token_cache = OrderedDict()
+# Google's signing keys by key ID, and when they were fetched and expire.
+jwks_state = {"keys": {}, "fetched_at": None, "expires_at": 0}
+
+# DER prefix of a SHA-256 DigestInfo, used in RS256 signatures.
+SHA256_PREFIX = bytes.fromhex("3031300d060960864801650304020105000420")
+
+def http_session():
+    """
+    Returns the HTTP session used to call Google, creating it on first use.
+    
+    Returns:
+    - Session: The requests session.
+    """
+    if session_state["session"] is None:
+        import requests
+        session_state["session"] = requests.Session()
+    return session_state["session"]
+
+def token_key(token, email):
+    """
+    Hashes a token and the email it was verified for into a cache key, so
+    tokens are never held in memory.
+    
+    Parameters:
+    - token (str): The token.
+    - email (str): The email the token was verified for.
+    
+    Returns:
+    - str: The hex SHA-256 hash of the token and email.
+    """
+    return hashlib.sha256(f"{email}\n{token}".encode("utf-8")).hexdigest()
+
+def cached_token(key):
+    """
+    Checks whether a token was verified and has not expired.
+    
+    Parameters:
+    - key (str): The hash of the token.
+    
+    Returns:
+    - bool: True if the token is still trusted, False otherwise.
+    """
+    expires_at = token_cache.get(key)
+    if expires_at is None:
+        return False
+    if expires_at <= time.monotonic():
+        del token_cache[key]
+        return False
+    token_cache.move_to_end(key)
+    return True
+
+def cache_token(key, expires_in):
+    """
+    Remembers a verified token until it expires, or for at most TOKEN_CACHE_TTL.
+    
+    Parameters:
+    - key (str): The hash of the token.
+    - expires_in (float): Seconds until the token expires.
+    """
+    ttl = min(expires_in, TOKEN_CACHE_TTL)
+    if ttl <= 0:
+        return
+    token_cache[key] = time.monotonic() + ttl
+    token_cache.move_to_end(key)
+    while len(token_cache) > TOKEN_CACHE_SIZE:
+        token_cache.popitem(last=False)
+
+def b64decode(value):
+    """
+    Decodes unpadded base64url, as used in JWTs and JWKS.
+    
+    Parameters:
+    - value (str): The encoded value.
+    
+    Returns:
+    - bytes: The decoded value.
+    """
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+def max_age(headers):
+    """
+    Reads how long a response may be cached from its Cache-Control header.
+    
+    Parameters:
+    - headers (dict): The response headers.
+    
+    Returns:
+    - int: The max-age in seconds, or JWKS_TTL if none is given.
+    """
+    match = re.search(r"max-age=(\d+)", headers.get("Cache-Control", ""))
+    return int(match.group(1)) if match else JWKS_TTL
+
+def signing_keys(kid):
+    """
+    Returns Google's signing keys, fetching them when they expire or when a
+    token names a key that is not known yet.
+    
+    Parameters:
+    - kid (str): The key ID the token was signed with.
+    
+    Returns:
+    - dict: RSA public keys as (n, e) integers by key ID, or None if they
+      could not be fetched.
+    """
+    now = time.monotonic()
+    fresh = now < jwks_state["expires_at"]
+    unknown = kid not in jwks_state["keys"]
+    may_refetch = jwks_state["fetched_at"] is None or now - jwks_state["fetched_at"] >= JWKS_MIN_REFRESH
+    if not fresh or (unknown and may_refetch):
+        try:
+            response = http_session().get(GOOGLE_CERTS_URL, timeout=GOOGLE_TIMEOUT)
+            response.raise_for_status()
+            jwks_state["keys"] = {
+                key["kid"]: (int.from_bytes(b64decode(key["n"]), "big"), int.from_bytes(b64decode(key["e"]), "big"))
+                for key in response.json()["keys"]
+                if key.get("kty") == "RSA"
+            }
+            jwks_state["fetched_at"] = now
+            jwks_state["expires_at"] = now + max_age(response.headers)
+        except Exception as e:
+            print(f"Error fetching Google signing keys: {e}")
+            if not jwks_state["keys"]:
+                return None
+    return jwks_state["keys"]
+
+def verify_rs256(signing_input, signature, public_key):
+    """
+    Verifies an RSASSA-PKCS1-v1_5 SHA-256 signature.
+    
+    Parameters:
+    - signing_input (bytes): The signed bytes, the JWT header and payload.
+    - signature (bytes): The signature.
+    - public_key (tuple): The RSA modulus and exponent.
+    
+    Returns:
+    - bool: True if the signature is valid, False otherwise.
+    """
+    n, e = public_key
+    size = (n.bit_length() + 7) // 8
+    if len(signature) != size:
+        return False
+    encoded = pow(int.from_bytes(signature, "big"), e, n).to_bytes(size, "big")
+    digest_info = SHA256_PREFIX + hashlib.sha256(signing_input).digest()
+    expected = b"\x00\x01" + b"\xff" * (size - len(digest_info) - 3) + b"\x00" + digest_info
+    return hmac.compare_digest(encoded, expected)
+
+def verified_email(info, email):
+    """
+    Checks that Google token claims are for the given email and that Google
+    has verified it.
+    
+    Parameters:
+    - info (dict): The ID token claims or tokeninfo response.
+    - email (str): The email the user signs in as.
+    
+    Returns:
+    - bool: True if the claims are for the verified email, False otherwise.
+    """
+    return info.get("email") == email and info.get("email_verified") in (True, "true")
+
+def verify_id_token(token, email):
+    """
+    Verifies a Google ID token locally: its signature against Google's
+    signing keys, its issuer, audience, email and expiry.
+    
+    Parameters:
+    - token (str): The JWT.
+    - email (str): The email the user signs in as.
+    
+    Returns:
+    - float: Seconds until the token expires, at least 0, if it is valid,
+      False if it is invalid, or None if it could not be checked locally.
+    """
+    if not GOOGLE_CLIENT_IDS:
+        # The audience cannot be checked, so leave the token to tokeninfo.
+        return None
+    try:
+        header_part, payload_part, signature_part = token.split(".")
+        header = json.loads(b64decode(header_part))
+        claims = json.loads(b64decode(payload_part))
+        signature = b64decode(signature_part)
+    except ValueError:
+        # Not a JWT, e.g. an access token that happens to contain two dots.
+        return None
+    if not isinstance(header, dict) or not isinstance(claims, dict) or header.get("alg") != "RS256":
+        return False
+    kid = header.get("kid")
+    if not isinstance(kid, str):
+        return False
+    try:
+        keys = signing_keys(kid)
+        if keys is None:
+            return None
+        public_key = keys.get(kid)
+    except TypeError:
+        return False
+    if public_key is None:
+        return False
+    if not verify_rs256(f"{header_part}.{payload_part}".encode("ascii"), signature, public_key):
+        return False
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        return False
+    if claims.get("aud") not in GOOGLE_CLIENT_IDS or not verified_email(claims, email):
+        return False
+    try:
+        expires_in = float(claims["exp"]) - time.time()
+    except (KeyError, TypeError, ValueError):
+        return False
+    # Accept a token up to CLOCK_SKEW after it expires, but never cache it
+    # past its expiry.
+    return max(expires_in, 0.0) if expires_in > -CLOCK_SKEW else False
+
+def tokeninfo(access_token, email):
+    """
+    Checks a token with Google's tokeninfo endpoint, including its email
+    and, when GOOGLE_CLIENT_IDS is set, the client it was issued to.
+    
+    Parameters:
+    - access_token (str): The Google OAuth2 access token.
+    - email (str): The email the user signs in as.
+    
+    Returns:
+    - float: Seconds until the token expires, at least 0, if it is valid,
+      False otherwise.
+    """
+    # Prepare the authorization header with the access token.
+    headers = {"Authorization": f"Bearer {access_token}"}
+    try:
+        response = http_session().get(GOOGLE_TOKENINFO_URL, headers=headers, timeout=GOOGLE_TIMEOUT)
+    except Exception as e:
+        print(f"Error calling Google tokeninfo: {e}")
+        return False
+    # If the response status code is 200, the token is valid.
+    if response.status_code != 200:
+        return False
+    try:
+        info = response.json()
+    except ValueError:
+        return False
+    if not isinstance(info, dict) or not verified_email(info, email):
+        return False
+    if GOOGLE_CLIENT_IDS and info.get("aud") not in GOOGLE_CLIENT_IDS and info.get("azp") not in GOOGLE_CLIENT_IDS:
+        return False
+    try:
+        return max(float(info["expires_in"]), 0.0)
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        return max(float(info["exp"]) - time.time(), 0.0)
+    except (KeyError, TypeError, ValueError):
+        # Valid, but with no expiry given, so trust it for the shortest time.
+        return min(TOKEN_CACHE_TTL, JWKS_MIN_REFRESH)
+
+def authenticate_google_user(access_token, email):
+    """
+    Verifies if a user is authenticated with Google as the given email using
+    the provided access token.
+    
+    Tokens verified before for the same email are trusted until they expire.
+    ID tokens are verified locally, and anything else with Google's
+    tokeninfo endpoint.
+    
+    Parameters:
+    - access_token (str): The Google OAuth2 access token or ID token.
+    - email (str): The email the user signs in as.
+    
+    Returns:
+    - bool: True if the user is authenticated with Google, False otherwise.
+    """
+    if not access_token or not email:
+        return False
+    key = token_key(access_token, email)
+    if cached_token(key):
+        return True
+    expires_in = None
+    if access_token.count(".") == 2:
+        expires_in = verify_id_token(access_token, email)
+    if expires_in is None:
+        expires_in = tokeninfo(access_token, email)
+    if expires_in is False:
+        return False
+    cache_token(key, expires_in)
+    return True
+
+def authenticate_user(given_password, stored_password):
+    """
+    Verifies if the provided password matches the stored hashed password.
+    
+    Parameters:
+    - given_password (str): The password provided by the user.
+    - stored_password (str): The hashed password stored in the database.
+    
+    Returns:
+    - bool: True if the passwords match, False otherwise.
+    """
+    # Compare with the algorithm and cost the stored hash was made with.
+    return verify_password(given_password, stored_password)
@@ -0,0 +1,140 @@
+"""
+Lazily created, shared AWS clients for the BEYOND lambda functions.
+
+Importing boto3 and creating clients is a large part of a cold start, and
+many invocations never touch some of the tables a function is configured
+with. Nothing here imports boto3 until a client is first used, and every
+client is created once per container with a connection pool, keep-alive,
+adaptive retries and short timeouts.
+"""
+import os
+import threading
+
+# Largest number of connections kept open per client.
+MAX_POOL_CONNECTIONS = int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", "32"))
+# Seconds to wait for a connection and for a response.
+CONNECT_TIMEOUT = float(os.environ.get("AWS_CONNECT_TIMEOUT", "2"))
+READ_TIMEOUT = float(os.environ.get("AWS_READ_TIMEOUT", "5"))
+# Attempts per call, including the first, with adaptive client-side rate limiting.
+MAX_ATTEMPTS = int(os.environ.get("AWS_MAX_ATTEMPTS", "5"))
+
+# Clients and resources created so far, keyed by service and endpoint.
+clients = {}
+resources = {}
+# Guards client creation, which is not thread safe in boto3.
+lock = threading.Lock()
+# Per-thread resources, since boto3 resources are not thread safe.
+thread_local = threading.local()
+
+def config():
+    """
+    Builds the botocore configuration shared by every client.
+    
+    Returns:
+    - Config: The client configuration.
+    """
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        retries={"mode": "adaptive", "max_attempts": MAX_ATTEMPTS}
+    )
+
+def client(service, endpoint_url=None):
+    """
+    Returns the low-level client for a service, creating it on first use.
+    Low-level clients are thread safe, so one is shared by every thread.
+    
+    Parameters:
+    - service (str): The service name, e.g. "dynamodb".
+    - endpoint_url (str): A custom endpoint for the service. Optional.
+    
+    Returns:
+    - BaseClient: The client.
+    """
+    key = (service, endpoint_url)
+    if key not in clients:
+        with lock:
+            if key not in clients:
+                import boto3
+                clients[key] = boto3.client(service, endpoint_url=endpoint_url, config=config())
+    return clients[key]
+
+def resource(service):
+    """
+    Returns the resource for a service, creating it on first use.
+    
+    Parameters:
+    - service (str): The service name, e.g. "dynamodb".
+    
+    Returns:
+    - ServiceResource: The resource.
+    """
+    if service not in resources:
+        with lock:
+            if service not in resources:
+                import boto3
+                resources[service] = boto3.resource(service, config=config())
+    return resources[service]
+
+def resource_client(service):
+    """
+    Returns the low-level client of a service's resource. Unlike client(), it
+    accepts and returns plain Python values, as a Table does, and like any
+    low-level client it is thread safe.
+    
+    Parameters:
+    - service (str): The service name, e.g. "dynamodb".
+    
+    Returns:
+    - BaseClient: The client of the resource.
+    """
+    return resource(service).meta.client
+
+class LazyTable:
+    """
+    A DynamoDB table handle that creates the underlying resource on first
+    use. Its name is available without creating anything.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.table = None
+
+    def __getattr__(self, attribute):
+        if self.table is None:
+            self.table = resource("dynamodb").Table(self.name)
+        return getattr(self.table, attribute)
+
+def table(name):
+    """
+    Returns a handle for a DynamoDB table that connects on first use.
+    
+    Parameters:
+    - name (str): The name of the table.
+    
+    Returns:
+    - LazyTable: The table handle.
+    """
+    return LazyTable(name)
+
+def thread_table(name):
+    """
+    Returns a DynamoDB table handle owned by the current thread, for worker
+    threads that cannot share a resource.
+    
+    Parameters:
+    - name (str): The name of the table.
+    
+    Returns:
+    - Table: The table, created once per thread.
+    """
+    tables = thread_local.__dict__.setdefault("tables", {})
+    if name not in tables:
+        import boto3
+        with lock:
+            session = boto3.session.Session()
+        tables[name] = session.resource("dynamodb", config=config()).Table(name)
+    return tables[name]
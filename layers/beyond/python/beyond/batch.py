@@ -0,0 +1,156 @@
+"""
+Batched BatchGetItem and BatchWriteItem calls. Requests are split into the
+largest chunks DynamoDB accepts, optionally sent from a pool of threads,
+and unprocessed keys and items are retried with jittered exponential backoff.
+"""
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Largest number of keys DynamoDB accepts in one BatchGetItem request.
+BATCH_GET_SIZE = 100
+# Number of times unprocessed keys are retried before giving up.
+BATCH_RETRIES = 5
+# Seconds waited before the first retry of unprocessed keys, doubled on every retry.
+BATCH_BACKOFF = 0.05
+
+def batch_get_chunk(client, table_name, keys, projection=None):
+    """
+    Reads up to BATCH_GET_SIZE items with BatchGetItem, retrying the keys
+    DynamoDB leaves unprocessed with jittered exponential backoff.
+    
+    Parameters:
+    - client: A DynamoDB client, e.g. aws.resource_client("dynamodb").
+    - table_name (str): The table to read from.
+    - keys (list): The primary keys of the items to read.
+    - projection (list): The attributes to read. Defaults to all of them.
+    
+    Returns:
+    - list: The items that were found.
+    
+    Raises:
+    - RuntimeError: If keys are still unprocessed after BATCH_RETRIES retries.
+    """
+    items = []
+    request = {table_name: {"Keys": keys}}
+    if projection:
+        names = {f"#{attribute}": attribute for attribute in projection}
+        request[table_name]["ProjectionExpression"] = ", ".join(names)
+        request[table_name]["ExpressionAttributeNames"] = names
+    for attempt in range(BATCH_RETRIES + 1):
+        response = client.batch_get_item(RequestItems=request)
+        items.extend(response["Responses"].get(table_name, []))
+        request = response.get("UnprocessedKeys")
+        if not request:
+            return items
+        if attempt < BATCH_RETRIES:
+            time.sleep(BATCH_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
+    raise RuntimeError("Failed to read all items, please retry")
+
+def batch_get(client, table_name, keys, workers=1, projection=None):
+    """
+    Reads many items with BatchGetItem, in chunks of BATCH_GET_SIZE keys.
+    
+    The client must be a low-level client (which is thread safe) rather than
+    a Table, so chunks can be read concurrently. Using the client of a
+    DynamoDB resource keeps the resource's Python types for the items. With
+    a plain client, keys and items are in the wire format, as used by
+    fastjson.serialize_item and fastjson.items.
+    
+    Parameters:
+    - client: A DynamoDB client, e.g. aws.resource_client("dynamodb").
+    - table_name (str): The table to read from.
+    - keys (list): The primary keys of the items to read, without duplicates.
+    - workers (int): The number of chunks to read concurrently.
+    - projection (list): The attributes to read. Defaults to all of them.
+    
+    Returns:
+    - list: The items that were found, in no particular order.
+    """
+    chunks = [keys[i:i + BATCH_GET_SIZE] for i in range(0, len(keys), BATCH_GET_SIZE)]
+    if workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            results = list(executor.map(lambda chunk: batch_get_chunk(client, table_name, chunk, projection), chunks))
+    else:
+        results = [batch_get_chunk(client, table_name, chunk, projection) for chunk in chunks]
+    return [item for result in results for item in result]
+
+# Largest number of items DynamoDB accepts in one BatchWriteItem request.
+BATCH_WRITE_SIZE = 25
+
+def batch_write_chunk(client, table_name, requests):
+    """
+    Writes up to BATCH_WRITE_SIZE put or delete requests with BatchWriteItem,
+    retrying the items DynamoDB leaves unprocessed with jittered exponential
+    backoff.
+    
+    Parameters:
+    - client: A DynamoDB client, e.g. aws.resource_client("dynamodb").
+    - table_name (str): The table to write to.
+    - requests (list): WriteRequest dicts, e.g. {"PutRequest": {"Item": item}}.
+    
+    Returns:
+    - list: The requests that were still unprocessed after BATCH_RETRIES retries.
+    """
+    request = {table_name: requests}
+    for attempt in range(BATCH_RETRIES + 1):
+        response = client.batch_write_item(RequestItems=request)
+        request = response.get("UnprocessedItems")
+        if not request:
+            return []
+        if attempt < BATCH_RETRIES:
+            time.sleep(BATCH_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
+    return request.get(table_name, [])
+
+def chunked(iterable, size):
+    """
+    Generator that groups an iterable into lists of at most size items.
+    """
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def batch_write(client, table_name, requests, workers=1):
+    """
+    Streams write requests to DynamoDB with BatchWriteItem, in chunks of
+    BATCH_WRITE_SIZE.
+    
+    The requests are consumed lazily, and with several workers at most two
+    chunks per worker are in flight, so memory stays flat for large inputs.
+    
+    Parameters:
+    - client: A DynamoDB client, e.g. aws.resource_client("dynamodb").
+    - table_name (str): The table to write to.
+    - requests (iterable): WriteRequest dicts, e.g. {"PutRequest": {"Item": item}}.
+    - workers (int): The number of chunks to write concurrently.
+    
+    Returns:
+    - tuple: (written, unprocessed), the number of requests written and the
+      requests that could not be written.
+    """
+    written = 0
+    unprocessed = []
+    def collect(chunk, failed):
+        nonlocal written
+        written += len(chunk) - len(failed)
+        unprocessed.extend(failed)
+    if workers <= 1:
+        for chunk in chunked(requests, BATCH_WRITE_SIZE):
+            collect(chunk, batch_write_chunk(client, table_name, chunk))
+        return written, unprocessed
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in chunked(requests, BATCH_WRITE_SIZE):
+            in_flight.append((chunk, executor.submit(batch_write_chunk, client, table_name, chunk)))
+            if len(in_flight) >= workers * 2:
+                chunk, future = in_flight.popleft()
+                collect(chunk, future.result())
+        for chunk, future in in_flight:
+            collect(chunk, future.result())
+    return written, unprocessed
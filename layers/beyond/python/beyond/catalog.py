@@ -0,0 +1,314 @@
+"""
+The catalog version marker, conditional responses, snapshot stores and
+object cache shared by the functions that read and change beyond-objects.
+
+create-object and delete-object bump the version marker in beyond-meta and
+ask build-snapshot to rebuild the snapshot. Readers check the marker at
+most once per VERSION_CHECK_INTERVAL seconds to tell when their caches and
+the snapshot are stale.
+"""
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+from beyond import aws
+from beyond import fastjson
+from beyond.batch import batch_get
+
+# Seconds between checks of the catalog version marker.
+VERSION_CHECK_INTERVAL = int(os.environ.get("VERSION_CHECK_INTERVAL", "10"))
+# Cache-Control header sent with successful responses.
+CACHE_CONTROL = os.environ.get("CACHE_CONTROL", "public, max-age=60")
+# Name of the function that rebuilds the catalog snapshot.
+SNAPSHOT_FUNCTION = os.environ.get("SNAPSHOT_FUNCTION", "build-snapshot")
+
+# Table holding the catalog version marker.
+meta_table = aws.table("beyond-meta")
+
+# Last catalog version seen and when it was checked.
+version_state = {"version": None, "checked_at": 0}
+# Functions called when the catalog version changes.
+version_listeners = []
+
+def get_catalog_version():
+    """
+    Reads the catalog version marker from the meta table.
+    
+    Returns:
+    - int: The current catalog version, or None if it could not be read.
+    """
+    try:
+        response = meta_table.get_item(Key={"id": "catalog"})
+        return int(response.get("Item", {}).get("version", 0))
+    except Exception as e:
+        print(f"Error reading catalog version: {e}")
+        return None
+
+def on_version_change(listener):
+    """
+    Registers a function to call when the catalog version changes, e.g. to
+    clear a cache.
+    
+    Parameters:
+    - listener (function): Called with no arguments.
+    """
+    version_listeners.append(listener)
+
+def current_version():
+    """
+    Returns the catalog version, reading the marker at most once per
+    VERSION_CHECK_INTERVAL seconds.
+    
+    Returns:
+    - int: The last known catalog version.
+    """
+    now = time.monotonic()
+    if version_state["version"] is None or now - version_state["checked_at"] >= VERSION_CHECK_INTERVAL:
+        version = get_catalog_version()
+        if version is not None:
+            if version != version_state["version"]:
+                for listener in version_listeners:
+                    listener()
+            version_state["version"] = version
+        version_state["checked_at"] = now
+    return version_state["version"]
+
+def bump_catalog_version():
+    """
+    Increments the catalog version marker so cached catalogs are invalidated.
+    """
+    try:
+        meta_table.update_item(
+            Key={"id": "catalog"},
+            UpdateExpression="ADD #version :one",
+            ExpressionAttributeNames={"#version": "version"},
+            ExpressionAttributeValues={":one": 1}
+        )
+    except Exception as e:
+        print(f"Error updating catalog version: {e}")
+
+def request_snapshot_rebuild():
+    """
+    Asks the build-snapshot function to rebuild the catalog snapshot without
+    waiting for it to finish.
+    """
+    try:
+        aws.client("lambda").invoke(
+            FunctionName=SNAPSHOT_FUNCTION,
+            InvocationType="Event"
+        )
+    except Exception as e:
+        print(f"Error requesting snapshot rebuild: {e}")
+
+def make_etag(body):
+    """
+    Builds a strong ETag from the hash of a response body.
+    
+    Parameters:
+    - body (str): The serialized response body.
+    
+    Returns:
+    - str: The quoted ETag value.
+    """
+    return '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match, etag):
+    """
+    Checks whether an If-None-Match header matches the given ETag.
+    
+    Parameters:
+    - if_none_match (str): The If-None-Match header sent by the client, or None.
+    - etag (str): The ETag of the current response.
+    
+    Returns:
+    - bool: True if the client's copy is still current, False otherwise.
+    """
+    if not if_none_match:
+        return False
+    # Weak comparison, so compressed variants match their original.
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == "*" or tag == etag:
+            return True
+    return False
+
+def conditional_response(event, body, etag):
+    """
+    Builds a 200 response, or a 304 with an empty body if the client already
+    has the current version.
+    
+    Parameters:
+    - event (dict): The event dict containing the request headers.
+    - body (str): The serialized response body.
+    - etag (str): The ETag of the body.
+    
+    Returns:
+    - dict: A response object with statusCode, headers and body.
+    """
+    headers = {
+        "Content-Type": "application/json",
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL
+    }
+    if etag_matches((event.get("headers") or {}).get("if-none-match"), etag):
+        return {"statusCode": 304, "headers": headers, "body": ""}
+    return {"statusCode": 200, "headers": headers, "body": body}
+
+class ObjectCache:
+    """
+    Objects of beyond-objects kept across warm invocations, keyed by NGC in
+    least recently used order. Objects expire after ttl seconds or when the
+    catalog version marker changes, and the least recently used object is
+    evicted once the cache holds size objects.
+    """
+
+    def __init__(self, table_name, ttl, size, workers=1):
+        self.table_name = table_name
+        self.ttl = ttl
+        self.size = size
+        self.workers = workers
+        self.entries = OrderedDict()
+        # The catalog changed, so every cached object may be stale.
+        on_version_change(self.entries.clear)
+
+    def get(self, key):
+        """
+        Returns the cache entry of an object if it is cached and current.
+        
+        Parameters:
+        - key (int): The NGC of the object.
+        
+        Returns:
+        - dict: The entry, holding the object under "object", or None.
+        """
+        current_version()
+        entry = self.entries.get(key)
+        if entry and time.monotonic() - entry["loaded_at"] < self.ttl:
+            self.entries.move_to_end(key)
+            return entry
+        return None
+
+    def put(self, key, obj, **fields):
+        """
+        Adds an object to the cache, evicting the least recently used object
+        if the cache is full.
+        
+        Parameters:
+        - key (int): The NGC of the object.
+        - obj (dict): The object read from the table.
+        - fields: Other values to keep with the object, e.g. its encoded body.
+        
+        Returns:
+        - dict: The cache entry.
+        """
+        entry = dict(fields, object=obj, loaded_at=time.monotonic())
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return entry
+
+    def get_many(self, ngcs):
+        """
+        Returns many objects, reading only those that are not cached with
+        concurrent BatchGetItem chunks.
+        
+        Parameters:
+        - ngcs (list): The NGCs of the objects.
+        
+        Returns:
+        - dict: The objects that were found, keyed by NGC.
+        
+        Raises:
+        - ClientError: If the objects could not be read.
+        - RuntimeError: If some keys were still unprocessed after retries.
+        """
+        objects = {}
+        missing = []
+        for key in dict.fromkeys(ngcs):
+            entry = self.get(key)
+            if entry:
+                objects[key] = entry["object"]
+            else:
+                missing.append(key)
+        if missing:
+            keys = [fastjson.serialize_item({"ngc": key}) for key in missing]
+            for item in fastjson.items(batch_get(aws.client("dynamodb"), self.table_name, keys, self.workers)):
+                objects[item["ngc"]] = self.put(item["ngc"], item)["object"]
+        return objects
+
+class LocalSnapshotStore:
+    """
+    Stores a snapshot on the local filesystem, with its catalog version in
+    a sidecar file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, data, version, compressed):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "wb") as f:
+            f.write(data)
+        with open(self.path + ".meta", "w") as f:
+            json.dump({"version": version, "compressed": compressed}, f)
+
+    def read(self):
+        with open(self.path + ".meta") as f:
+            meta = json.load(f)
+        with open(self.path, "rb") as f:
+            return f.read(), meta["version"], meta["compressed"]
+
+class S3SnapshotStore:
+    """
+    Stores a snapshot in an S3 compatible bucket, with its catalog version
+    in the object metadata.
+    """
+
+    def __init__(self, bucket, key, endpoint_url=None):
+        self.bucket = bucket
+        self.key = key
+        self.endpoint_url = endpoint_url
+
+    def write(self, data, version, compressed):
+        aws.client("s3", self.endpoint_url).put_object(
+            Bucket=self.bucket,
+            Key=self.key,
+            Body=data,
+            ContentType="application/json",
+            Metadata={"version": str(version), "compressed": str(compressed).lower()}
+        )
+
+    def read(self):
+        response = aws.client("s3", self.endpoint_url).get_object(Bucket=self.bucket, Key=self.key)
+        meta = response["Metadata"]
+        return response["Body"].read(), int(meta["version"]), meta["compressed"] == "true"
+
+def snapshot_store(url, endpoint_url=None):
+    """
+    Creates the snapshot store described by a URL.
+    
+    Parameters:
+    - url (str): A "file://" or "s3://" URL for the snapshot.
+    - endpoint_url (str): Endpoint of an S3 compatible service. Optional.
+    
+    Returns:
+    - LocalSnapshotStore or S3SnapshotStore: The store, or None if no URL is configured.
+    
+    Raises:
+    - ValueError: If the URL scheme is not supported.
+    """
+    if not url:
+        return None
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return LocalSnapshotStore(parsed.path)
+    if parsed.scheme == "s3":
+        return S3SnapshotStore(parsed.netloc, parsed.path.lstrip("/"), endpoint_url)
+    raise ValueError(f"Unsupported snapshot store: {url}")
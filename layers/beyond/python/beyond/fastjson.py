@@ -0,0 +1,195 @@
+"""
+JSON encoding for DynamoDB data, used in place of simplejson.
+
+A Table returns every DynamoDB number as a Decimal, which stdlib json
+cannot encode and simplejson encodes slowly. Items read with a low-level
+client can instead be decoded here straight from the wire format, with
+numbers turned into int and float once, so they are encoded as native
+values. Encoding uses orjson when it is installed and stdlib json
+otherwise, with the same compact output either way.
+
+Decimals and sets that still come from a Table are converted as they are
+encoded.
+"""
+import json
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; stdlib json is always available.
+    orjson = None
+
+def number(text):
+    """
+    Converts a DynamoDB number to an int, or a float if it has a fraction or
+    an exponent.
+    
+    Parameters:
+    - text (str or Decimal): The number, as sent by DynamoDB or read by a Table.
+    
+    Returns:
+    - int or float: The number.
+    """
+    text = str(text)
+    if "." in text or "e" in text or "E" in text:
+        return float(text)
+    return int(text)
+
+def deserialize(value):
+    """
+    Decodes a DynamoDB attribute value from the wire format.
+    
+    Parameters:
+    - value (dict): The attribute value, e.g. {"N": "224"}.
+    
+    Returns:
+    - The plain Python value, with numbers as int or float.
+    """
+    (tag, data), = value.items()
+    return DESERIALIZERS[tag](data)
+
+# Decoders for each DynamoDB type descriptor.
+DESERIALIZERS = {
+    "S": str,
+    "N": number,
+    "BOOL": bool,
+    "NULL": lambda data: None,
+    "B": bytes,
+    "M": lambda data: {key: deserialize(value) for key, value in data.items()},
+    "L": lambda data: [deserialize(value) for value in data],
+    "SS": set,
+    "NS": lambda data: {number(text) for text in data},
+    "BS": lambda data: {bytes(value) for value in data}
+}
+
+def item(raw):
+    """
+    Decodes an item read with a low-level client.
+    
+    Parameters:
+    - raw (dict): The item in the DynamoDB wire format.
+    
+    Returns:
+    - dict: The item with plain Python values.
+    """
+    return {name: DESERIALIZERS[tag](data) for name, value in raw.items() for tag, data in value.items()}
+
+def items(raws):
+    """
+    Decodes the items of a page read with a low-level client.
+    
+    Parameters:
+    - raws (list): The items in the DynamoDB wire format.
+    
+    Returns:
+    - list: The items with plain Python values.
+    """
+    return [item(raw) for raw in raws]
+
+def serialize(value):
+    """
+    Encodes a plain Python value into a DynamoDB attribute value, e.g. to
+    build the key of a request made with a low-level client.
+    
+    Parameters:
+    - value: A str, bool, int, float, Decimal, None, list, dict or set.
+    
+    Returns:
+    - dict: The attribute value in the DynamoDB wire format.
+    
+    Raises:
+    - TypeError: If the value cannot be stored in DynamoDB.
+    """
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if isinstance(value, (int, float, Decimal)):
+        return {"N": str(value)}
+    if isinstance(value, str):
+        return {"S": value}
+    if value is None:
+        return {"NULL": True}
+    if isinstance(value, dict):
+        return {"M": {key: serialize(member) for key, member in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {"L": [serialize(member) for member in value]}
+    if isinstance(value, (set, frozenset)) and value:
+        if all(isinstance(member, str) for member in value):
+            return {"SS": sorted(value)}
+        return {"NS": [str(member) for member in sorted(value)]}
+    raise TypeError(f"Cannot serialize {value!r} for DynamoDB")
+
+def serialize_item(values):
+    """
+    Encodes a key, a start key or expression attribute values for a
+    low-level client.
+    
+    Parameters:
+    - values (dict): The attributes as plain Python values.
+    
+    Returns:
+    - dict: The attributes in the DynamoDB wire format.
+    """
+    return {name: serialize(value) for name, value in values.items()}
+
+def default(value):
+    """
+    Encodes the values the JSON encoders do not support natively.
+    
+    Parameters:
+    - value: The value to encode.
+    
+    Returns:
+    - int, float, list or dict: The JSON compatible value.
+    
+    Raises:
+    - TypeError: If the value cannot be encoded.
+    """
+    if isinstance(value, Decimal):
+        return number(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if hasattr(value, "__slots__"):
+        # Records, such as those from beyond.records, encode as objects
+        # without the attributes that were never set.
+        return {name: getattr(value, name) for name in value.__slots__ if hasattr(value, name)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value):
+    """
+    Encodes a value as compact JSON.
+    
+    Parameters:
+    - value: The value to encode.
+    
+    Returns:
+    - str: The JSON text.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=default).decode("utf-8")
+    return json.dumps(value, default=default, separators=(",", ":"), ensure_ascii=False)
+
+def loads(data):
+    """
+    Decodes JSON text.
+    
+    Parameters:
+    - data (str or bytes): The JSON text.
+    
+    Returns:
+    - The decoded value.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def load(f):
+    """
+    Decodes JSON from a file.
+    
+    Parameters:
+    - f (file): The file to read.
+    
+    Returns:
+    - The decoded value.
+    """
+    return loads(f.read())
@@ -0,0 +1,224 @@
+"""
+Favourites stored as a DynamoDB number set on the user, changed with
+single ADD and DELETE update expressions instead of rewriting the list.
+
+Users whose favourites are still stored as a list are migrated the first
+time they are changed. All users can be migrated up front with:
+    python -m beyond.favourites migrate
+"""
+import sys
+from beyond import aws
+
+def as_set(favourites):
+    """
+    Normalizes stored favourites, either a number set or a legacy list, into
+    a set of NGCs.
+    
+    Parameters:
+    - favourites (set or list): The favourites attribute of a user, or None.
+    
+    Returns:
+    - set: The favourite NGCs.
+    """
+    return set(favourites or [])
+
+def migrate_user(table, email):
+    """
+    Converts a user's favourites from a list to a number set. The write is
+    conditional on the attribute still being a list, so concurrent migrations
+    are safe.
+    
+    Parameters:
+    - table (Table): The beyond-users table.
+    - email (str): The email of the user.
+    
+    Returns:
+    - bool: True if the favourites were migrated, False if there was nothing to do.
+    """
+    from botocore.exceptions import ClientError
+    user = table.get_item(Key={"email": email}, ProjectionExpression="favourites", ConsistentRead=True).get("Item")
+    favourites = (user or {}).get("favourites")
+    if not isinstance(favourites, list):
+        return False
+    try:
+        if favourites:
+            table.update_item(
+                Key={"email": email},
+                UpdateExpression="SET favourites = :set",
+                ConditionExpression="attribute_type(favourites, :list)",
+                ExpressionAttributeValues={":set": set(favourites), ":list": "L"}
+            )
+        else:
+            # Sets cannot be empty, so an empty list is removed instead.
+            table.update_item(
+                Key={"email": email},
+                UpdateExpression="REMOVE favourites",
+                ConditionExpression="attribute_type(favourites, :list)",
+                ExpressionAttributeValues={":list": "L"}
+            )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+    return True
+
+def with_migration(table, email, update):
+    """
+    Runs an update, migrating the user's favourites and retrying once if they
+    are still stored as a list.
+    
+    Parameters:
+    - table (Table): The beyond-users table.
+    - email (str): The email of the user.
+    - update (function): The update to run.
+    
+    Returns:
+    - The result of the update.
+    """
+    from botocore.exceptions import ClientError
+    try:
+        return update()
+    except ClientError as e:
+        # ADD and DELETE fail with a ValidationException on a list attribute.
+        if e.response["Error"]["Code"] != "ValidationException" or not migrate_user(table, email):
+            raise
+    return update()
+
+def add_favourite(table, email, ngc):
+    """
+    Adds a favourite to a user with a single conditional ADD.
+    
+    Parameters:
+    - table (Table): The beyond-users table.
+    - email (str): The email of the user.
+    - ngc (int): The NGC of the object to add.
+    
+    Returns:
+    - str: "added", "exists" if it is already a favourite, or "not_found"
+      if the user does not exist.
+    
+    Raises:
+    - ClientError: If DynamoDB fails for any other reason.
+    """
+    from botocore.exceptions import ClientError
+    def update():
+        try:
+            table.update_item(
+                Key={"email": email},
+                UpdateExpression="ADD favourites :ngcs",
+                ConditionExpression="attribute_exists(email) AND NOT contains(favourites, :ngc)",
+                ExpressionAttributeValues={":ngcs": {ngc}, ":ngc": ngc},
+                ReturnValuesOnConditionCheckFailure="ALL_OLD"
+            )
+            return "added"
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            # The old item is only returned when the user exists.
+            return "exists" if "Item" in e.response else "not_found"
+    return with_migration(table, email, update)
+
+def remove_favourite(table, email, ngc):
+    """
+    Removes a favourite from a user with a single conditional DELETE.
+    
+    Parameters:
+    - table (Table): The beyond-users table.
+    - email (str): The email of the user.
+    - ngc (int): The NGC of the object to remove.
+    
+    Returns:
+    - str: "removed", "missing" if it is not a favourite, or "not_found"
+      if the user does not exist.
+    
+    Raises:
+    - ClientError: If DynamoDB fails for any other reason.
+    """
+    from botocore.exceptions import ClientError
+    def update():
+        try:
+            table.update_item(
+                Key={"email": email},
+                UpdateExpression="DELETE favourites :ngcs",
+                ConditionExpression="contains(favourites, :ngc)",
+                ExpressionAttributeValues={":ngcs": {ngc}, ":ngc": ngc},
+                ReturnValuesOnConditionCheckFailure="ALL_OLD"
+            )
+            return "removed"
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return "missing" if "Item" in e.response else "not_found"
+    return with_migration(table, email, update)
+
+def update_favourites(table, email, ngcs, action):
+    """
+    Adds or removes many favourites with a single ADD or DELETE update.
+    
+    The favourites before the update are returned with UPDATED_OLD, so the
+    outcome of every NGC is known without reading the user first.
+    
+    Parameters:
+    - table (Table): The beyond-users table.
+    - email (str): The email of the user.
+    - ngcs (list): The NGCs to add or remove.
+    - action (str): "add" or "remove".
+    
+    Returns:
+    - dict: The outcome for every NGC, "added" or "exists" when adding and
+      "removed" or "missing" when removing, or None if the user does not exist.
+    
+    Raises:
+    - ClientError: If DynamoDB fails for any other reason.
+    """
+    from botocore.exceptions import ClientError
+    ngcs = set(ngcs)
+    if not ngcs:
+        return {}
+    operation = "ADD" if action == "add" else "DELETE"
+    def update():
+        try:
+            response = table.update_item(
+                Key={"email": email},
+                UpdateExpression=f"{operation} favourites :ngcs",
+                ConditionExpression="attribute_exists(email)",
+                ExpressionAttributeValues={":ngcs": ngcs},
+                ReturnValues="UPDATED_OLD"
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return None
+        return as_set(response.get("Attributes", {}).get("favourites"))
+    old = with_migration(table, email, update)
+    if old is None:
+        return None
+    if action == "add":
+        return {ngc: "exists" if ngc in old else "added" for ngc in ngcs}
+    return {ngc: "removed" if ngc in old else "missing" for ngc in ngcs}
+
+def migrate_all(table):
+    """
+    Converts the favourites of every user still storing them as a list.
+    
+    Parameters:
+    - table (Table): The beyond-users table.
+    
+    Returns:
+    - int: The number of users migrated.
+    """
+    migrated = 0
+    kwargs = {"ProjectionExpression": "email, favourites"}
+    while True:
+        response = table.scan(**kwargs)
+        for user in response["Items"]:
+            if isinstance(user.get("favourites"), list) and migrate_user(table, user["email"]):
+                migrated += 1
+        if "LastEvaluatedKey" not in response:
+            return migrated
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["migrate"]:
+        sys.exit("usage: python -m beyond.favourites migrate")
+    migrated = migrate_all(aws.table("beyond-users"))
+    print(f"Migrated the favourites of {migrated} users")
@@ -0,0 +1,238 @@
+"""
+Password hashing policy shared by create-user and the login checks.
+
+The algorithm and cost are configured per deployment. With a cost of
+"auto", the cost is calibrated once per container so a verify takes about
+PASSWORD_TARGET_MS on the CPU the function runs on. Stored hashes made with
+another algorithm or a lower cost still verify, and are replaced on the
+next successful login.
+"""
+import base64
+import hashlib
+import hmac
+import math
+import os
+import time
+
+# "bcrypt", or "scrypt" where hashlib provides it.
+PASSWORD_ALGORITHM = os.environ.get("PASSWORD_ALGORITHM", "bcrypt").lower()
+# The bcrypt rounds or scrypt log2(N) to hash with, or "auto" to calibrate.
+PASSWORD_COST = os.environ.get("PASSWORD_COST", "auto").lower()
+# Verify time in milliseconds the calibrated cost aims for.
+PASSWORD_TARGET_MS = float(os.environ.get("PASSWORD_TARGET_MS", "50"))
+# The lowest and highest cost used for each algorithm, whatever the calibration says.
+COST_LIMITS = {"bcrypt": (5, 14), "scrypt": (12, 17)}
+# scrypt block size and parallelism.
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+# The cost in use, calibrated on first use when PASSWORD_COST is "auto".
+policy_state = {"cost": None}
+
+def scrypt_available():
+    """
+    Checks whether hashlib was built with scrypt.
+    
+    Returns:
+    - bool: True if scrypt can be used, False otherwise.
+    """
+    return hasattr(hashlib, "scrypt")
+
+def algorithm():
+    """
+    Returns the configured algorithm, falling back to bcrypt when scrypt is
+    not available.
+    
+    Returns:
+    - str: "bcrypt" or "scrypt".
+    """
+    if PASSWORD_ALGORITHM == "scrypt" and scrypt_available():
+        return "scrypt"
+    return "bcrypt"
+
+def hash_with(password, name, cost):
+    """
+    Hashes a password with an algorithm and cost.
+    
+    Parameters:
+    - password (str): The password to hash.
+    - name (str): "bcrypt" or "scrypt".
+    - cost (int): The bcrypt rounds or scrypt log2(N).
+    
+    Returns:
+    - str: The encoded hash, including the algorithm, cost and salt.
+    """
+    if name == "scrypt":
+        salt = os.urandom(16)
+        key = hashlib.scrypt(
+            password.encode("utf-8"), salt=salt, n=2 ** cost, r=SCRYPT_R, p=SCRYPT_P,
+            maxmem=256 * SCRYPT_R * 2 ** cost, dklen=32
+        )
+        salt, key = (base64.b64encode(data).decode("ascii").rstrip("=") for data in (salt, key))
+        return f"$scrypt$ln={cost},r={SCRYPT_R},p={SCRYPT_P}${salt}${key}"
+    import bcrypt
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=cost)).decode("utf-8")
+
+def parse_hash(stored_password):
+    """
+    Reads the algorithm and cost from a stored hash.
+    
+    Parameters:
+    - stored_password (str): The stored hash.
+    
+    Returns:
+    - tuple: (algorithm, cost), or (None, None) if the hash is not recognized.
+    """
+    try:
+        if stored_password.startswith("$scrypt$"):
+            params = dict(param.split("=") for param in stored_password.split("$")[2].split(","))
+            return "scrypt", int(params["ln"])
+        if stored_password.startswith("$2"):
+            return "bcrypt", int(stored_password.split("$")[2])
+    except (AttributeError, IndexError, KeyError, ValueError):
+        pass
+    return None, None
+
+def time_verify(name, cost, repeats=1):
+    """
+    Measures how long verifying a password takes at a cost.
+    
+    Parameters:
+    - name (str): "bcrypt" or "scrypt".
+    - cost (int): The bcrypt rounds or scrypt log2(N).
+    - repeats (int): The number of verifies to average.
+    
+    Returns:
+    - float: The verify time in milliseconds.
+    """
+    stored = hash_with("calibration", name, cost)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        verify_password("calibration", stored)
+    return (time.perf_counter() - started) * 1000 / repeats
+
+def calibrate(name, target_ms=PASSWORD_TARGET_MS):
+    """
+    Finds the highest cost whose verify time stays within the target.
+    
+    Every step up in cost doubles the work, so one measurement at the
+    lowest cost is enough to estimate the rest.
+    
+    Parameters:
+    - name (str): "bcrypt" or "scrypt".
+    - target_ms (float): The verify time to aim for, in milliseconds.
+    
+    Returns:
+    - int: The cost to hash with.
+    """
+    low, high = COST_LIMITS[name]
+    elapsed = max(time_verify(name, low), 0.001)
+    steps = int(math.floor(math.log2(target_ms / elapsed))) if target_ms > elapsed else 0
+    return max(low, min(high, low + steps))
+
+def cost():
+    """
+    Returns the cost new hashes are made with, calibrating it on first use
+    when PASSWORD_COST is "auto".
+    
+    Returns:
+    - int: The bcrypt rounds or scrypt log2(N).
+    """
+    if policy_state["cost"] is None:
+        name = algorithm()
+        low, high = COST_LIMITS[name]
+        if PASSWORD_COST == "auto":
+            policy_state["cost"] = calibrate(name)
+            print(f"Calibrated {name} cost to {policy_state['cost']}")
+        else:
+            policy_state["cost"] = max(low, min(high, int(PASSWORD_COST)))
+    return policy_state["cost"]
+
+def hash_password(password):
+    """
+    Hashes a password with the configured algorithm and cost.
+    
+    Parameters:
+    - password (str): The password to hash.
+    
+    Returns:
+    - str: The hashed password, or None if no password was given.
+    """
+    if not password:
+        return None
+    return hash_with(password, algorithm(), cost())
+
+def verify_password(given_password, stored_password):
+    """
+    Verifies a password against a stored hash made with any supported
+    algorithm and cost.
+    
+    Parameters:
+    - given_password (str): The password provided by the user.
+    - stored_password (str): The hashed password stored in the database.
+    
+    Returns:
+    - bool: True if the passwords match, False otherwise.
+    """
+    if not given_password or not stored_password:
+        return False
+    name, stored_cost = parse_hash(stored_password)
+    if name == "scrypt":
+        if not scrypt_available():
+            return False
+        params, salt, key = stored_password.split("$")[2:5]
+        params = dict(param.split("=") for param in params.split(","))
+        salt, expected = (base64.b64decode(data + "=" * (-len(data) % 4)) for data in (salt, key))
+        r, p = int(params["r"]), int(params["p"])
+        actual = hashlib.scrypt(
+            given_password.encode("utf-8"), salt=salt, n=2 ** stored_cost, r=r, p=p,
+            maxmem=256 * r * 2 ** stored_cost, dklen=len(expected)
+        )
+        return hmac.compare_digest(actual, expected)
+    if name == "bcrypt":
+        import bcrypt
+        return bcrypt.checkpw(given_password.encode("utf-8"), stored_password.encode("utf-8"))
+    return False
+
+def needs_rehash(stored_password):
+    """
+    Checks whether a stored hash is weaker than the current policy.
+    
+    Parameters:
+    - stored_password (str): The hashed password stored in the database.
+    
+    Returns:
+    - bool: True if the hash uses another algorithm or a lower cost.
+    """
+    name, stored_cost = parse_hash(stored_password)
+    return name != algorithm() or stored_cost < cost()
+
+def upgrade_password(table, email, given_password, stored_password):
+    """
+    Replaces a user's stored hash with one made under the current policy,
+    after the password was verified. The write is conditional on the old
+    hash, so a password changed in the meantime is never overwritten.
+    
+    Parameters:
+    - table (Table): The beyond-users table.
+    - email (str): The email of the user.
+    - given_password (str): The verified password.
+    - stored_password (str): The hash the password was verified against.
+    
+    Returns:
+    - bool: True if the hash was upgraded, False otherwise.
+    """
+    if not needs_rehash(stored_password):
+        return False
+    try:
+        table.update_item(
+            Key={"email": str(email)},
+            UpdateExpression="SET #password = :new",
+            ConditionExpression="#password = :old",
+            ExpressionAttributeNames={"#password": "password"},
+            ExpressionAttributeValues={":new": hash_password(given_password), ":old": stored_password}
+        )
+        return True
+    except Exception as e:
+        print(f"Error upgrading password hash: {e}")
+        return False
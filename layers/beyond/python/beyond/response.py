@@ -0,0 +1,133 @@
+"""
+Accept-Encoding negotiation and compression of lambda responses.
+"""
+import base64
+import gzip
+import os
+import functools
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available.
+    brotli = None
+
+# Smallest body, in bytes, that is worth compressing.
+COMPRESSION_THRESHOLD = int(os.environ.get("COMPRESSION_THRESHOLD", "1024"))
+# Largest number of compressed variants kept across warm invocations.
+COMPRESSION_CACHE_SIZE = int(os.environ.get("COMPRESSION_CACHE_SIZE", "16"))
+
+# Compressed bodies of hot payloads, keyed by (ETag, encoding).
+compression_cache = OrderedDict()
+
+def accepted_encodings(event):
+    """
+    Parses the Accept-Encoding header of a request.
+    
+    Parameters:
+    - event (dict): The event dict containing the request headers.
+    
+    Returns:
+    - set: The content codings the client accepts, in lowercase.
+    """
+    header = (event.get("headers") or {}).get("accept-encoding", "")
+    encodings = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if coding and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            encodings.add(coding.lower())
+    return encodings
+
+def choose_encoding(event):
+    """
+    Picks the best supported encoding the client accepts.
+    
+    Parameters:
+    - event (dict): The event dict containing the request headers.
+    
+    Returns:
+    - str: "br", "gzip", or None if the body should be sent uncompressed.
+    """
+    encodings = accepted_encodings(event)
+    if brotli is not None and "br" in encodings:
+        return "br"
+    if "gzip" in encodings:
+        return "gzip"
+    return None
+
+def compress(data, encoding):
+    """
+    Compresses bytes with the given content coding.
+    
+    Parameters:
+    - data (bytes): The bytes to compress.
+    - encoding (str): "br" or "gzip".
+    
+    Returns:
+    - bytes: The compressed bytes.
+    """
+    if encoding == "br":
+        return brotli.compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+def compress_response(event, response):
+    """
+    Compresses the body of a response if the client accepts it and the body
+    is larger than COMPRESSION_THRESHOLD.
+    
+    Responses that carry an ETag are hot, cacheable payloads such as the
+    catalog, so their compressed variants are kept across warm invocations.
+    
+    Parameters:
+    - event (dict): The event dict containing the request headers.
+    - response (dict): The response object returned by a lambda handler.
+    
+    Returns:
+    - dict: The response, with a base64 encoded compressed body if applicable.
+    """
+    body = response.get("body")
+    headers = response.setdefault("headers", {})
+    if not isinstance(body, str) or response.get("isBase64Encoded") or "Content-Encoding" in headers:
+        return response
+    data = body.encode("utf-8")
+    if len(data) < COMPRESSION_THRESHOLD:
+        return response
+    headers["Vary"] = "Accept-Encoding"
+    encoding = choose_encoding(event)
+    if encoding is None:
+        return response
+    etag = headers.get("ETag")
+    key = (etag, encoding)
+    if etag and key in compression_cache:
+        compression_cache.move_to_end(key)
+        encoded = compression_cache[key]
+    else:
+        encoded = base64.b64encode(compress(data, encoding)).decode("ascii")
+        if etag:
+            compression_cache[key] = encoded
+            while len(compression_cache) > COMPRESSION_CACHE_SIZE:
+                compression_cache.popitem(last=False)
+    if etag and not etag.startswith("W/"):
+        # The compressed bytes differ from the original, so the ETag is weak.
+        headers["ETag"] = "W/" + etag
+    headers["Content-Encoding"] = encoding
+    response["body"] = encoded
+    response["isBase64Encoded"] = True
+    return response
+
+def compressed(handler):
+    """
+    Decorator that applies compress_response to everything a lambda handler
+    returns.
+    
+    Parameters:
+    - handler (function): The lambda handler to wrap.
+    
+    Returns:
+    - function: The wrapped handler.
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        return compress_response(event, handler(event, context))
+    return wrapper
@@ -0,0 +1,162 @@
+"""
+Short-lived session tokens, so a user is only checked with bcrypt or Google
+once at login and later requests verify an HMAC signature instead.
+
+Tokens are HS256 JWTs signed with SESSION_SECRET. They are sent back as
+"Authorization: Bearer <token>". Sessions are disabled when no secret is
+configured, and every request then authenticates as before.
+
+Tokens are only issued at login and are never renewed, so a session lasts
+at most SESSION_TTL. Every token carries the session version stored on the
+user, and is only accepted while the user exists with that version. A
+deleted or recreated user, or one given a new version with
+new_session_version, loses every session issued before.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+
+# Secret used to sign session tokens. Sessions are disabled if it is empty.
+SESSION_SECRET = os.environ.get("SESSION_SECRET", "").encode("utf-8")
+# Seconds a session token is valid for.
+SESSION_TTL = int(os.environ.get("SESSION_TTL", "3600"))
+# Issuer written to and required in session tokens.
+SESSION_ISSUER = "beyond"
+
+# Encoded header of every session token.
+HEADER = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=").decode("ascii")
+
+def b64encode(data):
+    """
+    Encodes bytes as unpadded base64url, as used in JWTs.
+    
+    Parameters:
+    - data (bytes): The bytes to encode.
+    
+    Returns:
+    - str: The encoded value.
+    """
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def sign(signing_input):
+    """
+    Signs the header and payload of a token.
+    
+    Parameters:
+    - signing_input (str): The encoded header and payload joined by a dot.
+    
+    Returns:
+    - str: The encoded signature.
+    """
+    return b64encode(hmac.new(SESSION_SECRET, signing_input.encode("ascii"), hashlib.sha256).digest())
+
+def new_session_version():
+    """
+    Creates a session version for a user. Storing a new version on the user
+    revokes the sessions issued with the old one.
+    
+    Returns:
+    - str: The random version.
+    """
+    return secrets.token_hex(8)
+
+def session_version(user):
+    """
+    Reads the session version stored on a user.
+    
+    Parameters:
+    - user (dict): The user item.
+    
+    Returns:
+    - str: The version, or "0" for users created before versions were stored.
+    """
+    return str(user.get("sessionVersion", "0"))
+
+def issue_session(email, version, ttl=SESSION_TTL):
+    """
+    Issues a session token for a user who has just authenticated.
+    
+    Parameters:
+    - email (str): The email of the user.
+    - version (str): The session version stored on the user.
+    - ttl (int): Seconds the token is valid for.
+    
+    Returns:
+    - str: The session token, or None if sessions are disabled.
+    """
+    if not SESSION_SECRET:
+        return None
+    now = int(time.time())
+    claims = {"iss": SESSION_ISSUER, "sub": str(email), "ver": str(version), "iat": now, "exp": now + ttl}
+    payload = b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    signing_input = f"{HEADER}.{payload}"
+    return f"{signing_input}.{sign(signing_input)}"
+
+def verify_session(token):
+    """
+    Verifies a session token.
+    
+    Parameters:
+    - token (str): The session token.
+    
+    Returns:
+    - dict: The claims of the token, including the email as "sub" and the
+      session version as "ver", or None if the token is invalid, expired or
+      sessions are disabled.
+    """
+    if not SESSION_SECRET or not token:
+        return None
+    try:
+        header, payload, signature = token.split(".")
+        # Signing and compare_digest fail on non-ASCII tokens, which are invalid.
+        if header != HEADER or not hmac.compare_digest(signature, sign(f"{header}.{payload}")):
+            return None
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        if claims["iss"] != SESSION_ISSUER or claims["exp"] <= time.time():
+            return None
+        if not isinstance(claims["sub"], str) or not isinstance(claims["ver"], str):
+            return None
+        return claims
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def valid_session(event, user):
+    """
+    Checks whether a request carries a valid session token for a user.
+    
+    Parameters:
+    - event (dict): The event dict containing the request headers.
+    - user (dict): The user item, or None if the user does not exist.
+    
+    Returns:
+    - bool: True if the token was issued to this user with their current
+      session version, False otherwise.
+    """
+    if not user:
+        return False
+    authorization = (event.get("headers") or {}).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer":
+        return False
+    claims = verify_session(token.strip())
+    return claims is not None and claims["sub"] == user.get("email") and claims["ver"] == session_version(user)
+
+def session_response(user):
+    """
+    Builds the session fields added to a response after a password or
+    Google login. Requests authenticated with a session get no new token.
+    
+    Parameters:
+    - user (dict): The user item.
+    
+    Returns:
+    - dict: The session token and its lifetime, or nothing if sessions are disabled.
+    """
+    token = issue_session(user["email"], session_version(user))
+    if token is None:
+        return {}
+    return {"sessionToken": token, "expiresIn": SESSION_TTL}
@@ -0,0 +1,191 @@
+"""
+Spatial index for objects in beyond-objects, used for cone and box searches.
+
+The sky is cut into declination bands. Every object stores the band it is
+in as "skyBand", and the sky-index GSI is keyed on skyBand with ra as the
+sort key, so a region of the sky is read with one range query per band it
+overlaps instead of a scan. Right ascension and declination are in degrees.
+
+Objects created before the index existed can be backfilled with:
+    python -m beyond.sky backfill
+"""
+import math
+import os
+import sys
+from beyond import aws
+from beyond import fastjson
+
+# Name of the GSI on beyond-objects keyed on skyBand and ra.
+SKY_INDEX = "sky-index"
+# Height of a declination band in degrees. Changing it requires a backfill.
+BAND_DEGREES = int(os.environ.get("SKY_BAND_DEGREES", "1"))
+
+def sky_band(dec):
+    """
+    Finds the declination band holding a declination.
+    
+    Parameters:
+    - dec (Decimal): The declination in degrees, from -90 to 90.
+    
+    Returns:
+    - int: The band number.
+    """
+    return int(math.floor((float(dec) + 90) / BAND_DEGREES))
+
+def sky_index(dec):
+    """
+    Builds the index attributes stored on an object.
+    
+    Parameters:
+    - dec (Decimal): The declination of the object.
+    
+    Returns:
+    - dict: The attributes to add to the item.
+    """
+    return {"skyBand": sky_band(max(min(float(dec), 90.0), -90.0))}
+
+def bands(dec_min, dec_max):
+    """
+    Lists the bands overlapping a range of declinations.
+    
+    Parameters:
+    - dec_min (float): The lowest declination.
+    - dec_max (float): The highest declination.
+    
+    Returns:
+    - range: The band numbers.
+    """
+    return range(sky_band(max(dec_min, -90.0)), sky_band(min(dec_max, 90.0)) + 1)
+
+def ra_ranges(ra_min, ra_max):
+    """
+    Splits a right ascension range into ranges within [0, 360), so ranges
+    crossing 0h become two.
+    
+    Parameters:
+    - ra_min (float): The start of the range, in degrees.
+    - ra_max (float): The end of the range, in degrees. A range with ra_max
+      below ra_min wraps through 0.
+    
+    Returns:
+    - list: (low, high) tuples.
+    """
+    if ra_max - ra_min >= 360:
+        return [(0.0, 360.0)]
+    ra_min %= 360
+    ra_max %= 360
+    if ra_min <= ra_max:
+        return [(ra_min, ra_max)]
+    return [(0.0, ra_max), (ra_min, 360.0)]
+
+def cone_ranges(ra, dec, radius):
+    """
+    Finds the index ranges holding every object within a radius of a point.
+    
+    The right ascension half width is the largest offset reached anywhere
+    in the cone, and the whole band is read when the cone covers a pole.
+    
+    Parameters:
+    - ra (float): The right ascension of the centre, in degrees.
+    - dec (float): The declination of the centre, in degrees.
+    - radius (float): The radius of the cone, in degrees.
+    
+    Returns:
+    - list: (band, low, high) tuples to query.
+    """
+    if abs(dec) + radius >= 90:
+        ranges = [(0.0, 360.0)]
+    else:
+        half_width = math.degrees(math.asin(min(1.0, math.sin(math.radians(radius)) / math.cos(math.radians(dec)))))
+        ranges = ra_ranges(ra - half_width, ra + half_width)
+    return [(band, low, high) for band in bands(dec - radius, dec + radius) for low, high in ranges]
+
+def box_ranges(ra_min, ra_max, dec_min, dec_max):
+    """
+    Finds the index ranges holding every object in a box on the sky.
+    
+    Parameters:
+    - ra_min (float): The start of the right ascension range.
+    - ra_max (float): The end of the right ascension range, below ra_min to wrap through 0.
+    - dec_min (float): The lowest declination.
+    - dec_max (float): The highest declination.
+    
+    Returns:
+    - list: (band, low, high) tuples to query.
+    """
+    return [(band, low, high) for band in bands(dec_min, dec_max) for low, high in ra_ranges(ra_min, ra_max)]
+
+def query_range(table_name, band, low, high, **kwargs):
+    """
+    Reads every object in one band between two right ascensions.
+    
+    The query uses the shared low-level client, which is thread safe, so
+    ranges can be read concurrently without a session per thread.
+    
+    Parameters:
+    - table_name (str): The name of the beyond-objects table.
+    - band (int): The declination band.
+    - low (float): The lowest right ascension.
+    - high (float): The highest right ascension.
+    - kwargs: Extra query arguments, e.g. a projection.
+    
+    Returns:
+    - list: The objects in the range, with numbers as int or float.
+    """
+    kwargs = dict(kwargs)
+    kwargs.setdefault("ExpressionAttributeNames", {})
+    kwargs["ExpressionAttributeNames"].update({"#band": "skyBand", "#ra": "ra"})
+    kwargs["KeyConditionExpression"] = "#band = :band AND #ra BETWEEN :low AND :high"
+    kwargs["ExpressionAttributeValues"] = {
+        ":band": {"N": str(band)},
+        ":low": {"N": repr(low)},
+        ":high": {"N": repr(high)}
+    }
+    client = aws.client("dynamodb")
+    items = []
+    while True:
+        response = client.query(TableName=table_name, IndexName=SKY_INDEX, **kwargs)
+        items.extend(fastjson.items(response["Items"]))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+def backfill(table):
+    """
+    Adds the index attributes to every object that is missing them or has
+    them for a different band size.
+    
+    Parameters:
+    - table (Table): The beyond-objects table.
+    
+    Returns:
+    - int: The number of objects updated.
+    """
+    updated = 0
+    kwargs = {
+        "ProjectionExpression": "ngc, #dec, skyBand",
+        "ExpressionAttributeNames": {"#dec": "dec"}
+    }
+    while True:
+        response = table.scan(**kwargs)
+        for item in response["Items"]:
+            if "dec" not in item:
+                continue
+            index = sky_index(item["dec"])
+            if item.get("skyBand") == index["skyBand"]:
+                continue
+            table.update_item(
+                Key={"ngc": item["ngc"]},
+                UpdateExpression="SET skyBand = :band",
+                ExpressionAttributeValues={":band": index["skyBand"]}
+            )
+            updated += 1
+        if "LastEvaluatedKey" not in response:
+            return updated
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        sys.exit("usage: python -m beyond.sky backfill")
+    updated = backfill(aws.table("beyond-objects"))
+    print(f"Indexed {updated} objects")
@@ -0,0 +1,208 @@
+"""
+Username uniqueness backed by reservation items in the beyond-usernames
+table. Every user owns one item keyed by their username, and it is written
+in the same transaction as the user, so two accounts can never claim the
+same username.
+
+Existing users can be given reservations with:
+    python -m beyond.usernames backfill
+"""
+import sys
+from beyond import aws
+
+# Table holding one reservation item per username.
+USERNAMES_TABLE = "beyond-usernames"
+
+def reserve(username, email):
+    """
+    Builds the transaction item that reserves a username for a user. The put
+    fails if the username is already reserved.
+    
+    Parameters:
+    - username (str): The username to reserve.
+    - email (str): The email of the user claiming it.
+    
+    Returns:
+    - dict: The Put item for transact_write_items.
+    """
+    return {
+        "Put": {
+            "TableName": USERNAMES_TABLE,
+            "Item": {"username": str(username), "email": str(email)},
+            "ConditionExpression": "attribute_not_exists(username)"
+        }
+    }
+
+def release(username, email):
+    """
+    Builds the transaction item that releases a user's username. Users created
+    before reservations existed may have no item, which is allowed.
+    
+    Parameters:
+    - username (str): The username to release.
+    - email (str): The email of the user that owns it.
+    
+    Returns:
+    - dict: The Delete item for transact_write_items.
+    """
+    return {
+        "Delete": {
+            "TableName": USERNAMES_TABLE,
+            "Key": {"username": str(username)},
+            "ConditionExpression": "attribute_not_exists(username) OR email = :email",
+            "ExpressionAttributeValues": {":email": str(email)}
+        }
+    }
+
+def is_conflict(error):
+    """
+    Checks if a ClientError was caused by a failed transaction condition.
+    
+    Parameters:
+    - error (ClientError): The error raised by DynamoDB.
+    
+    Returns:
+    - bool: True if a condition failed, False for any other error.
+    """
+    return error.response["Error"]["Code"] in ("TransactionCanceledException", "ConditionalCheckFailedException")
+
+def create_user(users_table, item):
+    """
+    Creates a user and reserves their username in one transaction.
+    
+    Parameters:
+    - users_table (Table): The beyond-users table.
+    - item (dict): The user to create, including email and username.
+    
+    Returns:
+    - bool: True if the user was created, False if the email or username is taken.
+    
+    Raises:
+    - ClientError: If DynamoDB fails for any other reason.
+    """
+    from botocore.exceptions import ClientError
+    try:
+        users_table.meta.client.transact_write_items(
+            TransactItems=[
+                {
+                    "Put": {
+                        "TableName": users_table.name,
+                        "Item": item,
+                        "ConditionExpression": "attribute_not_exists(email)"
+                    }
+                },
+                reserve(item["username"], item["email"])
+            ]
+        )
+        return True
+    except ClientError as e:
+        if is_conflict(e):
+            return False
+        raise
+
+def change_username(users_table, email, old_username, new_username, updates=None):
+    """
+    Moves a user to a new username in one transaction: the new username is
+    reserved, the old one released, and the user updated. Users created
+    before usernames existed have no old username to release.
+    
+    Parameters:
+    - users_table (Table): The beyond-users table.
+    - email (str): The email of the user.
+    - old_username (str): The user's current username, or None if they have none.
+    - new_username (str): The username to change to.
+    - updates (dict): Other attributes to set on the user. Optional.
+    
+    Returns:
+    - bool: True if the username was changed, False if it is taken or the
+      user changed in the meantime.
+    
+    Raises:
+    - ClientError: If DynamoDB fails for any other reason.
+    """
+    from botocore.exceptions import ClientError
+    updates = dict(updates or {}, username=new_username)
+    names = {f"#{key}": key for key in updates}
+    values = {f":{key}": value for key, value in updates.items()}
+    items = [reserve(new_username, email)]
+    if old_username is None:
+        condition = "attribute_exists(email) AND attribute_not_exists(#username)"
+    else:
+        condition = "#username = :old_username"
+        values[":old_username"] = old_username
+        if old_username:
+            items.append(release(old_username, email))
+    items.append({
+        "Update": {
+            "TableName": users_table.name,
+            "Key": {"email": str(email)},
+            "UpdateExpression": "SET " + ", ".join(f"#{key} = :{key}" for key in updates),
+            "ConditionExpression": condition,
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values
+        }
+    })
+    try:
+        users_table.meta.client.transact_write_items(TransactItems=items)
+        return True
+    except ClientError as e:
+        if is_conflict(e):
+            return False
+        raise
+
+def delete_user(users_table, email, username):
+    """
+    Deletes a user and releases their username in one transaction.
+    
+    Parameters:
+    - users_table (Table): The beyond-users table.
+    - email (str): The email of the user.
+    - username (str): The user's username, or None if they have none.
+    
+    Raises:
+    - ClientError: If DynamoDB fails.
+    """
+    items = [{"Delete": {"TableName": users_table.name, "Key": {"email": str(email)}}}]
+    if username:
+        items.append(release(username, email))
+    users_table.meta.client.transact_write_items(TransactItems=items)
+
+def backfill(users_table, usernames_table):
+    """
+    Creates reservations for users created before the beyond-usernames table
+    existed. Usernames already reserved by another user are reported.
+    
+    Parameters:
+    - users_table (Table): The beyond-users table.
+    - usernames_table (Table): The beyond-usernames table.
+    
+    Returns:
+    - list: The (email, username) pairs that could not be reserved.
+    """
+    from botocore.exceptions import ClientError
+    conflicts = []
+    kwargs = {"ProjectionExpression": "email, username"}
+    while True:
+        response = users_table.scan(**kwargs)
+        for user in response["Items"]:
+            if not user.get("username"):
+                continue
+            try:
+                usernames_table.put_item(
+                    Item={"username": user["username"], "email": user["email"]},
+                    ConditionExpression="attribute_not_exists(username) OR email = :email",
+                    ExpressionAttributeValues={":email": user["email"]}
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+                conflicts.append((user["email"], user["username"]))
+        if "LastEvaluatedKey" not in response:
+            return conflicts
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        sys.exit("usage: python -m beyond.usernames backfill")
+    for email, username in backfill(aws.table("beyond-users"), aws.table(USERNAMES_TABLE)):
+        print(f"Username {username} of {email} is already reserved by another user")
@@ -0,0 +1,137 @@
+"""
+User reads shared by the user functions, with a per-invocation cache.
+"""
+import os
+import functools
+
+# Whether user lookups use strongly consistent reads, so a login right after
+# sign-up or a profile edit always sees the latest item.
+CONSISTENT_READ = os.environ.get("USER_CONSISTENT_READ", "true").lower() == "true"
+
+# Users read during the current invocation, keyed by (table name, email).
+request_cache = {}
+# Request headers and query parameters holding credentials, never logged.
+SECRET_FIELDS = ("password", "authorization", "access_token")
+
+def request_scoped(handler):
+    """
+    Decorator that gives every invocation of a lambda handler its own user
+    read cache, so helpers can look the same user up without another read.
+    
+    Parameters:
+    - handler (function): The lambda handler to wrap.
+    
+    Returns:
+    - function: The wrapped handler.
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        request_cache.clear()
+        try:
+            return handler(event, context)
+        finally:
+            request_cache.clear()
+    return wrapper
+
+def redacted(event):
+    """
+    Copies an event for logging, without the passwords and tokens a user
+    function receives.
+    
+    Parameters:
+    - event (dict): The event dict containing request parameters and data.
+    
+    Returns:
+    - dict: The event with credentials and the request body replaced.
+    """
+    event = dict(event)
+    for part in ("headers", "queryStringParameters"):
+        if event.get(part):
+            event[part] = {
+                name: "[redacted]" if name.lower() in SECRET_FIELDS else value
+                for name, value in event[part].items()
+            }
+    for part in ("rawQueryString", "body"):
+        if event.get(part):
+            event[part] = "[redacted]"
+    return event
+
+def forget_user(table, email):
+    """
+    Drops a user from the request cache after it was written.
+    
+    Parameters:
+    - table (Table): The beyond-users table.
+    - email (str): The email of the user.
+    """
+    request_cache.pop((table.name, str(email)), None)
+
+def get_user(table, email, consistent_read=CONSISTENT_READ):
+    """
+    Reads a user with a keyed GetItem on the email hash key. A user already
+    read during this invocation is returned from the request cache.
+    
+    Parameters:
+    - table (Table): The beyond-users table.
+    - email (str): The email of the user.
+    - consistent_read (bool): Whether to use a strongly consistent read.
+    
+    Returns:
+    - dict: The user, or None if no user has this email.
+    """
+    if not email:
+        return None
+    key = (table.name, str(email))
+    if key not in request_cache:
+        response = table.get_item(
+            Key={"email": str(email)},
+            ConsistentRead=consistent_read
+        )
+        request_cache[key] = response.get("Item")
+    return request_cache[key]
+
+def user_exists(table, email, consistent_read=CONSISTENT_READ):
+    """
+    Checks if a user exists, reading only the key attribute.
+    
+    Parameters:
+    - table (Table): The beyond-users table.
+    - email (str): The email to check.
+    - consistent_read (bool): Whether to use a strongly consistent read.
+    
+    Returns:
+    - bool: True if a user has this email, False otherwise.
+    """
+    if not email:
+        return False
+    key = (table.name, str(email))
+    if key in request_cache:
+        return request_cache[key] is not None
+    response = table.get_item(
+        Key={"email": str(email)},
+        ProjectionExpression="#email",
+        ExpressionAttributeNames={"#email": "email"},
+        ConsistentRead=consistent_read
+    )
+    return "Item" in response
+
+def user_query(table, email):
+    """
+    Reads a user, returning the result in the list shape the user functions
+    expect.
+    
+    Parameters:
+    - table (Table): The beyond-users table.
+    - email (str): The email to query for.
+    
+    Returns:
+    - list: The user, or an empty list if no user was found or the read failed.
+    """
+    from botocore.exceptions import ClientError
+    try:
+        # Read the user with a keyed lookup on the email hash key.
+        user = get_user(table, email)
+        return [user] if user else []
+    except ClientError as e:
+        print(f"Error querying DynamoDB for email: {e}")
+        return []
@@ -13,3 +13,19 @@ for dir in "$base_dir"/*; do
 done
 
 echo "Completed running 'juni build' in all directories."
+
+# Directory containing the shared Lambda layer
+layer_dir="./layers/beyond"
+
+# Package the shared layer with its dependencies under python/, where Lambda expects them
+echo "Packaging the shared layer in $layer_dir..."
+(
+    cd "$layer_dir" &&
+    rm -rf dist && mkdir -p dist/build &&
+    cp -r python dist/build/ &&
+    pip install -r requirements.txt -t dist/build/python \
+        --platform manylinux2014_x86_64 --python-version 3.12 --only-binary=:all: --quiet &&
+    cd dist/build && zip -rq ../beyond-layer.zip python -x "*__pycache__*"
+)
+
+echo "Completed packaging the shared layer."
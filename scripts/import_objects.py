@@ -0,0 +1,37 @@
+"""
+Bulk imports objects into beyond-objects from the command line, with the
+same pipeline as create-object, e.g.:
+    python scripts/import_objects.py catalog.csv --workers 8
+
+Set AWS_ENDPOINT_URL_DYNAMODB to import into a local DynamoDB.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The function imports the shared layer as it does on Lambda.
+sys.path.insert(0, os.path.join(ROOT, "layers", "beyond", "python"))
+
+spec = importlib.util.spec_from_file_location("create_object", os.path.join(ROOT, "functions", "create-object", "main.py"))
+create_object = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(create_object)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import objects into beyond-objects from CSV or JSONL.")
+    parser.add_argument("path", help="The file to import, or - for standard input.")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="The input format. Defaults to the file extension.")
+    parser.add_argument("--workers", type=int, default=create_object.IMPORT_WORKERS, help="The number of concurrent batch writers.")
+    parser.add_argument("--upsert", action="store_true", help="Replace existing objects with the same NGC.")
+    args = parser.parse_args()
+    format = args.format or ("jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv")
+    if args.path == "-":
+        report = create_object.import_objects(sys.stdin, format, args.workers, upsert=args.upsert)
+    else:
+        with open(args.path, newline="", encoding="utf-8") as f:
+            report = create_object.import_objects(f, format, args.workers, upsert=args.upsert)
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["invalid"] or report["unprocessed"] else 0)
@@ -0,0 +1,87 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The functions import the shared layer as they do on Lambda.
+sys.path.insert(0, os.path.join(ROOT, "layers", "beyond", "python"))
+
+# Credentials and a region for the stubbed clients, so nothing reaches AWS.
+os.environ.setdefault("AWS_DEFAULT_REGION", "ca-central-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+def load_function(name):
+    """
+    Imports the main module of a lambda function.
+    
+    Parameters:
+    - name (str): The directory of the function, e.g. "add-favourite".
+    
+    Returns:
+    - module: The function's main module.
+    """
+    path = os.path.join(ROOT, "functions", name, "main.py")
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture
+def dynamodb():
+    """
+    Replaces the shared DynamoDB resource with one whose client is stubbed.
+    Every expected call must be queued on the stubber, so an extra call
+    fails the test and a missing one fails it when the test ends.
+    """
+    boto3 = pytest.importorskip("boto3")
+    from botocore.stub import Stubber
+    from beyond import aws
+    resource = boto3.resource("dynamodb")
+    aws.resources["dynamodb"] = resource
+    try:
+        with Stubber(resource.meta.client) as stubber:
+            yield stubber
+            stubber.assert_no_pending_responses()
+    finally:
+        aws.resources.pop("dynamodb", None)
+
+@pytest.fixture
+def moto_dynamodb():
+    """
+    Runs the test against moto's in-memory DynamoDB. The shared clients are
+    dropped before and after, so none of them outlives the mock.
+    """
+    moto = pytest.importorskip("moto")
+    from beyond import aws, users
+    def reset():
+        aws.clients.clear()
+        aws.resources.clear()
+        aws.thread_local.__dict__.clear()
+        users.request_cache.clear()
+    with moto.mock_aws():
+        reset()
+        try:
+            yield aws.client("dynamodb")
+        finally:
+            reset()
+
+def create_table(client, name, key, kind="S"):
+    """
+    Creates an on-demand table keyed on a single hash key.
+    
+    Parameters:
+    - client (BaseClient): The DynamoDB client.
+    - name (str): The name of the table.
+    - key (str): The hash key of the table.
+    - kind (str): The type of the hash key, "S" or "N".
+    """
+    client.create_table(
+        TableName=name,
+        KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": key, "AttributeType": kind}],
+        BillingMode="PAY_PER_REQUEST"
+    )
@@ -0,0 +1,140 @@
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("cryptography")
+
+from beyond import auth
+
+CLIENT_ID = "1234.apps.googleusercontent.com"
+EMAIL = "a@example.com"
+
+def b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+class Google(BaseHTTPRequestHandler):
+    """
+    Serves tokeninfo and the signing keys like Google does, and counts the
+    requests it receives.
+    """
+    tokens = {}
+    jwks = {}
+    requests = []
+
+    def do_GET(self):
+        Google.requests.append(self.path)
+        if self.path == "/certs":
+            status, body = 200, Google.jwks
+        else:
+            token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+            info = Google.tokens.get(token)
+            status, body = (200, info) if info else (400, {"error": "invalid_token"})
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def signing_key():
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+@pytest.fixture
+def google(monkeypatch, signing_key):
+    numbers = signing_key.public_key().public_numbers()
+    Google.jwks = {"keys": [{
+        "kty": "RSA",
+        "kid": "key-1",
+        "n": b64encode(numbers.n.to_bytes((numbers.n.bit_length() + 7) // 8, "big")),
+        "e": b64encode(numbers.e.to_bytes(3, "big"))
+    }]}
+    Google.tokens = {}
+    Google.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Google)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(auth, "GOOGLE_TOKENINFO_URL", f"{url}/tokeninfo")
+    monkeypatch.setattr(auth, "GOOGLE_CERTS_URL", f"{url}/certs")
+    monkeypatch.setattr(auth, "GOOGLE_CLIENT_IDS", [CLIENT_ID])
+    monkeypatch.setattr(auth, "token_cache", type(auth.token_cache)())
+    monkeypatch.setattr(auth, "jwks_state", {"keys": {}, "fetched_at": None, "expires_at": 0})
+    monkeypatch.setattr(auth, "session_state", {"session": None})
+    try:
+        yield Google
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def id_token(signing_key, **claims):
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding
+    claims = dict({
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "email": EMAIL,
+        "email_verified": True,
+        "exp": int(time.time()) + 3600
+    }, **claims)
+    header = b64encode(json.dumps({"alg": "RS256", "kid": "key-1"}).encode("utf-8"))
+    payload = b64encode(json.dumps(claims).encode("utf-8"))
+    signature = signing_key.sign(f"{header}.{payload}".encode("ascii"), padding.PKCS1v15(), hashes.SHA256())
+    return f"{header}.{payload}.{b64encode(signature)}"
+
+def test_tokeninfo_result_is_cached(google):
+    google.tokens["access"] = {"aud": CLIENT_ID, "email": EMAIL, "email_verified": "true", "expires_in": "3599"}
+    assert auth.authenticate_google_user("access", EMAIL)
+    assert auth.authenticate_google_user("access", EMAIL)
+    assert google.requests == ["/tokeninfo"]
+
+def test_id_token_is_verified_locally_and_cached(google, signing_key):
+    token = id_token(signing_key)
+    assert auth.authenticate_google_user(token, EMAIL)
+    assert auth.authenticate_google_user(token, EMAIL)
+    assert google.requests == ["/certs"]
+
+def test_cached_token_is_not_shared_across_emails(google):
+    google.tokens["access"] = {"aud": CLIENT_ID, "email": EMAIL, "email_verified": "true", "expires_in": "3599"}
+    assert auth.authenticate_google_user("access", EMAIL)
+    assert not auth.authenticate_google_user("access", "b@example.com")
+
+def test_expired_id_token_is_rejected(google, signing_key):
+    token = id_token(signing_key, exp=int(time.time()) - 3600)
+    assert not auth.authenticate_google_user(token, EMAIL)
+
+def test_expired_access_token_is_rejected(google):
+    # Google answers 400 for an expired access token.
+    assert not auth.authenticate_google_user("expired", EMAIL)
+
+def test_cache_never_outlives_the_token(google, signing_key):
+    token = id_token(signing_key, exp=int(time.time()) + 5)
+    assert auth.authenticate_google_user(token, EMAIL)
+    expires_at, = auth.token_cache.values()
+    assert expires_at <= time.monotonic() + 5
+
+def test_token_within_clock_skew_is_accepted_but_not_cached(google, signing_key):
+    token = id_token(signing_key, exp=int(time.time()) - 10)
+    assert auth.authenticate_google_user(token, EMAIL)
+    assert not auth.token_cache
+
+@pytest.mark.parametrize("claims", [{"aud": "other.apps.googleusercontent.com"}, {"email": "b@example.com"}, {"email_verified": False}])
+def test_id_token_for_another_client_or_email_is_rejected(google, signing_key, claims):
+    assert not auth.authenticate_google_user(id_token(signing_key, **claims), EMAIL)
+
+@pytest.mark.parametrize("info", [
+    {"aud": "other.apps.googleusercontent.com", "email": EMAIL, "email_verified": "true", "expires_in": "3599"},
+    {"aud": CLIENT_ID, "email": "b@example.com", "email_verified": "true", "expires_in": "3599"}
+])
+def test_tokeninfo_for_another_client_or_email_is_rejected(google, info):
+    google.tokens["access"] = info
+    assert not auth.authenticate_google_user("access", EMAIL)
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from conftest import load_function
+
+def event(method, body=None, query=None):
+    return {
+        "requestContext": {"http": {"method": method}},
+        "headers": {},
+        "body": json.dumps(body) if body is not None else None,
+        "queryStringParameters": query
+    }
+
+@pytest.fixture
+def add_favourite(dynamodb):
+    return load_function("add-favourite")
+
+@pytest.fixture
+def delete_favourite(dynamodb):
+    return load_function("delete-favourite")
+
+def test_add_favourite_is_one_update(dynamodb, add_favourite):
+    dynamodb.add_response("update_item", {})
+    response = add_favourite.lambda_handler(event("POST", {"email": "a@example.com", "ngc": 224}), None)
+    assert response["statusCode"] == 200
+
+def test_add_favourite_for_missing_user_is_one_update(dynamodb, add_favourite):
+    dynamodb.add_client_error("update_item", "ConditionalCheckFailedException", http_status_code=400)
+    response = add_favourite.lambda_handler(event("POST", {"email": "a@example.com", "ngc": 224}), None)
+    assert response["statusCode"] == 404
+
+def test_delete_favourite_is_one_update(dynamodb, delete_favourite):
+    dynamodb.add_response("update_item", {})
+    response = delete_favourite.lambda_handler(event("DELETE", query={"email": "a@example.com", "ngc": "224"}), None)
+    assert response["statusCode"] == 200
+
+def test_user_is_read_once_per_request(dynamodb):
+    from beyond import aws, users
+    table = aws.table("beyond-users")
+    dynamodb.add_response("get_item", {"Item": {"email": {"S": "a@example.com"}}})
+
+    @users.request_scoped
+    def handler(event, context):
+        first = users.get_user(table, "a@example.com")
+        assert users.user_exists(table, "a@example.com")
+        return users.get_user(table, "a@example.com") is first
+
+    assert handler({}, None)
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from conftest import create_table, load_function
+
+CSV = "\n".join([
+    "ngc,name,type,constellation,ra,dec,magnitude,collection",
+    "224,Replaced,Galaxy,Andromeda,10.68,41.27,3.4,NGC",
+    "598,Triangulum Galaxy,Galaxy,Triangulum,23.46,30.66,5.7,NGC",
+    "598,Repeated,Galaxy,Triangulum,23.46,30.66,5.7,NGC"
+])
+
+def event(query=None):
+    return {
+        "requestContext": {"http": {"method": "POST"}},
+        "headers": {"content-type": "text/csv"},
+        "queryStringParameters": query,
+        "body": CSV
+    }
+
+@pytest.fixture
+def create_object(moto_dynamodb):
+    create_table(moto_dynamodb, "beyond-objects", "ngc", "N")
+    moto_dynamodb.put_item(TableName="beyond-objects", Item={"ngc": {"N": "224"}, "name": {"S": "Andromeda Galaxy"}})
+    return load_function("create-object")
+
+def name(client, ngc):
+    return client.get_item(TableName="beyond-objects", Key={"ngc": {"N": str(ngc)}})["Item"]["name"]["S"]
+
+def test_import_never_replaces_existing_objects(moto_dynamodb, create_object):
+    report = json.loads(create_object.lambda_handler(event(), None)["body"])
+    assert (report["read"], report["written"], report["duplicates"]) == (3, 1, 2)
+    assert name(moto_dynamodb, 224) == "Andromeda Galaxy"
+    assert name(moto_dynamodb, 598) == "Triangulum Galaxy"
+
+def test_upsert_import_replaces_existing_objects(moto_dynamodb, create_object):
+    report = json.loads(create_object.lambda_handler(event({"upsert": "true"}), None)["body"])
+    assert (report["read"], report["written"], report["duplicates"]) == (3, 2, 1)
+    assert name(moto_dynamodb, 224) == "Replaced"
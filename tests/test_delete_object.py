@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from conftest import load_function
+
+def event(query, signed=False):
+    context = {"http": {"method": "DELETE"}}
+    if signed:
+        context["authorizer"] = {"iam": {"userArn": "arn:aws:iam::123456789012:user/admin"}}
+    return {"requestContext": context, "headers": {}, "rawQueryString": query}
+
+@pytest.fixture
+def delete_object(moto_dynamodb):
+    moto_dynamodb.create_table(
+        TableName="beyond-objects",
+        KeySchema=[{"AttributeName": "ngc", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "ngc", "AttributeType": "N"},
+            {"AttributeName": "collection", "AttributeType": "S"},
+            {"AttributeName": "type", "AttributeType": "S"}
+        ],
+        GlobalSecondaryIndexes=[
+            {"IndexName": index, "KeySchema": [{"AttributeName": field, "KeyType": "HASH"}], "Projection": {"ProjectionType": "KEYS_ONLY"}}
+            for field, index in (("collection", "collection-index"), ("type", "type-index"))
+        ],
+        BillingMode="PAY_PER_REQUEST"
+    )
+    for ngc in (224, 598, 1976):
+        moto_dynamodb.put_item(TableName="beyond-objects", Item={"ngc": {"N": str(ngc)}, "collection": {"S": "NGC"}, "type": {"S": "Galaxy"}})
+    return load_function("delete-object")
+
+def test_unsigned_prune_is_forbidden(moto_dynamodb, delete_object):
+    response = delete_object.lambda_handler(event("collection=NGC&confirm=3"), None)
+    assert response["statusCode"] == 403
+    assert moto_dynamodb.scan(TableName="beyond-objects")["Count"] == 3
+
+def test_signed_dry_run_counts_the_matches(moto_dynamodb, delete_object):
+    response = delete_object.lambda_handler(event("collection=NGC&dryRun=true", signed=True), None)
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == {"matched": 3, "ngcs": [224, 598, 1976]}
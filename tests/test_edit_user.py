@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from conftest import load_function
+
+def user():
+    # A new item every time, since the resource decodes stubbed responses in place.
+    return {"email": {"S": "a@example.com"}, "username": {"S": "alice"}, "password": {"S": "$2b$12$" + "x" * 53}}
+
+def event(body, headers=None):
+    return {
+        "requestContext": {"http": {"method": "POST"}},
+        "headers": headers or {},
+        "body": json.dumps(body)
+    }
+
+@pytest.fixture
+def edit_user(dynamodb):
+    return load_function("edit-user")
+
+def test_invalid_session_token_is_rejected(dynamodb, edit_user):
+    dynamodb.add_response("get_item", {"Item": user()})
+    body = {"email": "a@example.com", "username": "bob", "isGoogle": False}
+    response = edit_user.lambda_handler(event(body, {"authorization": "Bearer junk"}), None)
+    assert response["statusCode"] == 401
+
+def test_missing_password_is_rejected(dynamodb, edit_user):
+    dynamodb.add_response("get_item", {"Item": user()})
+    body = {"email": "a@example.com", "username": "bob", "isGoogle": False}
+    response = edit_user.lambda_handler(event(body), None)
+    assert response["statusCode"] == 401
@@ -0,0 +1,55 @@
+import base64
+import json
+
+import pytest
+
+from conftest import create_table, load_function
+
+def event(query):
+    return {"requestContext": {"http": {"method": "GET"}}, "headers": {}, "queryStringParameters": query}
+
+@pytest.fixture
+def get_all_objects(moto_dynamodb):
+    create_table(moto_dynamodb, "beyond-objects", "ngc", "N")
+    for ngc in range(1, 26):
+        moto_dynamodb.put_item(TableName="beyond-objects", Item={
+            "ngc": {"N": str(ngc)},
+            "constellation": {"S": "Andromeda"},
+            "ra": {"N": "10.68"},
+            "dec": {"N": "41.27"},
+            "magnitude": {"N": "3.4"}
+        })
+    return load_function("get-all-objects")
+
+def test_pages_through_every_object_once(get_all_objects):
+    ngcs = []
+    query = {"limit": "10"}
+    while True:
+        response = get_all_objects.lambda_handler(event(query), None)
+        assert response["statusCode"] == 200
+        page = json.loads(response["body"])
+        assert len(page["objects"]) <= 10
+        ngcs.extend(item["ngc"] for item in page["objects"])
+        if not page["nextToken"]:
+            break
+        query = {"limit": "10", "nextToken": page["nextToken"]}
+    assert sorted(ngcs) == list(range(1, 26))
+
+@pytest.mark.parametrize("key", [{"ngc": "x"}, {"ngc": True}, {"ngc": 1, "name": "x"}, {"name": "x"}, ["ngc"]])
+def test_token_with_other_keys_is_rejected(get_all_objects, key):
+    token = base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+    response = get_all_objects.lambda_handler(event({"limit": "10", "nextToken": token}), None)
+    assert response["statusCode"] == 400
+    assert json.loads(response["body"]) == {"error": "Invalid nextToken"}
+
+def test_lists_every_object(get_all_objects):
+    response = get_all_objects.lambda_handler(event(None), None)
+    assert response["statusCode"] == 200
+    assert [item["ngc"] for item in json.loads(response["body"])] == list(range(1, 26))
+
+def test_failed_read_is_not_cached(moto_dynamodb, get_all_objects):
+    moto_dynamodb.delete_table(TableName="beyond-objects")
+    response = get_all_objects.lambda_handler(event(None), None)
+    assert response["statusCode"] == 400
+    assert "error" in json.loads(response["body"])
+    assert not get_all_objects.catalog_cache
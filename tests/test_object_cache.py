@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from conftest import create_table, load_function
+
+def event(query):
+    return {"requestContext": {"http": {"method": "GET"}}, "headers": {}, "queryStringParameters": query}
+
+@pytest.fixture
+def objects(moto_dynamodb):
+    create_table(moto_dynamodb, "beyond-objects", "ngc", "N")
+    create_table(moto_dynamodb, "beyond-users", "email")
+    for ngc, name in ((224, "Andromeda Galaxy"), (598, "Triangulum Galaxy")):
+        moto_dynamodb.put_item(TableName="beyond-objects", Item={"ngc": {"N": str(ngc)}, "name": {"S": name}})
+    moto_dynamodb.put_item(TableName="beyond-users", Item={"email": {"S": "a@example.com"}, "favourites": {"NS": ["598", "224", "1"]}})
+    return moto_dynamodb
+
+def test_single_read_after_batch_read_is_served_from_the_cache(objects):
+    get_object = load_function("get-object")
+    response = get_object.lambda_handler(event({"ngc": "224,598,1"}), None)
+    assert json.loads(response["body"])["missing"] == [1]
+    objects.delete_item(TableName="beyond-objects", Key={"ngc": {"N": "224"}})
+    response = get_object.lambda_handler(event({"ngc": "224"}), None)
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == {"ngc": 224, "name": "Andromeda Galaxy"}
+    assert response["headers"]["ETag"]
+
+def test_expanded_favourites_are_cached(objects):
+    get_favourites = load_function("get-favourites")
+    response = get_favourites.lambda_handler(event({"email": "a@example.com", "expand": "true"}), None)
+    body = json.loads(response["body"])
+    assert body["favourites"] == [1, 224, 598]
+    assert [item["ngc"] for item in body["objects"]] == [224, 598]
+    objects.delete_item(TableName="beyond-objects", Key={"ngc": {"N": "598"}})
+    response = get_favourites.lambda_handler(event({"email": "a@example.com", "expand": "true"}), None)
+    assert [item["ngc"] for item in json.loads(response["body"])["objects"]] == [224, 598]
@@ -0,0 +1,32 @@
+import pytest
+
+from conftest import create_table, load_function
+
+@pytest.fixture
+def edit_user(moto_dynamodb):
+    create_table(moto_dynamodb, "beyond-users", "email")
+    create_table(moto_dynamodb, "beyond-usernames", "username")
+    moto_dynamodb.put_item(TableName="beyond-users", Item={"email": {"S": "b@x.com"}, "username": {"S": "bob"}})
+    moto_dynamodb.put_item(TableName="beyond-usernames", Item={"username": {"S": "bob"}, "email": {"S": "b@x.com"}})
+    # A user created before usernames existed.
+    moto_dynamodb.put_item(TableName="beyond-users", Item={"email": {"S": "c@x.com"}})
+    return load_function("edit-user")
+
+def reservations(client):
+    return {item["username"]["S"]: item["email"]["S"] for item in client.scan(TableName="beyond-usernames")["Items"]}
+
+def test_user_without_username_cannot_take_a_reserved_one(moto_dynamodb, edit_user):
+    assert not edit_user.edit_user("c@x.com", "bob", "pic")
+    user = moto_dynamodb.get_item(TableName="beyond-users", Key={"email": {"S": "c@x.com"}})["Item"]
+    assert "username" not in user
+    assert reservations(moto_dynamodb) == {"bob": "b@x.com"}
+
+def test_user_without_username_reserves_a_free_one(moto_dynamodb, edit_user):
+    assert edit_user.edit_user("c@x.com", "carol", "pic")
+    user = moto_dynamodb.get_item(TableName="beyond-users", Key={"email": {"S": "c@x.com"}})["Item"]
+    assert user["username"]["S"] == "carol"
+    assert reservations(moto_dynamodb) == {"bob": "b@x.com", "carol": "c@x.com"}
+
+def test_changing_username_releases_the_old_one(moto_dynamodb, edit_user):
+    assert edit_user.edit_user("b@x.com", "robert", "pic")
+    assert reservations(moto_dynamodb) == {"robert": "b@x.com"}